@@ -2,6 +2,8 @@
 类级注释：系统参数管理路由
 提供系统参数的 CRUD、版本控制、审计日志、导入导出等 API
 """
+import time
+
 from fastapi import APIRouter, Query, UploadFile, File, HTTPException, Request, Depends
 from typing import Optional, List, Dict, Any
 
@@ -14,6 +16,10 @@ from ..schemas.system import (
 from ..services.system_service import get_system_param_service
 from .auth import require_auth, require_csrf
 
+# 主程序写入的检测服务就绪状态文件，心跳间隔 30 秒，超过 3 个间隔未刷新视为进程已退出
+DETECTOR_STATUS_FILE = "detector_status.json"
+DETECTOR_STATUS_STALE_SECONDS = 90
+
 router = APIRouter(prefix="/system", tags=["系统参数管理"], dependencies=[Depends(require_auth), Depends(require_csrf)])
 system_service = get_system_param_service()
 
@@ -175,3 +181,19 @@ def get_restart_required_params():
     params = system_service.get_all_params()
     restart_params = [p.key for p in params if p.requires_restart]
     return Response.success(data=restart_params)
+
+
+@router.get("/detector-status", response_model=Response[Dict[str, Any]])
+def get_detector_status():
+    """
+    函数级注释：获取检测服务就绪状态
+    state 为 loading / warming_up / ready / stopped，主程序从未写入时为 unknown；
+    状态文件长时间未刷新时 stale 为 True
+    """
+    from ..core.storage import get_storage_manager
+    status = get_storage_manager().read(DETECTOR_STATUS_FILE, use_cache=False)
+    if not status:
+        return Response.success(data={"state": "unknown", "stale": True})
+    status = dict(status)
+    status["stale"] = time.time() - float(status.get("updated_at") or 0) > DETECTOR_STATUS_STALE_SECONDS
+    return Response.success(data=status)
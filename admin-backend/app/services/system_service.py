@@ -221,6 +221,273 @@ class SystemParamService:
                 "permission": ParamPermission.EDITABLE,
                 "requires_restart": False
             },
+            {
+                "key": "analysis_target_fps",
+                "value": 0,
+                "type": ParamType.FLOAT,
+                "category": ParamCategory.ALARM_LOGIC,
+                "description": "目标分析帧率（次/秒），0 表示按检测间隔帧数跳帧",
+                "default_value": 0,
+                "min_value": 0,
+                "max_value": 30,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "analysis_latency_slo_ms",
+                "value": 1000,
+                "type": ParamType.INTEGER,
+                "category": ParamCategory.ALARM_LOGIC,
+                "description": "帧采集到检测的最大允许延迟（毫秒），超过则丢弃过期帧，0 表示不限制",
+                "default_value": 1000,
+                "min_value": 0,
+                "max_value": 10000,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "grab_skip_decode",
+                "value": True,
+                "type": ParamType.BOOLEAN,
+                "category": ParamCategory.HARDWARE,
+                "description": "无界面模式下只完整解码需要分析的帧",
+                "default_value": True,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            # 运动门控参数
+            {
+                "key": "motion_gate_enabled",
+                "value": False,
+                "type": ParamType.BOOLEAN,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "静止画面跳过 YOLO 推理（运动门控）",
+                "default_value": False,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "motion_gate_min_ratio",
+                "value": 0.002,
+                "type": ParamType.FLOAT,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "运动门控前景像素比例阈值，低于该值视为静止画面",
+                "default_value": 0.002,
+                "min_value": 0.0,
+                "max_value": 1.0,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "motion_gate_force_interval",
+                "value": 30.0,
+                "type": ParamType.FLOAT,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "运动门控开启时强制完整推理的间隔（秒）",
+                "default_value": 30.0,
+                "min_value": 0.0,
+                "max_value": 3600.0,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            # 运动估计参数
+            {
+                "key": "motion_method",
+                "value": "mog2",
+                "type": ParamType.STRING,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "运动估计方法（mog2 为背景建模，frame_diff 为帧差，更省内存与 CPU）",
+                "default_value": "mog2",
+                "options": ["mog2", "frame_diff"],
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "motion_mask_scale",
+                "value": 1.0,
+                "type": ParamType.FLOAT,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "前景掩码相对画面的缩放比例（小于 1 时在缩小的画面上估计运动）",
+                "default_value": 1.0,
+                "min_value": 0.1,
+                "max_value": 1.0,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            # 切片推理参数
+            {
+                "key": "tiled_inference_enabled",
+                "value": False,
+                "type": ParamType.BOOLEAN,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "对存在运动的画面切片按原分辨率额外推理（远处小火源）",
+                "default_value": False,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "tiled_tile_size",
+                "value": 640,
+                "type": ParamType.INTEGER,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "切片边长（像素，32 对齐），同时作为切片的推理尺寸",
+                "default_value": 640,
+                "min_value": 160,
+                "max_value": 1280,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "tiled_overlap",
+                "value": 0.2,
+                "type": ParamType.FLOAT,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "相邻切片的重叠比例",
+                "default_value": 0.2,
+                "min_value": 0.0,
+                "max_value": 0.5,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "tiled_motion_min_ratio",
+                "value": 0.01,
+                "type": ParamType.FLOAT,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "切片内前景像素比例下限，低于该值的切片不推理",
+                "default_value": 0.01,
+                "min_value": 0.0,
+                "max_value": 1.0,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "tiled_max_tiles",
+                "value": 4,
+                "type": ParamType.INTEGER,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "每帧最多推理的切片数",
+                "default_value": 4,
+                "min_value": 0,
+                "max_value": 16,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            # 分辨率级联参数
+            {
+                "key": "cascade_enabled",
+                "value": False,
+                "type": ParamType.BOOLEAN,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "空闲画面低分辨率推理，出现候选目标后升级到完整推理尺寸（分辨率级联）",
+                "default_value": False,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "cascade_idle_imgsz",
+                "value": 320,
+                "type": ParamType.INTEGER,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "分辨率级联空闲时的推理尺寸（32 对齐）",
+                "default_value": 320,
+                "min_value": 160,
+                "max_value": 1280,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "cascade_hold_seconds",
+                "value": 5.0,
+                "type": ParamType.FLOAT,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "最后一次出现候选目标后保持完整推理尺寸的时间（秒）",
+                "default_value": 5.0,
+                "min_value": 0.0,
+                "max_value": 600.0,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            # 近重复帧缓存参数
+            {
+                "key": "frame_cache_enabled",
+                "value": False,
+                "type": ParamType.BOOLEAN,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "近重复帧复用上次推理与校验结果，只重新执行追踪",
+                "default_value": False,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "frame_cache_tolerance",
+                "value": 3.0,
+                "type": ParamType.FLOAT,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "近重复帧判定容差（32x32 灰度缩略图逐块最大差值）",
+                "default_value": 3.0,
+                "min_value": 0.0,
+                "max_value": 64.0,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "frame_cache_max_age",
+                "value": 2.0,
+                "type": ParamType.FLOAT,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "推理结果最长复用时间（秒）",
+                "default_value": 2.0,
+                "min_value": 0.0,
+                "max_value": 60.0,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            # 光照补偿参数
+            {
+                "key": "enhance_at_inference_size",
+                "value": False,
+                "type": ParamType.BOOLEAN,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "先缩小到推理尺寸再做光照补偿，校验区域按需补偿",
+                "default_value": False,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            # 颜色类别查找表参数
+            {
+                "key": "color_lut_enabled",
+                "value": False,
+                "type": ParamType.BOOLEAN,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "多模态校验的颜色判定改为查找表（常驻约 16MB 内存）",
+                "default_value": False,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            # 积分图统计参数
+            {
+                "key": "integral_stats_enabled",
+                "value": False,
+                "type": ParamType.BOOLEAN,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "火焰候选框大量重叠时在外接区域上统一计算校验特征，各框比例查积分图",
+                "default_value": False,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
+            {
+                "key": "integral_stats_min_overlap",
+                "value": 2.0,
+                "type": ParamType.FLOAT,
+                "category": ParamCategory.YOLO_DETECTION,
+                "description": "启用积分图统计的最小重叠度（候选框面积之和 / 外接区域面积）",
+                "default_value": 2.0,
+                "min_value": 1.0,
+                "max_value": 100.0,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": False
+            },
             # 硬件参数
             {
                 "key": "yolo_device",
@@ -233,6 +500,53 @@ class SystemParamService:
                 "permission": ParamPermission.RESTRICTED,
                 "requires_restart": True
             },
+            {
+                "key": "yolo_backend",
+                "value": "ultralytics",
+                "type": ParamType.STRING,
+                "category": ParamCategory.HARDWARE,
+                "description": "YOLO 推理后端（ultralytics 为 PyTorch，torch 为绕过 predict 的精简 PyTorch 路径，onnx 为 ONNX Runtime CPU 推理）",
+                "default_value": "ultralytics",
+                "options": ["ultralytics", "torch", "onnx"],
+                "permission": ParamPermission.RESTRICTED,
+                "requires_restart": True
+            },
+            {
+                "key": "yolo_warmup_runs",
+                "value": 3,
+                "type": ParamType.INTEGER,
+                "category": ParamCategory.HARDWARE,
+                "description": "启动时模型预热的推理次数（0 为不预热）",
+                "default_value": 3,
+                "min_value": 0,
+                "max_value": 20,
+                "permission": ParamPermission.RESTRICTED,
+                "requires_restart": True
+            },
+            {
+                "key": "inference_batch_size",
+                "value": 1,
+                "type": ParamType.INTEGER,
+                "category": ParamCategory.HARDWARE,
+                "description": "多路视频流合并推理的最大批大小，1 表示不合并",
+                "default_value": 1,
+                "min_value": 1,
+                "max_value": 16,
+                "permission": ParamPermission.RESTRICTED,
+                "requires_restart": True
+            },
+            {
+                "key": "inference_batch_wait_ms",
+                "value": 5,
+                "type": ParamType.FLOAT,
+                "category": ParamCategory.HARDWARE,
+                "description": "合并推理时凑批的最长等待时间（毫秒）",
+                "default_value": 5,
+                "min_value": 0,
+                "max_value": 100,
+                "permission": ParamPermission.RESTRICTED,
+                "requires_restart": True
+            },
             {
                 "key": "camera_index",
                 "value": 0,
@@ -254,6 +568,61 @@ class SystemParamService:
                 "permission": ParamPermission.EDITABLE,
                 "requires_restart": True
             },
+            {
+                "key": "ingest_backend",
+                "value": "opencv",
+                "type": ParamType.STRING,
+                "category": ParamCategory.HARDWARE,
+                "description": "视频接入后端",
+                "default_value": "opencv",
+                "options": ["opencv", "pyav"],
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": True
+            },
+            {
+                "key": "ingest_rtsp_transport",
+                "value": "tcp",
+                "type": ParamType.STRING,
+                "category": ParamCategory.HARDWARE,
+                "description": "PyAV 后端 RTSP 传输协议",
+                "default_value": "tcp",
+                "options": ["tcp", "udp"],
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": True
+            },
+            {
+                "key": "ingest_decoder_threads",
+                "value": 0,
+                "type": ParamType.INTEGER,
+                "category": ParamCategory.HARDWARE,
+                "description": "PyAV 后端解码线程数，0 为自动",
+                "default_value": 0,
+                "min_value": 0,
+                "max_value": 16,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": True
+            },
+            {
+                "key": "ingest_low_delay",
+                "value": True,
+                "type": ParamType.BOOLEAN,
+                "category": ParamCategory.HARDWARE,
+                "description": "PyAV 后端低延迟解码（关闭输入缓冲，解码器使用 LOW_DELAY 标志）",
+                "default_value": True,
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": True
+            },
+            {
+                "key": "ingest_decode_mode",
+                "value": "all",
+                "type": ParamType.STRING,
+                "category": ParamCategory.HARDWARE,
+                "description": "PyAV 后端解码模式：全部帧 / 跳过非参考帧 / 只解码关键帧",
+                "default_value": "all",
+                "options": ["all", "nonref", "keyframe"],
+                "permission": ParamPermission.EDITABLE,
+                "requires_restart": True
+            },
             # 后处理参数
             {
                 "key": "min_box_area",
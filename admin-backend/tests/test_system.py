@@ -70,6 +70,25 @@ def test_root(client):
     assert data["status"] == "running"
 
 
+def test_detector_status(client, auth_headers):
+    """
+    函数级注释：测试读取主程序写入的检测服务就绪状态
+    """
+    storage = get_storage_manager()
+    storage.write("detector_status.json", {"state": "ready", "startup_seconds": 12.5, "updated_at": time.time()})
+
+    response = client.get("/api/v1/system/detector-status", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["state"] == "ready"
+    assert data["startup_seconds"] == 12.5
+    assert data["stale"] is False
+
+    storage.write("detector_status.json", {"state": "ready", "updated_at": time.time() - 600})
+    data = client.get("/api/v1/system/detector-status", headers=auth_headers).json()["data"]
+    assert data["stale"] is True
+
+
 def test_concurrent_reload(client, write_headers):
     """
     函数级注释：测试并发reload场景
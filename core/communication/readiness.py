@@ -0,0 +1,105 @@
+"""
+类级注释：检测服务就绪状态
+主程序重启后需要加载权重、预热模型、打开视频源，期间并没有火灾防护。
+ReadinessReporter 把启动阶段、就绪时间与首帧检测时间写入 admin-backend/config/detector_status.json
+（后台与主程序共享的配置目录），管理后台据此判断防护是否已经生效
+"""
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+STATUS_FILE = "detector_status.json"
+
+
+class ReadinessReporter:
+    """
+    类级注释：就绪状态发布器（线程安全）
+    状态依次为 loading（加载模型）→ warming_up（模型预热）→ ready（视频流已启动）→ stopped；
+    运行期间定期刷新 updated_at 作为心跳，后台可据此识别已退出但未来得及更新状态的进程
+    """
+
+    def __init__(self, status_path: Optional[str] = None, start_time: Optional[float] = None,
+                 heartbeat_interval: float = 30.0):
+        """
+        函数级注释：初始化就绪状态发布器
+        :param status_path: 状态文件路径，默认 admin-backend/config/detector_status.json
+        :param start_time: 进程启动时间戳，默认当前时间
+        :param heartbeat_interval: 心跳间隔（秒）
+        """
+        self.logger = logging.getLogger("Readiness")
+        if status_path is None:
+            project_root = Path(__file__).resolve().parent.parent.parent
+            status_path = str(project_root / "admin-backend" / "config" / STATUS_FILE)
+        self.status_path = status_path
+        self.start_time = time.time() if start_time is None else start_time
+        self.heartbeat_interval = heartbeat_interval
+        self.status: Dict[str, Any] = {
+            "state": "loading",
+            "pid": os.getpid(),
+            "started_at": self.start_time,
+            "ready_at": None,
+            "startup_seconds": None,
+            "first_detection_seconds": None,
+        }
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+
+    def publish(self, state: str, **fields: Any):
+        """
+        函数级注释：更新状态并写入状态文件
+        :param state: 启动阶段
+        :param fields: 附加字段
+        """
+        with self._lock:
+            self.status.update(fields)
+            self.status["state"] = state
+            self._write()
+
+    def ready(self, **fields: Any):
+        """
+        函数级注释：标记检测服务就绪，记录并输出从进程启动到就绪的耗时
+        """
+        now = time.time()
+        startup_seconds = round(now - self.start_time, 2)
+        self.publish("ready", ready_at=now, startup_seconds=startup_seconds, **fields)
+        self.logger.info(f"检测服务已就绪: 启动耗时 {startup_seconds}s")
+
+    def first_detection(self, stream_name: str):
+        """
+        函数级注释：记录首次完成检测的时间（只记录一次），即防护真正生效的时间
+        """
+        with self._lock:
+            if self.status["first_detection_seconds"] is not None:
+                return
+            seconds = round(time.time() - self.start_time, 2)
+            self.status["first_detection_seconds"] = seconds
+            self.status["first_detection_stream"] = stream_name
+            self._write()
+        self.logger.info(f"首帧检测完成: stream={stream_name}, 距进程启动 {seconds}s")
+
+    def heartbeat(self):
+        """
+        函数级注释：按心跳间隔刷新状态文件的 updated_at
+        """
+        with self._lock:
+            if time.time() - self._last_write >= self.heartbeat_interval:
+                self._write()
+
+    def _write(self):
+        """
+        函数级注释：原子写入状态文件（先写临时文件再替换），写入失败不影响检测
+        """
+        self._last_write = time.time()
+        self.status["updated_at"] = self._last_write
+        temp_path = self.status_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.status_path) or ".", exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.status, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.status_path)
+        except OSError as e:
+            self.logger.warning(f"写入就绪状态文件失败: {e}")
@@ -0,0 +1,326 @@
+"""
+类级注释：单路视频流检测上下文
+封装一路摄像头的抓帧、检测与报警确认状态，多路视频流在同一进程内各自独立运行
+"""
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from core.video.frame_grabber import LatestFrameGrabber
+from core.video.scheduler import DetectionScheduler
+
+
+def build_stream_config(config_loader, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    函数级注释：从热加载配置构建单路视频流的运行配置
+    :param config_loader: 配置热加载器
+    :param overrides: 该路视频流的覆盖项（来自 camera_sources），None 值不覆盖
+    :return: 配置字典
+    """
+    alert_interval = config_loader.get_config('alert_cooldown_seconds', 360)
+    camera_index = config_loader.get_config('camera_index', 0)
+    detection_interval = config_loader.get_config('detection_interval', 4)
+    consecutive_threshold = config_loader.get_config('consecutive_threshold', 6)
+    #rtsp摄像头参数
+    rtsp_url = config_loader.get_config('rtsp_url')
+    #onvif协议摄像头参数
+    onvif_use = config_loader.get_config('onvif_use', False)
+    onvif_ip = config_loader.get_config('onvif_ip')
+    onvif_port = config_loader.get_config('onvif_port')
+    onvif_username = config_loader.get_config('onvif_username')
+    onvif_password = config_loader.get_config('onvif_password')
+    #抓帧与检测调度参数
+    grab_skip_decode = config_loader.get_config('grab_skip_decode', True)
+    analysis_target_fps = config_loader.get_config('analysis_target_fps', 0)
+    analysis_latency_slo_ms = config_loader.get_config('analysis_latency_slo_ms', 1000)
+    #视频接入后端参数（重连时生效）
+    ingest_backend = config_loader.get_config('ingest_backend', 'opencv')
+    ingest_rtsp_transport = config_loader.get_config('ingest_rtsp_transport', 'tcp')
+    ingest_decoder_threads = config_loader.get_config('ingest_decoder_threads', 0)
+    ingest_low_delay = config_loader.get_config('ingest_low_delay', True)
+    ingest_decode_mode = config_loader.get_config('ingest_decode_mode', 'all')
+    #检测区域（归一化坐标多边形，通常在 camera_sources 中按摄像头配置）
+    roi_include = config_loader.get_config('roi_include')
+    roi_exclude = config_loader.get_config('roi_exclude')
+
+    config = {
+        'alert_interval': alert_interval,
+        'camera_index': camera_index,
+        'rtsp_url': rtsp_url,
+        'detection_interval': detection_interval,
+        'consecutive_threshold': consecutive_threshold,
+        'onvif_use': onvif_use,
+        'onvif_ip': onvif_ip,
+        'onvif_port': onvif_port,
+        'onvif_username': onvif_username,
+        'onvif_password': onvif_password,
+        'grab_skip_decode': grab_skip_decode,
+        'analysis_target_fps': analysis_target_fps,
+        'analysis_latency_slo_ms': analysis_latency_slo_ms,
+        'ingest_backend': ingest_backend,
+        'ingest_rtsp_transport': ingest_rtsp_transport,
+        'ingest_decoder_threads': ingest_decoder_threads,
+        'ingest_low_delay': ingest_low_delay,
+        'ingest_decode_mode': ingest_decode_mode,
+        'roi_include': roi_include,
+        'roi_exclude': roi_exclude,
+    }
+    for key, value in (overrides or {}).items():
+        if value is not None:
+            config[key] = value
+    return config
+
+
+class CameraStream:
+    """
+    类级注释：单路视频流
+    每路视频流持有自己的抓帧线程、检测器（背景建模与追踪器状态独立，模型可共享）和报警冷却状态
+    """
+
+    def __init__(
+            self,
+            name: str,
+            source: Any,
+            detector,
+            comm,
+            get_config: Callable[[], Dict[str, Any]],
+            buffer_size: Optional[int] = None,
+            display: bool = False,
+            alert_prefix: str = "fire_alert",
+            resolver=None,
+            on_first_analysis: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        函数级注释：初始化视频流
+        :param name: 视频流名称
+        :param source: 视频源（RTSP 地址或摄像头索引）
+        :param detector: 该路视频流专用的 Detector 实例
+        :param comm: 通信模块，用于发送报警
+        :param get_config: 返回该路视频流最新配置的函数
+        :param buffer_size: 抓帧缓冲区大小
+        :param display: 是否保留标注画面供主线程显示
+        :param alert_prefix: 报警截图文件名前缀
+        :param resolver: 视频源解析器，重连时用于重新获取 ONVIF 地址
+        :param on_first_analysis: 首次完成检测时的回调，参数为视频流名称（用于统计防护生效时间）
+        """
+        self.logger = logging.getLogger(f"CameraStream[{name}]")
+        self.name = name
+        self.source = source
+        self.detector = detector
+        self.comm = comm
+        self.get_config = get_config
+        self.display = display
+        self.alert_prefix = alert_prefix
+        self.on_first_analysis = on_first_analysis
+
+        config = get_config()
+        self.grabber = LatestFrameGrabber(
+            source,
+            name=name,
+            buffer_size=buffer_size,
+            resolver=resolver,
+            backend=config.get('ingest_backend', 'opencv'),
+            ingest_options={
+                'transport': config.get('ingest_rtsp_transport', 'tcp'),
+                'decoder_threads': config.get('ingest_decoder_threads', 0),
+                'low_delay': config.get('ingest_low_delay', True),
+                'decode_mode': config.get('ingest_decode_mode', 'all'),
+            },
+        )
+
+        # 报警确认状态（每路独立）
+        self.last_alert_time = 0
+        self.consecutive_fire_detections = 0
+        self.fire_state_active = False
+
+        # 检测调度（每路独立测量检测耗时与帧率）
+        self.scheduler = DetectionScheduler()
+        self._last_stats_log = time.time()
+
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._display_lock = threading.Lock()
+        self._display_frame: Optional[np.ndarray] = None
+
+    def start(self) -> bool:
+        """
+        函数级注释：打开视频源
+        :return: 是否打开成功
+        """
+        if not self.grabber.start():
+            return False
+        self._running = True
+        self.logger.info(f"视频源打开成功: {self.source}")
+        return True
+
+    def start_thread(self):
+        """
+        函数级注释：在后台线程中运行检测循环
+        """
+        self._thread = threading.Thread(target=self.run, name=f"CameraStream-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        函数级注释：停止检测循环并释放视频源
+        """
+        self._running = False
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5.0)
+        self.grabber.stop()
+
+    @property
+    def is_running(self) -> bool:
+        """
+        函数级注释：检测循环是否仍在运行
+        """
+        return self._running and self.grabber.is_running
+
+    def pop_display_frame(self) -> Optional[np.ndarray]:
+        """
+        函数级注释：取出最新的待显示画面
+        :return: 标注后的画面，没有新画面时返回 None
+        """
+        with self._display_lock:
+            frame = self._display_frame
+            self._display_frame = None
+            return frame
+
+    def run(self):
+        """
+        函数级注释：检测循环，直到视频源失效或被停止
+        """
+        while self.is_running:
+            try:
+                self.step()
+            except Exception as e:
+                self.logger.exception(f"视频流处理异常: {e}")
+        self._running = False
+
+    def step(self, timeout: float = 1.0):
+        """
+        函数级注释：处理一帧最新画面
+        :param timeout: 等待新帧的最长时间（秒）
+        """
+        # 每次循环获取最新配置
+        config = self.get_config()
+
+        self.scheduler.configure_from(config)
+        # 检测区域配置未变化时 set_roi 直接返回
+        self.detector.set_roi(config.get('roi_include'), config.get('roi_exclude'))
+        # 只解码关键帧等稀疏解码模式下，交付的每一帧都已是稀疏采样结果
+        self.scheduler.sparse_source = self.grabber.sparse_decode
+
+        # 无界面模式下不需要显示每一帧：抓帧线程对跳过的帧只 grab 不 retrieve，仅解码需要分析的帧
+        if not self.display and config.get('grab_skip_decode', True):
+            self.grabber.decode_every = self.scheduler.decode_every
+        else:
+            self.grabber.decode_every = 1
+
+        ret, frame, frame_seq, frame_time = self.grabber.read(timeout=timeout)
+        if not ret:
+            return
+
+        # 抓帧线程每次交付新数组，detect_frame 也在副本上绘制，这里无需再拷贝
+        annotated_frame = frame
+
+        # 由调度器按目标分析帧率与延迟 SLO 决定是否检测（未配置目标帧率时每 DETECTION_INTERVAL 帧检测一次）
+        if self.scheduler.should_analyze(frame_seq, frame_time):
+            start = time.time()
+            try:
+                annotated_frame, detections = self.detector.detect_frame(frame, draw=True)
+            except Exception as e:
+                self.logger.exception(f"Detector 单帧检测失败，已跳过当前帧: {e}")
+                return
+            finally:
+                self.scheduler.record(time.time() - start)
+
+            if self.on_first_analysis is not None:
+                callback, self.on_first_analysis = self.on_first_analysis, None
+                callback(self.name)
+            self._handle_detections(detections, annotated_frame, config)
+
+        self._log_stats()
+
+        if self.display:
+            with self._display_lock:
+                self._display_frame = annotated_frame
+
+    def _log_stats(self, interval: float = 60.0):
+        """
+        函数级注释：定期输出抓帧与调度统计
+        """
+        now = time.time()
+        if now - self._last_stats_log < interval:
+            return
+        self._last_stats_log = now
+        self.logger.info(f"抓帧统计: {self.grabber.stats()}，调度统计: {self.scheduler.stats()}")
+        cache_stats = self.detector.frame_cache_stats()
+        if cache_stats["lookups"]:
+            self.logger.info(f"近重复帧缓存统计: {cache_stats}")
+
+    def _handle_detections(self, detections: List[Dict], annotated_frame: np.ndarray, config: Dict[str, Any]):
+        """
+        函数级注释：根据检测结果更新报警确认状态，满足条件时触发报警
+        """
+        # 检查是否存在 Level 3 (高级确认) 的火灾或烟雾
+        # 在 Detector V2.0 中，warning_level=3 意味着已经通过了多模态验证和连续多帧的追踪
+        is_confirmed_danger = False
+        has_l2_warning = False
+        danger_types = set()
+
+        for det in detections:
+            if det.get('warning_level', 0) == 3:
+                is_confirmed_danger = True
+                danger_types.add(det.get('cls_name', 'unknown'))
+            elif det.get('warning_level', 0) == 2:
+                has_l2_warning = True
+
+        danger_desc = " 和 ".join(danger_types)
+        if is_confirmed_danger:
+            self.consecutive_fire_detections += 1
+            if not self.fire_state_active:
+                self.fire_state_active = True
+                self.logger.warning(f"🚨 Detector已确认高级预警 ({danger_desc})，进入最终报警确认阶段...")
+        else:
+            if has_l2_warning:
+                self.logger.info("⚠️ 检测到持续 L2 预警目标，继续观察，不触发正式报警")
+            if self.consecutive_fire_detections > 0:
+                self.logger.info(f"危险目标消失或降级，报警计数重置 (上次计数: {self.consecutive_fire_detections})")
+            self.consecutive_fire_detections = 0
+            self.fire_state_active = False
+
+        # 为了防止网络抖动导致的偶然丢失，这里仍然保留一个极小的连续确认阈值 (建议在配置里把 threshold 调小，比如 2-3)
+        # 因为 Detector 内部已经做过连续 5 帧的严格校验了
+        if self.consecutive_fire_detections < config['consecutive_threshold']:
+            return
+
+        current_time = time.time()
+        if current_time - self.last_alert_time > config['alert_interval']:
+            self.logger.warning(f"🔥 触发正式报警: 已确认存在 {danger_desc}!")
+            self.last_alert_time = current_time
+
+            # 保存带有检测框的图片用于报警
+            image_path = f"output/{self.alert_prefix}_{int(current_time)}.jpg"
+            cv2.imwrite(image_path, annotated_frame)
+            self.logger.info(f"报警截图已保存: {image_path}")
+
+            # 启动报警线程
+            alarm_thread = threading.Thread(
+                target=self.comm.run_fire_alarm_process_feishu,
+                args=(image_path,)
+            )
+            alarm_thread.start()
+
+            # 报警后重置计数器
+            self.consecutive_fire_detections = 0
+            self.fire_state_active = False
+        else:
+            remaining = int(config['alert_interval'] - (current_time - self.last_alert_time))
+            if remaining < 0:
+                remaining = 0
+            self.logger.info(f"报警冷却中，剩余 {remaining}s，本次不重复触发")
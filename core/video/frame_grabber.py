@@ -0,0 +1,338 @@
+"""
+类级注释：最新帧抓取器
+在独立线程中持续读取视频源，仅保留最新解码的一帧（单槽缓冲），
+检测循环从这里取帧，使采集到决策的延迟不超过一次推理耗时，而不会随 RTSP 积压增长。
+视频源断开时在抓帧线程内按指数退避重连，不阻塞检测循环和其他视频流
+"""
+import time
+import random
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from core.video.ingest import open_video_capture
+
+
+class ReconnectBackoff:
+    """
+    类级注释：带随机抖动的指数退避
+    第 n 次重连失败后等待 initial * 2^n 秒（不超过 maximum），再乘以 [1 - jitter, 1 + jitter] 的随机系数，
+    避免多路摄像头在同一台 NVR 恢复时同时发起重连
+    """
+
+    def __init__(self, initial: float = 0.5, maximum: float = 30.0, jitter: float = 0.3,
+                 rng: Optional[random.Random] = None):
+        """
+        函数级注释：初始化退避策略
+        :param initial: 首次重连失败后的等待时间（秒）
+        :param maximum: 等待时间上限（秒）
+        :param jitter: 随机抖动比例
+        :param rng: 随机数生成器，便于测试时固定种子
+        """
+        self.initial = initial
+        self.maximum = maximum
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.attempts = 0
+
+    def next_delay(self) -> float:
+        """
+        函数级注释：获取下一次重连前的等待时间，并累加失败次数
+        """
+        base = min(self.maximum, self.initial * (2 ** self.attempts))
+        self.attempts += 1
+        return base * self.rng.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+    def reset(self):
+        """
+        函数级注释：重连成功后重置退避
+        """
+        self.attempts = 0
+
+
+class LatestFrameGrabber:
+    """
+    类级注释：单视频源抓帧线程
+    后台线程不断读取新帧覆盖单槽缓冲，未被消费就被覆盖的帧计入丢帧计数
+    """
+
+    def __init__(
+            self,
+            source: Any,
+            name: str = "camera",
+            buffer_size: Optional[int] = None,
+            max_read_errors: int = 10,
+            decode_every: int = 1,
+            resolver=None,
+            backoff: Optional[ReconnectBackoff] = None,
+            max_reconnect_attempts: int = 0,
+            backend: str = "opencv",
+            ingest_options: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        函数级注释：初始化抓帧器
+        :param source: 视频源（RTSP 地址或摄像头索引）
+        :param name: 视频源名称，用于日志
+        :param buffer_size: 设置 CAP_PROP_BUFFERSIZE，None 表示不设置
+        :param max_read_errors: 连续读帧失败多少次后进入重连状态
+        :param decode_every: 每抓取多少帧完整解码一帧；大于 1 时其余帧只 grab 不 retrieve，
+                             视频流照常被读空，但跳过的帧不做颜色转换与拷贝（无界面模式使用）
+        :param resolver: 视频源解析器（VideoSourceResolver），缓存地址重连失败时用于重新获取地址
+        :param backoff: 重连退避策略，默认 0.5s 起、上限 30s
+        :param max_reconnect_attempts: 最多连续重连失败次数，0 表示一直重试
+        :param backend: 接入后端，opencv 或 pyav
+        :param ingest_options: PyAV 后端参数（transport / decoder_threads / low_delay / timeout / decode_mode）
+        """
+        self.logger = logging.getLogger(f"FrameGrabber[{name}]")
+        self.source = source
+        self.name = name
+        self.buffer_size = buffer_size
+        self.max_read_errors = max_read_errors
+        self.decode_every = max(1, int(decode_every))
+        self.resolver = resolver
+        self.backoff = backoff or ReconnectBackoff()
+        self.max_reconnect_attempts = max_reconnect_attempts
+        self.backend = backend
+        self.ingest_options = dict(ingest_options or {})
+
+        self._cap: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._failed = False
+        self._reconnecting = False
+        self._stop_event = threading.Event()
+
+        # 单槽缓冲：只保存最新一帧及其序号、采集时间
+        self._cond = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_seq = 0
+        self._frame_time = 0.0
+
+        # 统计计数
+        self.frames_captured = 0
+        self.frames_consumed = 0
+        self.frames_dropped = 0
+        self.frames_skipped = 0
+        self.read_errors = 0
+        self.reconnects = 0
+        self.reconnect_failures = 0
+
+    def _open_capture(self) -> bool:
+        """
+        函数级注释：打开视频源
+        :return: 是否打开成功
+        """
+        cap = open_video_capture(self.source, backend=self.backend, buffer_size=self.buffer_size,
+                                 options=self.ingest_options)
+        self._cap = cap
+        return cap.isOpened()
+
+    def start(self) -> bool:
+        """
+        函数级注释：打开视频源并启动后台抓帧线程
+        :return: 视频源是否打开成功
+        """
+        if self._running:
+            return True
+        if not self._open_capture():
+            self.logger.error(f"无法打开视频源: {self.source}")
+            return False
+
+        self._running = True
+        self._failed = False
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._capture_loop,
+            name=f"FrameGrabber-{self.name}",
+            daemon=True
+        )
+        self._thread.start()
+        self.logger.info(f"抓帧线程已启动: {self.source}")
+        return True
+
+    def stop(self):
+        """
+        函数级注释：停止抓帧线程并释放视频源
+        """
+        self._running = False
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        self.logger.info(f"抓帧线程已停止，统计: {self.stats()}")
+
+    @property
+    def is_running(self) -> bool:
+        """
+        函数级注释：抓帧线程是否仍在运行（重连中仍为 True，超过最大重连次数后为 False）
+        """
+        return self._running and not self._failed
+
+    @property
+    def sparse_decode(self) -> bool:
+        """
+        函数级注释：当前视频源是否为稀疏解码（只交付关键帧或参考帧），此时每一帧都应送检
+        """
+        return getattr(self._cap, "decode_mode", "all") != "all"
+
+    @property
+    def is_reconnecting(self) -> bool:
+        """
+        函数级注释：是否处于重连状态
+        """
+        return self._reconnecting
+
+    def _publish(self, frame: np.ndarray, seq: int):
+        """
+        函数级注释：将新帧写入单槽缓冲，覆盖未消费的旧帧
+        """
+        with self._cond:
+            if self._frame is not None:
+                self.frames_dropped += 1
+            self._frame = frame
+            self._frame_seq = seq
+            self._frame_time = time.time()
+            self._cond.notify_all()
+
+    def _read_next(self, seq: int) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        函数级注释：从视频源读取下一帧
+        decode_every 大于 1 时，只对需要分析的帧执行 retrieve，其余帧仅 grab 以保持视频流被读空
+        :param seq: 即将读取的帧序号
+        :return: (是否读取成功, 解码后的帧；仅 grab 的帧为 None)
+        """
+        decode_every = self.decode_every
+        if decode_every <= 1:
+            return self._cap.read()
+
+        if not self._cap.grab():
+            return False, None
+        if seq % decode_every != 0:
+            self.frames_skipped += 1
+            return True, None
+        return self._cap.retrieve()
+
+    def _reopen(self) -> bool:
+        """
+        函数级注释：释放并重新打开视频源
+        先重试当前（缓存的）地址，失败后若视频源来自 ONVIF 则重新查询地址再试
+        :return: 是否重连成功
+        """
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        if self._open_capture():
+            return True
+
+        if self.resolver is not None and self.resolver.can_refresh:
+            new_source = self.resolver.resolve(refresh=True)
+            if new_source != self.source:
+                self.logger.info("ONVIF 返回了新的视频源地址，使用新地址重连")
+                self.source = new_source
+                if self._cap is not None:
+                    self._cap.release()
+                    self._cap = None
+                return self._open_capture()
+        return False
+
+    def _reconnect_loop(self) -> bool:
+        """
+        函数级注释：重连状态：按指数退避反复尝试打开视频源，只阻塞本路抓帧线程
+        :return: 是否重连成功（被停止或超过最大重连次数时返回 False）
+        """
+        self._reconnecting = True
+        try:
+            while self._running:
+                if self._reopen():
+                    self.reconnects += 1
+                    self.backoff.reset()
+                    self.logger.info("视频源重新连接成功")
+                    return True
+
+                self.reconnect_failures += 1
+                if 0 < self.max_reconnect_attempts <= self.backoff.attempts + 1:
+                    self.logger.error(f"视频源连续 {self.backoff.attempts + 1} 次重连失败，停止抓帧")
+                    return False
+                delay = self.backoff.next_delay()
+                self.logger.warning(f"视频源重新连接失败，{delay:.1f}s 后重试（第 {self.backoff.attempts} 次）")
+                # 可被 stop() 立即打断的等待
+                if self._stop_event.wait(delay):
+                    return False
+            return False
+        finally:
+            self._reconnecting = False
+
+    def _capture_loop(self):
+        """
+        函数级注释：抓帧循环
+        读帧连续失败达到 max_read_errors 次后进入重连状态，重连成功后继续抓帧
+        """
+        consecutive_read_errors = 0
+        seq = 0
+        while self._running:
+            ret, frame = self._read_next(seq + 1)
+            if not ret:
+                consecutive_read_errors += 1
+                self.read_errors += 1
+                if consecutive_read_errors < self.max_read_errors:
+                    # 短暂等待后重试，容忍偶发的读帧失败
+                    self._stop_event.wait(0.05)
+                    continue
+
+                self.logger.error(f"连续 {consecutive_read_errors} 次无法读取视频帧，尝试重新连接...")
+                consecutive_read_errors = 0
+                if not self._reconnect_loop():
+                    if self._running:
+                        self._failed = True
+                    with self._cond:
+                        self._cond.notify_all()
+                    break
+                continue
+
+            consecutive_read_errors = 0
+            seq += 1
+            if frame is not None:
+                self._publish(frame, seq)
+            # 发布后再计数，保证 frames_captured 可见时对应的帧已在缓冲中
+            self.frames_captured += 1
+
+    def read(self, timeout: float = 1.0) -> Tuple[bool, Optional[np.ndarray], int, float]:
+        """
+        函数级注释：获取最新一帧（阻塞等待比上次取到的更新的帧）
+        :param timeout: 最长等待时间（秒）
+        :return: (是否成功, 帧, 帧序号, 采集时间戳)
+        """
+        deadline = time.time() + timeout
+        with self._cond:
+            while self._frame is None:
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self.is_running:
+                    return False, None, self._frame_seq, 0.0
+                self._cond.wait(remaining)
+
+            frame = self._frame
+            self._frame = None
+            self.frames_consumed += 1
+            return True, frame, self._frame_seq, self._frame_time
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        函数级注释：获取抓帧统计
+        :return: 统计字典
+        """
+        return {
+            "captured": self.frames_captured,
+            "consumed": self.frames_consumed,
+            "dropped": self.frames_dropped,
+            "skipped": self.frames_skipped,
+            "read_errors": self.read_errors,
+            "reconnects": self.reconnects,
+            "reconnect_failures": self.reconnect_failures,
+            "reconnecting": self._reconnecting,
+        }
@@ -0,0 +1,215 @@
+"""
+类级注释：视频接入后端
+提供 OpenCV 与 PyAV 两种拉流解码实现，统一为 cv2.VideoCapture 风格的接口（read / grab / retrieve / release），
+由 system.json 的 ingest_backend 选择。OpenCV 的 FFmpeg 构建往往忽略 CAP_PROP_BUFFERSIZE，
+PyAV 后端可直接控制 RTSP 传输协议、低延迟标志与解码线程数，并支持只解码关键帧等稀疏解码模式
+"""
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    import av
+except ImportError:
+    av = None
+
+logger = logging.getLogger("Ingest")
+
+INGEST_BACKENDS = ("opencv", "pyav")
+
+# 解码模式 -> FFmpeg 解码器 skip_frame 取值
+#   all: 解码全部帧；nonref: 跳过非参考帧（通常为 B 帧）；keyframe: 只解码关键帧
+DECODE_MODES = {
+    "all": "DEFAULT",
+    "nonref": "NONREF",
+    "keyframe": "NONKEY",
+}
+
+
+class PyAVCapture:
+    """
+    类级注释：基于 PyAV 的视频源
+    直接从 FFmpeg 解码器取帧并一次性转换为 BGR ndarray（to_ndarray 的结果即最终数组，无额外拷贝）
+    """
+
+    def __init__(self, source: str, transport: str = "tcp", decoder_threads: int = 0,
+                 low_delay: bool = True, timeout: float = 5.0, extra_options: Optional[Dict[str, str]] = None,
+                 decode_mode: str = "all"):
+        """
+        函数级注释：打开视频源
+        :param source: 视频源地址（RTSP 地址或文件路径）
+        :param transport: RTSP 传输协议，tcp 或 udp
+        :param decoder_threads: 解码线程数，0 表示由 FFmpeg 自动决定
+        :param low_delay: 是否开启低延迟（网络流关闭输入缓冲，并设置解码器 LOW_DELAY 标志）
+        :param timeout: 打开与读取的超时时间（秒）
+        :param extra_options: 透传给 FFmpeg 的其他选项
+        :param decode_mode: 解码模式，all / nonref / keyframe（见 DECODE_MODES）；
+                            keyframe 模式下非关键帧数据包直接丢弃，不送入解码器
+        """
+        if decode_mode not in DECODE_MODES:
+            logger.warning(f"未知的解码模式 {decode_mode}，使用 all")
+            decode_mode = "all"
+        self.source = source
+        self.decode_mode = decode_mode
+        self.packets_skipped = 0
+        self._container = None
+        self._stream = None
+        self._frames = None
+        self._pending = None
+        self._opened = False
+
+        options: Dict[str, str] = {}
+        if str(source).lower().startswith(("rtsp://", "rtsps://")):
+            options["rtsp_transport"] = transport
+            # 套接字超时，单位微秒
+            options["timeout"] = str(int(timeout * 1_000_000))
+        if low_delay and "://" in str(source):
+            # 仅对网络流关闭输入缓冲：nobuffer 会丢弃探测阶段读取的数据包，本地文件会因此少一帧
+            options["fflags"] = "nobuffer"
+            options["max_delay"] = "0"
+        options.update({str(k): str(v) for k, v in (extra_options or {}).items()})
+
+        try:
+            self._container = av.open(str(source), options=options, timeout=timeout)
+            self._stream = self._container.streams.video[0]
+        except Exception as e:
+            logger.error(f"PyAV 打开视频源失败: {source}, {e}")
+            self.release()
+            return
+
+        codec_context = self._stream.codec_context
+        self._stream.thread_type = "AUTO"
+        codec_context.thread_count = max(0, int(decoder_threads))
+        codec_context.skip_frame = DECODE_MODES[decode_mode]
+        if low_delay:
+            flags = getattr(getattr(av.codec, "context", None), "Flags", None)
+            if flags is not None and hasattr(flags, "low_delay"):
+                codec_context.flags |= flags.low_delay
+
+        self._frames = self._decode_frames()
+        self._opened = True
+
+    def _decode_frames(self):
+        """
+        函数级注释：解复用并解码视频帧
+        keyframe 模式下在解复用阶段丢弃非关键帧数据包（空数据包用于冲刷解码器，需保留）
+        """
+        for packet in self._container.demux(self._stream):
+            if self.decode_mode == "keyframe" and packet.size and not packet.is_keyframe:
+                self.packets_skipped += 1
+                continue
+            for frame in packet.decode():
+                yield frame
+
+    def isOpened(self) -> bool:
+        """
+        函数级注释：视频源是否打开成功
+        """
+        return self._opened
+
+    def set(self, prop_id: int, value: Any) -> bool:
+        """
+        函数级注释：兼容 cv2.VideoCapture.set，PyAV 后端的参数在打开时指定，这里不生效
+        """
+        return False
+
+    def get(self, prop_id: int) -> float:
+        """
+        函数级注释：兼容 cv2.VideoCapture.get，支持帧率与分辨率
+        """
+        if self._stream is None:
+            return 0.0
+        if prop_id == cv2.CAP_PROP_FPS:
+            rate = self._stream.average_rate or self._stream.base_rate
+            return float(rate) if rate else 0.0
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self._stream.codec_context.width or 0)
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self._stream.codec_context.height or 0)
+        return 0.0
+
+    def grab(self) -> bool:
+        """
+        函数级注释：解码下一帧但不做颜色转换
+        """
+        if not self._opened:
+            return False
+        try:
+            self._pending = next(self._frames)
+            return True
+        except StopIteration:
+            self._pending = None
+            return False
+        except Exception as e:
+            logger.warning(f"PyAV 解码失败: {e}")
+            self._pending = None
+            return False
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        函数级注释：将 grab 得到的帧转换为 BGR ndarray
+        """
+        frame = self._pending
+        self._pending = None
+        if frame is None:
+            return False, None
+        return True, frame.to_ndarray(format="bgr24")
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        函数级注释：读取并转换下一帧
+        """
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def release(self):
+        """
+        函数级注释：关闭视频源
+        """
+        self._opened = False
+        self._frames = None
+        self._pending = None
+        self._stream = None
+        if self._container is not None:
+            try:
+                self._container.close()
+            except Exception:
+                pass
+            self._container = None
+
+
+def open_video_capture(source: Any, backend: str = "opencv", buffer_size: Optional[int] = None,
+                       options: Optional[Dict[str, Any]] = None):
+    """
+    函数级注释：按接入后端打开视频源
+    PyAV 未安装、视频源为本地摄像头索引或后端名称无效时回退 OpenCV
+    :param source: 视频源（RTSP 地址、文件路径或摄像头索引）
+    :param backend: 接入后端，opencv 或 pyav
+    :param buffer_size: OpenCV 的 CAP_PROP_BUFFERSIZE，None 表示不设置
+    :param options: PyAV 参数（transport / decoder_threads / low_delay / timeout / extra_options / decode_mode）
+    :return: cv2.VideoCapture 或 PyAVCapture
+    """
+    backend = (backend or "opencv").lower()
+    if backend not in INGEST_BACKENDS:
+        logger.warning(f"未知的接入后端 {backend}，使用 opencv")
+        backend = "opencv"
+
+    decode_mode = (options or {}).get("decode_mode", "all")
+    if backend == "pyav":
+        if av is None:
+            logger.warning("未安装 PyAV，接入后端回退为 opencv")
+        elif isinstance(source, int):
+            logger.warning("PyAV 后端不支持本地摄像头索引，接入后端回退为 opencv")
+        else:
+            return PyAVCapture(source, **(options or {}))
+
+    if decode_mode != "all":
+        logger.warning(f"解码模式 {decode_mode} 需要 PyAV 后端，OpenCV 后端将解码全部帧")
+    cap = cv2.VideoCapture(source)
+    if buffer_size is not None:
+        # 设置缓冲区大小，减少延迟
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    return cap
@@ -0,0 +1,305 @@
+"""
+类级注释：多进程视频流水线
+每路摄像头在独立的工作进程中完成解码、背景建模、光照补偿、多模态校验与追踪，
+增强后的帧通过共享内存环形缓冲交给唯一的推理进程执行 YOLO，检测结果再回传给工作进程。
+解码与校验不再争抢同一个 GIL，摄像头数量可随 CPU 核数近似线性扩展
+"""
+import os
+import time
+import queue
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.video.shm_ring import SharedFrameRing
+from core.yolo.batcher import Histogram
+from core.yolo.detections import DetectionBatch
+
+
+class RemoteDetector:
+    """
+    类级注释：远程推理检测器
+    对外提供与 Detector.detect_frame 相同的接口：预处理与后处理在本进程完成，
+    YOLO 推理通过共享内存交给推理进程
+    """
+
+    # 每个工作进程最多保留的环形缓冲数（整帧、检测区域裁剪与切片的形状各占一个）
+    MAX_RINGS = 4
+
+    def __init__(self, detector, worker_id: int, request_queue, response_queue,
+                 ring_slots: int = 4, timeout: float = 5.0):
+        """
+        函数级注释：初始化远程推理检测器
+        :param detector: 不加载模型的本地 Detector（负责预处理、校验与追踪）
+        :param worker_id: 工作进程编号，用于推理进程路由结果
+        :param request_queue: 推理请求队列（所有工作进程共享）
+        :param response_queue: 本工作进程的推理结果队列
+        :param ring_slots: 共享内存环形缓冲槽位数
+        :param timeout: 等待推理结果的最长时间（秒）
+        """
+        self.logger = logging.getLogger(f"RemoteDetector[{worker_id}]")
+        self.detector = detector
+        # 本地 Detector 的推理阶段改为提交给推理进程，其余阶段（含检测区域裁剪与运动门控）在本进程完成
+        self.detector.inference_client = self._request_inference
+        self.detector.inference_batch_client = self._request_inference_many
+        self.worker_id = worker_id
+        self.request_queue = request_queue
+        self.response_queue = response_queue
+        self.ring_slots = ring_slots
+        self.timeout = timeout
+
+        self._rings: Dict[Tuple[int, ...], SharedFrameRing] = {}
+        self._seq = 0
+
+    def _ensure_ring(self, shape: Tuple[int, ...], slots: int = 0) -> SharedFrameRing:
+        """
+        函数级注释：按帧形状准备环形缓冲
+        每种形状各用一个缓冲，整帧与切片交替提交时不会反复重建；槽位数少于一次提交的帧数时重建，
+        超过 MAX_RINGS 种形状时释放最早创建的缓冲
+        :param slots: 一次提交的帧数
+        """
+        shape = tuple(shape)
+        slots = max(self.ring_slots, slots)
+        ring = self._rings.get(shape)
+        if ring is not None and ring.slots >= slots:
+            return ring
+        if ring is not None:
+            self._rings.pop(shape).close()
+        while len(self._rings) >= self.MAX_RINGS:
+            self._rings.pop(next(iter(self._rings))).close()
+        ring = SharedFrameRing.create(shape, slots=slots)
+        self._rings[shape] = ring
+        self.logger.info(f"已创建共享内存环形缓冲: name={ring.name}, shape={shape}, slots={slots}")
+        return ring
+
+    def _request_inference(self, enhanced_frame: np.ndarray, imgsz: int) -> Optional[DetectionBatch]:
+        """
+        函数级注释：写入共享内存并等待推理进程返回原始检测结果
+        :param imgsz: 推理尺寸（检测区域裁剪后按比例缩小）
+        :return: 原始检测结果，超时或推理失败时返回 None
+        """
+        return self._request_inference_many([enhanced_frame], imgsz)[0]
+
+    def _request_inference_many(self, frames: List[np.ndarray], imgsz: int) -> List[Optional[DetectionBatch]]:
+        """
+        函数级注释：一次提交多帧（如同一帧的多个运动切片），全部写入共享内存并入队后再等待结果，
+        推理进程可以把它们合并为一次批量前向
+        :return: 与 frames 一一对应的原始检测结果，超时或推理失败的帧为 None
+        """
+        counts: Dict[Tuple[int, ...], int] = {}
+        for frame in frames:
+            counts[frame.shape] = counts.get(frame.shape, 0) + 1
+        rings = {shape: self._ensure_ring(shape, count) for shape, count in counts.items()}
+
+        pending: Dict[int, int] = {}
+        for index, frame in enumerate(frames):
+            ring = rings[frame.shape]
+            slot = ring.write(frame)
+            self._seq += 1
+            pending[self._seq] = index
+            self.request_queue.put((self.worker_id, ring.name, ring.shape, ring.slots, slot, self._seq, imgsz))
+
+        results: List[Optional[DetectionBatch]] = [None] * len(frames)
+        deadline = time.time() + self.timeout
+        while pending:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                self.logger.warning(f"等待推理结果超时 ({self.timeout}s)，跳过当前帧")
+                break
+            try:
+                resp_seq, raw_detections = self.response_queue.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            # 丢弃之前超时请求的迟到结果
+            index = pending.pop(resp_seq, None)
+            if index is not None:
+                results[index] = raw_detections
+        return results
+
+    def detect_frame(self, frame: np.ndarray, draw: bool = True) -> Tuple[np.ndarray, List[Dict]]:
+        """
+        函数级注释：单帧检测（接口与 Detector.detect_frame 一致）
+        静止画面被运动门控跳过时不提交推理请求，推理进程的算力留给有运动的摄像头
+        """
+        return self.detector.detect_frame(frame, draw=draw)
+
+    def set_roi(self, include: Any = None, exclude: Any = None):
+        """
+        函数级注释：设置检测区域（见 Detector.set_roi）
+        """
+        self.detector.set_roi(include, exclude)
+
+    def frame_cache_stats(self) -> Dict[str, Any]:
+        """
+        函数级注释：近重复帧缓存统计（见 Detector.frame_cache_stats）
+        """
+        return self.detector.frame_cache_stats()
+
+    def close(self):
+        """
+        函数级注释：释放共享内存
+        """
+        for ring in self._rings.values():
+            ring.close()
+        self._rings.clear()
+
+
+class InferenceServer:
+    """
+    类级注释：集中推理服务
+    持有唯一一份 YOLO 模型，从共享内存读取各工作进程提交的帧并返回原始检测结果；
+    max_batch 大于 1 时把多个工作进程的请求合并为一次批量前向
+    """
+
+    def __init__(self, detector, request_queue, response_queues: List[Any], max_batch: int = 1,
+                 max_wait_ms: float = 0.0):
+        """
+        函数级注释：初始化推理服务
+        :param detector: 已加载模型的 Detector
+        :param request_queue: 推理请求队列
+        :param response_queues: 各工作进程的结果队列，按 worker_id 索引
+        :param max_batch: 单次前向的最大帧数
+        :param max_wait_ms: 收到第一个请求后继续凑批的最长等待时间（毫秒）
+        """
+        self.logger = logging.getLogger("InferenceServer")
+        self.detector = detector
+        self.request_queue = request_queue
+        self.response_queues = response_queues
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self._rings: Dict[Tuple[int, Tuple[int, ...]], SharedFrameRing] = {}
+        self.requests_served = 0
+        self.batch_size_hist = Histogram(range(1, self.max_batch + 1))
+
+    def _get_ring(self, worker_id: int, name: str, shape: Tuple[int, ...], slots: int) -> SharedFrameRing:
+        """
+        函数级注释：挂载工作进程的环形缓冲（每种帧形状一个），工作进程重建缓冲后重新挂载
+        """
+        key = (worker_id, tuple(shape))
+        ring = self._rings.get(key)
+        if ring is None or ring.name != name:
+            if ring is not None:
+                self._rings.pop(key).close()
+            worker_keys = [k for k in self._rings if k[0] == worker_id]
+            # 工作进程已释放的缓冲不再使用，与工作进程保持相同的数量上限
+            for stale in worker_keys[:max(0, len(worker_keys) - RemoteDetector.MAX_RINGS + 1)]:
+                self._rings.pop(stale).close()
+            ring = SharedFrameRing.attach(name, shape, slots)
+            self._rings[key] = ring
+        return ring
+
+    def _collect(self, timeout: float) -> List[Tuple]:
+        """
+        函数级注释：阻塞等待第一个请求，之后在 max_wait_ms 内继续凑批
+        """
+        try:
+            batch = [self.request_queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.time() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.time()
+            try:
+                batch.append(self.request_queue.get(timeout=remaining) if remaining > 0
+                             else self.request_queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def serve_once(self, timeout: float = 0.5) -> bool:
+        """
+        函数级注释：处理一批推理请求（推理尺寸相同的请求合并为一次前向）
+        :param timeout: 等待请求的最长时间（秒）
+        :return: 是否处理了请求
+        """
+        batch = self._collect(timeout)
+        if not batch:
+            return False
+
+        self.detector._refresh_runtime_config(force=False)
+        groups: Dict[int, List[Tuple[Tuple, np.ndarray]]] = {}
+        for request in batch:
+            worker_id, name, shape, slots, slot, seq, imgsz = request
+            try:
+                view = self._get_ring(worker_id, name, shape, slots).view(slot)
+            except Exception as e:
+                self.logger.exception(f"挂载工作进程 {worker_id} 的共享内存失败: {e}")
+                self.response_queues[worker_id].put((seq, None))
+                continue
+            groups.setdefault(imgsz, []).append((request, view))
+
+        for imgsz, items in groups.items():
+            try:
+                if len(items) == 1:
+                    results = [self.detector.infer(items[0][1], imgsz=imgsz)[0]]
+                else:
+                    results = self.detector.infer_batch([view for _, view in items], imgsz=imgsz)
+            except Exception as e:
+                self.logger.exception(f"处理推理请求失败: {e}")
+                results = [None] * len(items)
+            self.batch_size_hist.observe(len(items))
+            for (request, _), raw_detections in zip(items, results):
+                worker_id, seq = request[0], request[5]
+                self.response_queues[worker_id].put((seq, raw_detections))
+        self.requests_served += len(batch)
+        return True
+
+    def close(self):
+        """
+        函数级注释：断开所有共享内存挂载
+        """
+        for ring in self._rings.values():
+            ring.close()
+        self._rings.clear()
+
+
+def run_camera_worker(worker_id: int, name: str, resolver, stream_cfg: Dict[str, Any],
+                      detector_kwargs: Dict[str, Any], request_queue, response_queue,
+                      stop_event, log_dir: str, buffer_size: Optional[int] = None, multi_stream: bool = True):
+    """
+    函数级注释：摄像头工作进程入口
+    在子进程中完成抓帧、预处理、校验、追踪与报警，推理交给推理进程
+    :param resolver: 视频源解析器（VideoSourceResolver），携带主进程已解析并缓存的地址
+    """
+    from utils.logging_config import setup_logging
+    setup_logging(log_dir=log_dir, log_level=logging.INFO, retention_days=7)
+    logger = logging.getLogger(f"CameraWorker[{name}]")
+
+    from core.communication.communication import Communication
+    from core.communication.config_hot_loader import get_config_hot_loader
+    from core.video.camera_stream import CameraStream, build_stream_config
+    from core.yolo.detector import Detector
+
+    config_loader = get_config_hot_loader()
+    local_detector = Detector(load_model=False, **detector_kwargs)
+    remote_detector = RemoteDetector(local_detector, worker_id, request_queue, response_queue)
+    os.makedirs("output", exist_ok=True)
+
+    source = resolver.resolve()
+    stream = CameraStream(
+        name=name,
+        source=source,
+        detector=remote_detector,
+        comm=Communication(),
+        get_config=lambda: build_stream_config(config_loader, stream_cfg),
+        buffer_size=buffer_size,
+        alert_prefix=f"fire_alert_{name}" if multi_stream else "fire_alert",
+        resolver=resolver,
+    )
+    try:
+        if not stream.start():
+            logger.error(f"无法打开视频源: {source}")
+            return
+        logger.info(f"摄像头工作进程已启动: pid={os.getpid()}")
+        while stream.is_running and not stop_event.is_set():
+            try:
+                stream.step()
+            except Exception as e:
+                logger.exception(f"视频流处理异常: {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stream.stop()
+        remote_detector.close()
+        logger.info("摄像头工作进程已退出")
@@ -0,0 +1,204 @@
+"""
+类级注释：截止时间感知的检测调度器
+按目标分析帧率与延迟 SLO 决定哪些帧送入检测，替代固定的 frame_count % detection_interval：
+实测单帧检测耗时并自适应调整跳帧比例，主机负载过高时丢弃过期帧，而不是越积越落后
+"""
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class DetectionScheduler:
+    """
+    类级注释：单路视频流的检测调度器
+    target_fps <= 0 时退化为按 detection_interval 跳帧的原有行为；
+    视频源为稀疏解码时，交付的帧数本身已很少，按实际到达的帧估算视频源帧率
+    """
+
+    # 计算实际分析帧率的滑动窗口（秒）
+    RATE_WINDOW_SECONDS = 10.0
+    # 检测耗时占帧间隔的最大比例，超过后降低有效分析帧率
+    MAX_UTILIZATION = 0.9
+
+    def __init__(self, target_fps: float = 0.0, latency_slo: float = 1.0, fallback_interval: int = 4,
+                 ema_alpha: float = 0.2):
+        """
+        函数级注释：初始化调度器
+        :param target_fps: 目标分析帧率（次/秒），<= 0 表示按 fallback_interval 跳帧
+        :param latency_slo: 延迟 SLO（秒），采集时间早于此的帧视为过期直接丢弃，<= 0 表示不限制
+        :param fallback_interval: 未设置目标帧率时每隔多少帧检测一次
+        :param ema_alpha: 耗时与视频源帧率的指数平滑系数
+        """
+        self.target_fps = 0.0
+        self.latency_slo = 0.0
+        self.fallback_interval = 1
+        self.ema_alpha = ema_alpha
+        # 视频源是否为稀疏解码（只交付关键帧或参考帧）
+        self.sparse_source = False
+        self.configure(target_fps, latency_slo, fallback_interval)
+
+        self.cost_ema: Optional[float] = None
+        self.source_fps: Optional[float] = None
+
+        self._last_seq: Optional[int] = None
+        self._last_frame_time: Optional[float] = None
+        self._last_analyzed_seq = 0
+        self._next_due = 0.0
+        self._analysis_times: deque = deque()
+
+        # 统计计数
+        self.analyzed = 0
+        self.skipped = 0
+        self.dropped_stale = 0
+
+    def configure(self, target_fps: float, latency_slo: float, fallback_interval: int):
+        """
+        函数级注释：更新调度参数（支持热加载）
+        """
+        try:
+            self.target_fps = max(0.0, float(target_fps or 0.0))
+        except (TypeError, ValueError):
+            self.target_fps = 0.0
+        try:
+            self.latency_slo = max(0.0, float(latency_slo or 0.0))
+        except (TypeError, ValueError):
+            self.latency_slo = 0.0
+        try:
+            self.fallback_interval = max(1, int(fallback_interval))
+        except (TypeError, ValueError):
+            self.fallback_interval = 1
+
+    def configure_from(self, config: Dict[str, Any]):
+        """
+        函数级注释：从视频流配置更新调度参数
+        analysis_target_fps: 目标分析帧率；analysis_latency_slo_ms: 延迟 SLO（毫秒）
+        """
+        self.configure(
+            config.get('analysis_target_fps', 0),
+            float(config.get('analysis_latency_slo_ms', 1000) or 0) / 1000.0,
+            config.get('detection_interval', 4),
+        )
+
+    @property
+    def effective_fps(self) -> float:
+        """
+        函数级注释：当前实际可达的分析帧率目标
+        取目标帧率与按实测检测耗时估算的处理能力中的较小值
+        """
+        if self.target_fps <= 0:
+            return 0.0
+        if not self.cost_ema:
+            return self.target_fps
+        capacity = self.MAX_UTILIZATION / self.cost_ema
+        return min(self.target_fps, capacity)
+
+    @property
+    def decode_every(self) -> int:
+        """
+        函数级注释：建议抓帧线程每隔多少帧完整解码一帧（跳帧比例）
+        """
+        if self.target_fps <= 0:
+            return 1 if self.sparse_source else self.fallback_interval
+        effective = self.effective_fps
+        if not self.source_fps or effective <= 0:
+            return 1
+        return max(1, int(self.source_fps / effective))
+
+    def _observe_frame(self, seq: int, frame_time: float):
+        """
+        函数级注释：根据帧序号与采集时间估算视频源帧率
+        """
+        if self._last_seq is not None and seq > self._last_seq and frame_time > self._last_frame_time:
+            inst_fps = (seq - self._last_seq) / (frame_time - self._last_frame_time)
+            if self.source_fps is None:
+                self.source_fps = inst_fps
+            else:
+                self.source_fps += self.ema_alpha * (inst_fps - self.source_fps)
+        self._last_seq = seq
+        self._last_frame_time = frame_time
+
+    def should_analyze(self, seq: int, frame_time: float, now: Optional[float] = None) -> bool:
+        """
+        函数级注释：判断当前帧是否需要检测
+        :param seq: 帧序号（按视频源帧计数）
+        :param frame_time: 帧采集时间戳
+        :param now: 当前时间，默认 time.time()
+        :return: 是否检测该帧
+        """
+        now = time.time() if now is None else now
+        self._observe_frame(seq, frame_time)
+
+        if self.latency_slo > 0 and now - frame_time > self.latency_slo:
+            self.dropped_stale += 1
+            return False
+
+        if self.target_fps <= 0:
+            # 稀疏解码时视频源已大幅抽帧，不再按 detection_interval 二次跳帧
+            interval = 1 if self.sparse_source else self.fallback_interval
+            due = seq - self._last_analyzed_seq >= interval
+        else:
+            # 允许提前半个视频帧间隔，避免因帧到达时间抖动整帧错过截止时间
+            tolerance = 0.5 / self.source_fps if self.source_fps else 0.0
+            due = now + tolerance >= self._next_due
+
+        if not due:
+            self.skipped += 1
+            return False
+
+        self._last_analyzed_seq = seq
+        if self.target_fps > 0:
+            period = 1.0 / self.effective_fps
+            # 按固定节拍推进截止时间；落后超过一个周期时从当前时间重新起算，不补做积压的检测
+            if self._next_due + period > now:
+                self._next_due += period
+            else:
+                self._next_due = now + period
+        return True
+
+    def record(self, cost: float, now: Optional[float] = None):
+        """
+        函数级注释：记录一次检测的实际耗时
+        :param cost: 本次检测耗时（秒），多路视频流共享模型时包含等待推理锁的时间
+        :param now: 当前时间，默认 time.time()
+        """
+        now = time.time() if now is None else now
+        cost = max(0.0, float(cost))
+        if self.cost_ema is None:
+            self.cost_ema = cost
+        else:
+            self.cost_ema += self.ema_alpha * (cost - self.cost_ema)
+
+        self.analyzed += 1
+        self._analysis_times.append(now)
+        while self._analysis_times and now - self._analysis_times[0] > self.RATE_WINDOW_SECONDS:
+            self._analysis_times.popleft()
+
+    @property
+    def achieved_fps(self) -> float:
+        """
+        函数级注释：最近窗口内实际达到的分析帧率
+        """
+        if len(self._analysis_times) < 2:
+            return 0.0
+        span = self._analysis_times[-1] - self._analysis_times[0]
+        if span <= 0:
+            return 0.0
+        return (len(self._analysis_times) - 1) / span
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        函数级注释：获取调度统计
+        :return: 统计字典
+        """
+        return {
+            "target_fps": round(self.target_fps, 2),
+            "effective_fps": round(self.effective_fps, 2),
+            "achieved_fps": round(self.achieved_fps, 2),
+            "source_fps": round(self.source_fps, 2) if self.source_fps else None,
+            "cost_ms": round(self.cost_ema * 1000, 1) if self.cost_ema is not None else None,
+            "decode_every": self.decode_every,
+            "sparse_source": self.sparse_source,
+            "analyzed": self.analyzed,
+            "skipped": self.skipped,
+            "dropped_stale": self.dropped_stale,
+        }
@@ -0,0 +1,103 @@
+"""
+类级注释：共享内存帧环形缓冲
+基于 multiprocessing.shared_memory 在进程间传递图像帧，帧数据直接写入共享内存，
+进程间只传递槽位序号等少量元数据，避免对 ndarray 做 pickle 序列化
+"""
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class SharedFrameRing:
+    """
+    类级注释：固定尺寸帧的共享内存环形缓冲
+    由写入方（摄像头工作进程）创建并负责释放，读取方（推理进程）按名称挂载
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, shape: Tuple[int, ...], slots: int, owner: bool):
+        """
+        函数级注释：初始化环形缓冲（请使用 create / attach 构造）
+        :param shm: 共享内存块
+        :param shape: 单帧形状
+        :param slots: 槽位数量
+        :param owner: 是否为创建方（创建方负责 unlink）
+        """
+        self.shm = shm
+        self.shape = tuple(int(x) for x in shape)
+        self.slots = int(slots)
+        self.owner = owner
+        self._frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=shm.buf)
+        self._next_slot = 0
+
+    @staticmethod
+    def frame_nbytes(shape: Tuple[int, ...]) -> int:
+        """
+        函数级注释：计算单帧字节数
+        """
+        return int(np.prod(shape)) * np.dtype(np.uint8).itemsize
+
+    @classmethod
+    def create(cls, shape: Tuple[int, ...], slots: int = 4, name: Optional[str] = None) -> "SharedFrameRing":
+        """
+        函数级注释：创建新的环形缓冲
+        :param shape: 单帧形状，如 (1080, 1920, 3)
+        :param slots: 槽位数量
+        :param name: 共享内存名称，None 时自动生成
+        :return: 环形缓冲实例
+        """
+        size = cls.frame_nbytes(shape) * slots
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        return cls(shm, shape, slots, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, shape: Tuple[int, ...], slots: int) -> "SharedFrameRing":
+        """
+        函数级注释：按名称挂载已存在的环形缓冲
+        工作进程由主进程以 spawn 方式启动，与主进程共用同一个 resource_tracker，
+        挂载方无需额外处理登记，共享内存由创建方 unlink 时统一注销
+        :return: 环形缓冲实例
+        """
+        shm = shared_memory.SharedMemory(name=name, create=False)
+        return cls(shm, shape, slots, owner=False)
+
+    @property
+    def name(self) -> str:
+        """
+        函数级注释：共享内存名称
+        """
+        return self.shm.name
+
+    def view(self, slot: int) -> np.ndarray:
+        """
+        函数级注释：获取槽位的零拷贝视图
+        """
+        return self._frames[slot]
+
+    def write(self, frame: np.ndarray) -> int:
+        """
+        函数级注释：将帧写入下一个槽位
+        :param frame: 与缓冲形状一致的 uint8 帧
+        :return: 写入的槽位序号
+        """
+        if frame.shape != self.shape:
+            raise ValueError(f"帧形状 {frame.shape} 与环形缓冲形状 {self.shape} 不一致")
+        slot = self._next_slot
+        np.copyto(self._frames[slot], frame)
+        self._next_slot = (slot + 1) % self.slots
+        return slot
+
+    def close(self):
+        """
+        函数级注释：关闭共享内存，创建方同时释放
+        """
+        self._frames = None
+        try:
+            self.shm.close()
+        except Exception:
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,86 @@
+"""
+类级注释：视频源地址解析与缓存
+按 RTSP 地址 > ONVIF 动态获取 > 本地摄像头索引 的优先级解析视频源，
+ONVIF 解析得到的 RTSP 地址会被缓存，只有缓存地址重连失败时才重新走 ONVIF 查询
+"""
+import logging
+from typing import Any, Callable, Dict, Optional
+
+
+class VideoSourceResolver:
+    """
+    类级注释：单路视频流的视频源解析器
+    可被抓帧线程在重连时调用；对象可 pickle，便于传给多进程模式下的摄像头工作进程
+    """
+
+    def __init__(self, config: Dict[str, Any], onvif_resolver: Optional[Callable[..., str]] = None):
+        """
+        函数级注释：初始化解析器
+        :param config: 视频流配置（rtsp_url / onvif_* / camera_index）
+        :param onvif_resolver: ONVIF 地址查询函数，默认使用 analysis_rtsp
+        """
+        self.logger = logging.getLogger("VideoSourceResolver")
+        self.config = dict(config)
+        self.onvif_resolver = onvif_resolver
+        self.onvif_resolutions = 0
+        self._cached: Any = None
+
+    @property
+    def can_refresh(self) -> bool:
+        """
+        函数级注释：是否可以通过重新查询获得新的视频源地址（仅 ONVIF 摄像头）
+        """
+        return bool(self.config.get('onvif_use')) and not self.config.get('rtsp_url')
+
+    def _query_onvif(self) -> str:
+        """
+        函数级注释：通过 ONVIF 协议查询 RTSP 地址
+        """
+        resolver = self.onvif_resolver
+        if resolver is None:
+            from core.yolo.Onvif_to_RTSP import analysis_rtsp
+            resolver = analysis_rtsp
+        self.onvif_resolutions += 1
+        return resolver(
+            ip=self.config.get('onvif_ip'),
+            port=int(self.config.get('onvif_port') or 80),
+            username=self.config.get('onvif_username'),
+            password=self.config.get('onvif_password'),
+        )
+
+    def resolve(self, refresh: bool = False) -> Any:
+        """
+        函数级注释：获取视频源
+        优先级：
+        1) 显式配置的 RTSP URL
+        2) ONVIF 协议动态获取 RTSP URL（结果缓存）
+        3) 本地摄像头索引
+        :param refresh: 是否丢弃缓存重新查询 ONVIF（缓存地址重连失败时使用）
+        :return: RTSP 地址或摄像头索引
+        """
+        if self._cached is not None and not refresh:
+            return self._cached
+
+        # 1) 优先使用显式 RTSP
+        if self.config.get('rtsp_url'):
+            self.logger.info("使用配置的 RTSP 视频源")
+            self._cached = self.config['rtsp_url']
+            return self._cached
+
+        # 2) 其次使用 ONVIF 动态获取 RTSP
+        if self.config.get('onvif_use'):
+            try:
+                self._cached = self._query_onvif()
+                self.logger.info("使用 ONVIF 获取到的 RTSP 视频源")
+                return self._cached
+            except Exception as e:
+                if refresh and self._cached is not None:
+                    # 重新查询失败时保留原地址，由抓帧线程继续按退避策略重试
+                    self.logger.warning(f"ONVIF 重新获取 RTSP 失败，继续使用缓存地址: {e}")
+                    return self._cached
+                self.logger.exception(f"ONVIF 获取 RTSP 失败，回退本地摄像头: {e}")
+
+        # 3) 最后回退本地摄像头
+        self.logger.info("使用本地摄像头 camera_index")
+        self._cached = self.config['camera_index']
+        return self._cached
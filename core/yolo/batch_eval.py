@@ -0,0 +1,257 @@
+"""
+类级注释：离线批量评估
+对目录中的录像逐帧运行完整的 Detector 流水线（YOLO + 多模态校验 + 三级预警追踪），
+多个视频在进程池中并行处理，不受实时帧率限制；每个视频输出一份 JSONL，
+逐帧记录检测结果、预警级别与各阶段耗时，便于回放事故与在大量录像上验证改动
+
+用法：
+    python -m core.yolo.batch_eval <视频目录> [-o eval_output] [-j 4] [--stride 1]
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+import cv2
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".flv", ".ts", ".m4v")
+
+# 工作进程内的检测器（每个进程只加载一次模型，每个视频派生独立的背景建模与追踪状态）
+_worker_detector = None
+
+
+def discover_videos(video_dir: str, recursive: bool = True) -> List[str]:
+    """
+    函数级注释：查找目录中的视频文件
+    :param video_dir: 视频目录
+    :param recursive: 是否递归子目录
+    :return: 按路径排序的视频文件列表
+    """
+    videos = []
+    for root, dirs, files in os.walk(video_dir):
+        for name in files:
+            if name.lower().endswith(VIDEO_EXTENSIONS):
+                videos.append(os.path.join(root, name))
+        if not recursive:
+            break
+    return sorted(videos)
+
+
+def output_path_for(video_path: str, video_dir: str, output_dir: str) -> str:
+    """
+    函数级注释：计算视频对应的 JSONL 输出路径（保留相对目录结构）
+    """
+    rel = os.path.relpath(video_path, video_dir)
+    return os.path.join(output_dir, os.path.splitext(rel)[0] + ".jsonl")
+
+
+def evaluate_video(detector, video_path: str, output_path: str, stride: int = 1) -> Dict[str, Any]:
+    """
+    函数级注释：对单个视频运行检测流水线并写出逐帧结果
+    :param detector: 该视频专用的 Detector（状态从零开始）
+    :param video_path: 视频文件路径
+    :param output_path: JSONL 输出路径
+    :param stride: 每隔多少帧检测一次（与线上 detection_interval 含义一致）
+    :return: 视频级汇总
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return {"video": video_path, "error": "无法打开视频"}
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    stride = max(1, int(stride))
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    frames = 0
+    analyzed = 0
+    gated = 0
+    cached = 0
+    level_counts = {1: 0, 2: 0, 3: 0}
+    first_l3_time: Optional[float] = None
+    stage_totals: Dict[str, float] = {}
+    start = time.time()
+
+    try:
+        with open(output_path, "w", encoding="utf-8") as f:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frame_idx = frames
+                frames += 1
+                if frame_idx % stride != 0:
+                    continue
+
+                frame_time = frame_idx / fps
+                # 缓存有效期、运动门控兜底与分辨率级联都按视频时间计时，与解码速度无关
+                _, detections = detector.detect_frame(frame, draw=False, frame_time=frame_time)
+                analyzed += 1
+                gated += int(detector.last_gated)
+                cached += int(detector.last_cache_hit)
+                timings = {k: round(v, 2) for k, v in detector.last_timings.items()}
+                for key, value in timings.items():
+                    stage_totals[key] = stage_totals.get(key, 0.0) + value
+
+                max_level = max((det.get("warning_level", 0) for det in detections), default=0)
+                if max_level in level_counts:
+                    level_counts[max_level] += 1
+                if max_level == 3 and first_l3_time is None:
+                    first_l3_time = frame_time
+
+                record = {
+                    "frame": frame_idx,
+                    "time_s": round(frame_time, 3),
+                    "max_warning_level": max_level,
+                    "gated": detector.last_gated,
+                    "cached": detector.last_cache_hit,
+                    "detections": detections,
+                    "timings_ms": timings,
+                }
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    finally:
+        cap.release()
+
+    elapsed = time.time() - start
+    return {
+        "video": video_path,
+        "output": output_path,
+        "frames": frames,
+        "analyzed": analyzed,
+        "gated": gated,
+        "cached": cached,
+        "video_seconds": round(frames / fps, 2),
+        "elapsed_seconds": round(elapsed, 2),
+        "speedup": round((frames / fps) / elapsed, 2) if elapsed > 0 else None,
+        "frames_with_level": {f"L{k}": v for k, v in level_counts.items()},
+        "first_l3_time_s": round(first_l3_time, 3) if first_l3_time is not None else None,
+        "mean_timings_ms": {k: round(v / analyzed, 2) for k, v in stage_totals.items()} if analyzed else {},
+    }
+
+
+def _init_worker(detector_kwargs: Dict[str, Any], torch_threads: int):
+    """
+    函数级注释：工作进程初始化：加载一次模型，并限制每个进程的推理线程数避免超额订阅
+    """
+    global _worker_detector
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        import torch
+        torch.set_num_threads(max(1, torch_threads))
+    except ImportError:
+        pass
+    from core.yolo.detector import Detector
+    _worker_detector = Detector(**detector_kwargs)
+
+
+def _evaluate_task(video_path: str, output_path: str, stride: int) -> Dict[str, Any]:
+    """
+    函数级注释：进程池任务：为视频派生独立状态的检测器后评估
+    """
+    try:
+        return evaluate_video(_worker_detector.spawn(), video_path, output_path, stride=stride)
+    except Exception as e:
+        return {"video": video_path, "error": str(e)}
+
+
+def run_batch(video_dir: str, output_dir: str, detector_kwargs: Dict[str, Any], workers: int = 0,
+              stride: int = 1) -> List[Dict[str, Any]]:
+    """
+    函数级注释：并行评估目录中的所有视频
+    :param video_dir: 视频目录
+    :param output_dir: 输出目录
+    :param detector_kwargs: Detector 构造参数
+    :param workers: 进程数，0 表示 CPU 核数
+    :param stride: 每隔多少帧检测一次
+    :return: 各视频的汇总列表
+    """
+    videos = discover_videos(video_dir)
+    if not videos:
+        return []
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(videos)))
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    summaries = []
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(detector_kwargs, torch_threads)) as pool:
+        futures = {
+            pool.submit(_evaluate_task, path, output_path_for(path, video_dir, output_dir), stride): path
+            for path in videos
+        }
+        for future in as_completed(futures):
+            summary = future.result()
+            summaries.append(summary)
+            if "error" in summary:
+                print(f"[失败] {summary['video']}: {summary['error']}", flush=True)
+            else:
+                print(f"[完成] {summary['video']}: {summary['frames']} 帧, 耗时 {summary['elapsed_seconds']}s, "
+                      f"L3 帧数 {summary['frames_with_level']['L3']}", flush=True)
+
+    summaries.sort(key=lambda item: item["video"])
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summaries, f, ensure_ascii=False, indent=2)
+    return summaries
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    函数级注释：命令行入口
+    """
+    parser = argparse.ArgumentParser(description="离线批量运行火灾检测流水线")
+    parser.add_argument("video_dir", help="录像目录（递归查找视频文件）")
+    parser.add_argument("-o", "--output", default="eval_output", help="JSONL 输出目录")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="并行进程数，默认 CPU 核数")
+    parser.add_argument("--stride", type=int, default=1, help="每隔多少帧检测一次")
+    parser.add_argument("--weights", help="模型权重，默认读取 system.json 的 yolo_weights")
+    parser.add_argument("--device", help="推理设备，默认读取 system.json 的 yolo_device")
+    parser.add_argument("--conf", type=float, help="置信度阈值，默认读取 system.json 的 yolo_confidence")
+    parser.add_argument("--imgsz", type=int, default=640, help="推理尺寸")
+    parser.add_argument("--backend", choices=("ultralytics", "onnx", "torch"),
+                        help="推理后端，默认读取 system.json 的 yolo_backend")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.video_dir):
+        print(f"视频目录不存在: {args.video_dir}", file=sys.stderr)
+        return 1
+
+    from core.communication.config_hot_loader import get_config_hot_loader
+    config_loader = get_config_hot_loader()
+    detector_kwargs = {
+        "weights_path": args.weights or config_loader.get_config('yolo_weights', 'core/yolo/weights/best.pt'),
+        "device": args.device or config_loader.get_config('yolo_device', 'cpu'),
+        "conf": args.conf if args.conf is not None else config_loader.get_config('yolo_confidence', 0.8),
+        "imgsz": args.imgsz,
+        "backend": args.backend or config_loader.get_config('yolo_backend', 'ultralytics'),
+    }
+
+    if not os.path.exists(detector_kwargs["weights_path"]):
+        print(f"模型权重不存在: {detector_kwargs['weights_path']}", file=sys.stderr)
+        return 1
+    if detector_kwargs["backend"] == "onnx" and not detector_kwargs["weights_path"].lower().endswith(".onnx"):
+        # 在主进程中导出一次，避免各工作进程同时导出
+        from core.yolo.onnx_backend import export_onnx
+        detector_kwargs["weights_path"] = export_onnx(detector_kwargs["weights_path"], imgsz=args.imgsz)
+
+    start = time.time()
+    summaries = run_batch(args.video_dir, args.output, detector_kwargs, workers=args.workers, stride=args.stride)
+    if not summaries:
+        print(f"目录中没有视频文件: {args.video_dir}", file=sys.stderr)
+        return 1
+
+    total_video = sum(item.get("video_seconds", 0) for item in summaries)
+    elapsed = time.time() - start
+    failed = sum(1 for item in summaries if "error" in item)
+    print(f"共 {len(summaries)} 个视频（失败 {failed}），录像时长 {total_video:.0f}s，耗时 {elapsed:.0f}s，"
+          f"结果已写入 {args.output}")
+    return 0 if failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
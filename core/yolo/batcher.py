@@ -0,0 +1,242 @@
+"""
+类级注释：跨视频流的动态微批推理
+多路视频流各自调用 predict 时每次只送一张图，推理后端的批量向量化能力被浪费。
+InferenceBatcher 汇集所有视频流提交的增强帧，凑满 max_batch 张或等待超过 max_wait_ms 后执行一次批量前向，
+再把结果分发回各视频流（各自完成多模态校验与追踪）。同时统计批大小与排队等待时间的直方图
+"""
+import time
+import queue
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from core.yolo.detections import DetectionBatch
+
+
+class Histogram:
+    """
+    类级注释：固定分桶直方图（线程安全）
+    """
+
+    def __init__(self, edges: Sequence[float]):
+        """
+        函数级注释：初始化直方图
+        :param edges: 升序的桶上界，超过最后一个上界的值计入溢出桶
+        """
+        self.edges = list(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """
+        函数级注释：记录一个观测值
+        """
+        index = int(np.searchsorted(self.edges, value, side="left"))
+        with self._lock:
+            self.counts[index] += 1
+            self.total += 1
+            self.sum += value
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        函数级注释：返回各桶计数，键为 "<=上界"，溢出桶为 ">最后上界"
+        """
+        with self._lock:
+            counts = list(self.counts)
+        labels = [f"<={edge:g}" for edge in self.edges] + [f">{self.edges[-1]:g}"]
+        return dict(zip(labels, counts))
+
+    @property
+    def mean(self) -> float:
+        """
+        函数级注释：观测值均值
+        """
+        return self.sum / self.total if self.total else 0.0
+
+
+class _InferenceRequest:
+    """
+    类级注释：单帧推理请求
+    """
+
+    __slots__ = ("frame", "imgsz", "enqueued_at", "done", "result")
+
+    def __init__(self, frame: np.ndarray, imgsz: int):
+        self.frame = frame
+        self.imgsz = imgsz
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result: Optional[DetectionBatch] = None
+
+
+class InferenceBatcher:
+    """
+    类级注释：动态微批推理队列
+    infer / infer_many 与 Detector.inference_client / inference_batch_client 的签名一致，
+    可直接赋给各视频流检测器，由单个后台线程执行批量推理
+    """
+
+    # 排队等待时间直方图的桶上界（毫秒）
+    WAIT_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+    def __init__(self, detector, max_batch: int = 4, max_wait_ms: float = 5.0, timeout: float = 5.0,
+                 stats_interval: float = 60.0):
+        """
+        函数级注释：初始化批处理队列
+        :param detector: 已加载模型的 Detector（调用其 infer_batch）
+        :param max_batch: 单次前向的最大帧数
+        :param max_wait_ms: 凑批的最长等待时间（毫秒），从批内第一帧入队开始计算
+        :param timeout: 视频流线程等待结果的最长时间（秒）
+        :param stats_interval: 统计日志输出间隔（秒）
+        """
+        self.logger = logging.getLogger("InferenceBatcher")
+        self.detector = detector
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self.timeout = timeout
+        self.stats_interval = stats_interval
+
+        self.batch_size_hist = Histogram(range(1, self.max_batch + 1))
+        self.queue_wait_hist = Histogram(self.WAIT_BUCKETS_MS)
+        self.batches = 0
+        self.frames = 0
+        self.timeouts = 0
+
+        self._queue: "queue.Queue[_InferenceRequest]" = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_stats_log = time.time()
+
+    def start(self):
+        """
+        函数级注释：启动批处理线程
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="InferenceBatcher", daemon=True)
+        self._thread.start()
+        self.logger.info(f"动态微批推理已启动: max_batch={self.max_batch}, max_wait_ms={self.max_wait_ms}")
+
+    def stop(self):
+        """
+        函数级注释：停止批处理线程，未处理的请求返回 None
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            request.done.set()
+
+    def infer(self, frame: np.ndarray, imgsz: int) -> Optional[DetectionBatch]:
+        """
+        函数级注释：提交一帧并等待批量推理结果（由视频流线程调用）
+        :param frame: 增强后的帧
+        :param imgsz: 推理尺寸
+        :return: 原始检测结果，超时或推理失败时返回 None
+        """
+        return self.infer_many([frame], imgsz)[0]
+
+    def infer_many(self, frames: List[np.ndarray], imgsz: int) -> List[Optional[DetectionBatch]]:
+        """
+        函数级注释：一次提交多帧（如同一帧的多个运动切片）并等待全部结果
+        所有帧先入队再等待，可以凑进同一批前向，不必逐帧各等一次 max_wait_ms
+        :param frames: 增强后的帧列表
+        :param imgsz: 推理尺寸
+        :return: 与 frames 一一对应的原始检测结果，超时或推理失败的帧为 None
+        """
+        requests = [_InferenceRequest(frame, imgsz) for frame in frames]
+        for request in requests:
+            self._queue.put(request)
+        deadline = time.perf_counter() + self.timeout
+        for request in requests:
+            if not request.done.wait(max(0.0, deadline - time.perf_counter())):
+                self.timeouts += 1
+                self.logger.warning(f"等待批量推理结果超时 ({self.timeout}s)，跳过当前帧")
+                break
+        return [request.result if request.done.is_set() else None for request in requests]
+
+    def _collect(self) -> List[_InferenceRequest]:
+        """
+        函数级注释：收集一批请求：阻塞等待第一帧，之后在 max_wait_ms 内继续凑批，凑满即返回
+        """
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run_batch(self, batch: List[_InferenceRequest]):
+        """
+        函数级注释：执行一批请求并唤醒等待的视频流线程
+        推理尺寸不同的帧（如检测区域裁剪后的视频流）无法共用一次前向，按推理尺寸分组执行
+        """
+        now = time.perf_counter()
+        groups: Dict[int, List[_InferenceRequest]] = {}
+        for request in batch:
+            self.queue_wait_hist.observe((now - request.enqueued_at) * 1000)
+            groups.setdefault(request.imgsz, []).append(request)
+
+        for imgsz, requests in groups.items():
+            try:
+                results = self.detector.infer_batch([request.frame for request in requests], imgsz=imgsz)
+            except Exception as e:
+                self.logger.exception(f"批量推理失败: {e}")
+                results = [None] * len(requests)
+            self.batch_size_hist.observe(len(requests))
+            self.batches += 1
+            self.frames += len(requests)
+            for request, result in zip(requests, results):
+                request.result = result
+                request.done.set()
+
+    def _loop(self):
+        """
+        函数级注释：批处理主循环
+        """
+        while not self._stop_event.is_set():
+            batch = self._collect()
+            if batch:
+                self.run_batch(batch)
+            self._log_stats()
+
+    def stats(self) -> Dict:
+        """
+        函数级注释：批处理统计
+        """
+        return {
+            "batches": self.batches,
+            "frames": self.frames,
+            "mean_batch_size": round(self.batch_size_hist.mean, 2),
+            "mean_queue_wait_ms": round(self.queue_wait_hist.mean, 2),
+            "timeouts": self.timeouts,
+            "batch_size_hist": self.batch_size_hist.snapshot(),
+            "queue_wait_ms_hist": self.queue_wait_hist.snapshot(),
+        }
+
+    def _log_stats(self):
+        """
+        函数级注释：定期输出批大小与排队等待直方图
+        """
+        now = time.time()
+        if now - self._last_stats_log < self.stats_interval:
+            return
+        self._last_stats_log = now
+        self.logger.info(f"批量推理统计: {self.stats()}")
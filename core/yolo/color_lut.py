@@ -0,0 +1,97 @@
+"""
+类级注释：颜色类别查找表
+多模态校验用固定阈值把像素分为火焰色、肤色、黄色、红色与高亮几类，原流程每个类别都要做一次颜色空间转换与若干次 inRange。
+颜色类别只取决于像素的 BGR 值，因此可以预先对全部 2^24 种颜色分类，把结果存成每种颜色一个字节的位标志表（16MB），
+之后每个区域只需一次查表即可得到所有类别的掩码。查找表用 OpenCV 自身的颜色转换与 inRange 生成，结果与逐像素计算完全一致；
+只在阈值变化时重建，同一进程内的检测器共享同一张表
+"""
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# 位标志
+FIRE = 1
+SKIN = 2
+YELLOW = 4
+RED = 8
+HIGHLIGHT = 16
+
+# 固定阈值（火焰色的 HSV 区间由检测器提供）
+WHITE_CORE_RANGE = ((0, 0, 220), (180, 60, 255))
+SKIN_RANGE = ((70, 130, 80), (210, 180, 135))
+YELLOW_RANGE = ((15, 80, 80), (45, 255, 255))
+RED_RANGES = (((0, 70, 70), (15, 255, 255)), ((165, 70, 70), (180, 255, 255)))
+# HSV 亮度 V > 250
+HIGHLIGHT_RANGE = ((0, 0, 251), (180, 255, 255))
+
+Ranges = Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], ...]
+
+
+def normalize_ranges(ranges: Sequence) -> Ranges:
+    """
+    函数级注释：阈值区间转换为可哈希的整数元组，用作查找表缓存键
+    """
+    return tuple((tuple(int(v) for v in low), tuple(int(v) for v in high)) for low, high in ranges)
+
+
+def color_classes(fire_ranges: Sequence) -> Dict[int, Tuple[str, Ranges]]:
+    """
+    函数级注释：各颜色类别的判定方式
+    :param fire_ranges: 火焰色 HSV 区间 [(low, high), ...]，白色焰心区间会自动加入
+    :return: {位标志: (颜色空间, 区间)}，任一区间命中即属于该类别
+    """
+    return {
+        FIRE: ("hsv", normalize_ranges(fire_ranges) + (WHITE_CORE_RANGE,)),
+        SKIN: ("ycrcb", (SKIN_RANGE,)),
+        YELLOW: ("hsv", (YELLOW_RANGE,)),
+        RED: ("hsv", RED_RANGES),
+        HIGHLIGHT: ("hsv", (HIGHLIGHT_RANGE,)),
+    }
+
+
+@lru_cache(maxsize=2)
+def build_color_lut(fire_ranges: Ranges) -> np.ndarray:
+    """
+    函数级注释：生成颜色类别查找表
+    按蓝色分量分 256 批，每批对 256x256 种 (G, R) 组合做颜色转换与 inRange，临时内存不超过 1MB
+    :param fire_ranges: normalize_ranges 处理后的火焰色 HSV 区间
+    :return: 长度 2^24 的 uint8 位标志表，下标为 B | G << 8 | R << 16
+    """
+    classes = color_classes(fire_ranges)
+    lut = np.empty(1 << 24, dtype=np.uint8)
+    # 批内下标 G | R << 8 对应 (R, G) 排列的画面
+    grid = np.empty((256, 256, 3), dtype=np.uint8)
+    grid[:, :, 1] = np.arange(256, dtype=np.uint8)[None, :]
+    grid[:, :, 2] = np.arange(256, dtype=np.uint8)[:, None]
+    flags = np.empty((256, 256), dtype=np.uint8)
+    for blue in range(256):
+        grid[:, :, 0] = blue
+        converted = {"hsv": cv2.cvtColor(grid, cv2.COLOR_BGR2HSV), "ycrcb": cv2.cvtColor(grid, cv2.COLOR_BGR2YCrCb)}
+        flags.fill(0)
+        for flag, (space, ranges) in classes.items():
+            for low, high in ranges:
+                # inRange 的命中值为 255，与位标志按位与后即为该标志
+                flags |= cv2.inRange(converted[space], np.asarray(low), np.asarray(high)) & flag
+        # 下标 B | G << 8 | R << 16：同一蓝色分量的条目间隔 256
+        lut[blue::256] = flags.ravel()
+    return lut
+
+
+def lut_index(region: np.ndarray) -> np.ndarray:
+    """
+    函数级注释：BGR 区域的查找表下标
+    转为 BGRA 后按小端 uint32 读取即为 B | G << 8 | R << 16 | A << 24，清除 Alpha 字节即可
+    """
+    bgra = cv2.cvtColor(region, cv2.COLOR_BGR2BGRA)
+    index = bgra.view(np.uint32).reshape(bgra.shape[:2])
+    index &= 0xFFFFFF
+    return index
+
+
+def classify(region: np.ndarray, lut: np.ndarray) -> np.ndarray:
+    """
+    函数级注释：区域逐像素的颜色类别位标志
+    """
+    return lut.take(lut_index(region))
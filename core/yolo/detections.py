@@ -0,0 +1,190 @@
+"""
+类级注释：检测结果批（结构化数组）
+每帧的检测框、校验指标与追踪状态保存在一个 NumPy 结构化数组中，推理解析、切片合并、检测区域过滤、
+多模态校验与追踪都直接读写数组字段，不再为每个检测框构造字典；
+只有在检测器对外返回结果时（Detector.detect_frame）才通过 to_dicts 转换为字典列表
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+DETECTION_DTYPE = np.dtype([
+    ("xmin", np.int32),
+    ("ymin", np.int32),
+    ("xmax", np.int32),
+    ("ymax", np.int32),
+    ("conf", np.float32),
+    ("cls_id", np.int32),
+    # 预警等级，0 表示未进入追踪
+    ("warning_level", np.int8),
+    # 追踪中的疑似目标：对外的类别名称加 suspected_ 前缀
+    ("suspected", np.bool_),
+    # 达到确认帧数但抖动不足，维持在 L2
+    ("low_jitter", np.bool_),
+    ("track_frames", np.int32),
+    ("track_jitter", np.float64),
+    # 通过火焰多模态校验时记录的指标
+    ("validated", np.bool_),
+    ("box_area", np.int64),
+    ("motion_ratio", np.float64),
+    ("fire_ratio", np.float64),
+])
+
+
+class DetectionBatch:
+    """
+    类级注释：一帧（或一个切片）的检测结果
+    data 为 DETECTION_DTYPE 结构化数组；names 为类别名称映射，同一模型的所有检测批共享同一个字典。
+    整数下标返回的记录（np.void）是数组元素的视图，对其字段赋值会写回数组
+    """
+
+    __slots__ = ("data", "names")
+
+    def __init__(self, data: Optional[np.ndarray] = None, names: Optional[Dict[int, str]] = None):
+        """
+        函数级注释：包装结构化数组
+        :param data: DETECTION_DTYPE 数组，None 表示空批
+        :param names: 类别名称映射
+        """
+        self.data = np.zeros(0, dtype=DETECTION_DTYPE) if data is None else data
+        self.names = names if names is not None else {}
+
+    @classmethod
+    def from_arrays(cls, xyxy: np.ndarray, conf: np.ndarray, cls_ids: np.ndarray,
+                    names: Optional[Dict[int, str]] = None) -> "DetectionBatch":
+        """
+        函数级注释：由模型输出的坐标、置信度与类别数组构造（坐标截断为整数，与逐框 int() 一致）
+        """
+        data = np.zeros(len(conf), dtype=DETECTION_DTYPE)
+        if len(data):
+            xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)
+            for i, field in enumerate(("xmin", "ymin", "xmax", "ymax")):
+                data[field] = np.trunc(xyxy[:, i])
+            data["conf"] = conf
+            data["cls_id"] = cls_ids
+        return cls(data, names)
+
+    @classmethod
+    def from_dicts(cls, detections: Iterable[Dict], names: Optional[Dict[int, str]] = None) -> "DetectionBatch":
+        """
+        函数级注释：由检测字典列表构造（兼容旧格式的测试与调用方）
+        未提供 names 时由字典中的 cls_id / cls_name 推断
+        """
+        detections = list(detections)
+        names = dict(names) if names is not None else {}
+        data = np.zeros(len(detections), dtype=DETECTION_DTYPE)
+        for i, det in enumerate(detections):
+            cls_id = int(det.get("cls_id", 0))
+            if "cls_name" in det and cls_id not in names:
+                names[cls_id] = det["cls_name"]
+            data[i] = tuple(det.get(field, 0) for field in DETECTION_DTYPE.names)
+        return cls(data, names)
+
+    @classmethod
+    def concat(cls, batches: Sequence["DetectionBatch"]) -> "DetectionBatch":
+        """
+        函数级注释：按顺序拼接多个检测批
+        """
+        names = next((batch.names for batch in batches if batch.names), {})
+        if not batches:
+            return cls(names=names)
+        return cls(np.concatenate([batch.data for batch in batches]), names)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index):
+        """
+        函数级注释：整数下标返回记录视图，切片/布尔掩码/下标数组返回新的检测批
+        """
+        if isinstance(index, (int, np.integer)):
+            return self.data[index]
+        return DetectionBatch(self.data[index], self.names)
+
+    def __reduce__(self):
+        # __slots__ 类没有 __dict__，显式声明序列化方式（多进程模式下经管道传输）
+        return DetectionBatch, (self.data, self.names)
+
+    def copy(self) -> "DetectionBatch":
+        """
+        函数级注释：复制数组（names 共享）
+        """
+        return DetectionBatch(self.data.copy(), self.names)
+
+    @property
+    def boxes(self) -> np.ndarray:
+        """
+        函数级注释：(N, 4) int32 坐标数组 [xmin, ymin, xmax, ymax]
+        """
+        return np.stack([self.data["xmin"], self.data["ymin"], self.data["xmax"], self.data["ymax"]], axis=1)
+
+    def shift(self, dx: int, dy: int) -> "DetectionBatch":
+        """
+        函数级注释：原地平移坐标（切片/裁剪框坐标系 -> 整帧坐标系）
+        """
+        if dx:
+            self.data["xmin"] += dx
+            self.data["xmax"] += dx
+        if dy:
+            self.data["ymin"] += dy
+            self.data["ymax"] += dy
+        return self
+
+    def scale(self, sx: float, sy: float) -> "DetectionBatch":
+        """
+        函数级注释：原地缩放坐标（推理图像坐标系 -> 原画面坐标系），截断为整数
+        """
+        if sx != 1.0:
+            for field in ("xmin", "xmax"):
+                self.data[field] = np.trunc(self.data[field] * sx)
+        if sy != 1.0:
+            for field in ("ymin", "ymax"):
+                self.data[field] = np.trunc(self.data[field] * sy)
+        return self
+
+    def class_name(self, index: int) -> str:
+        """
+        函数级注释：检测框的模型类别名称
+        """
+        cls_id = int(self.data["cls_id"][index])
+        return self.names.get(cls_id, str(cls_id))
+
+    def label(self, index: int) -> str:
+        """
+        函数级注释：对外的类别名称（追踪中的疑似目标带 suspected_ 前缀）
+        """
+        name = self.class_name(index)
+        return f"suspected_{name}" if self.data["suspected"][index] else name
+
+    def to_dicts(self) -> List[Dict]:
+        """
+        函数级注释：转换为检测字典列表（对外接口格式）
+        只输出已设置的可选字段，与逐框构造字典时的键集合一致
+        """
+        detections = []
+        for row in self.data.tolist():
+            (xmin, ymin, xmax, ymax, conf, cls_id, level, suspected, low_jitter, track_frames, track_jitter,
+             validated, box_area, motion_ratio, fire_ratio) = row
+            name = self.names.get(cls_id, str(cls_id))
+            det = {
+                "xmin": xmin,
+                "ymin": ymin,
+                "xmax": xmax,
+                "ymax": ymax,
+                "conf": conf,
+                "cls_id": cls_id,
+                "cls_name": f"suspected_{name}" if suspected else name,
+            }
+            if validated:
+                det["_box_area"] = box_area
+                det["_motion_ratio"] = motion_ratio
+                det["_fire_ratio"] = fire_ratio
+            if low_jitter:
+                det["hold_reason"] = "low_jitter"
+            if level:
+                det["warning_level"] = level
+            if track_frames:
+                det["track_jitter"] = round(track_jitter, 4)
+                det["track_frames"] = track_frames
+            detections.append(det)
+        return detections
@@ -1,6 +1,6 @@
 import json
 import time
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Tuple, Optional, Any, Callable
 import cv2
 import numpy as np
 from ultralytics import YOLO
@@ -8,6 +8,16 @@ import logging
 import sys
 import math
 import os
+import threading
+
+from core.yolo import color_lut
+from core.yolo.detections import DetectionBatch
+from core.yolo.enhance import ClaheEnhancer, LazyEnhancedFrame
+from core.yolo.integral import IntegralStats
+from core.yolo.motion import MOTION_METHODS, create_motion_estimator, foreground_ratio, sample_step
+from core.yolo.roi_features import RoiFeatures
+from core.yolo.roi_mask import RoiMask
+from core.yolo.tiling import merge_detections, select_motion_tiles, shift_detections, tile_grid
 
 # 导入项目统一的日志配置
 try:
@@ -32,6 +42,9 @@ try:
 except Exception as e:
     _TORCH_AVAILABLE = False
 
+# 推理后端：ultralytics（YOLO.predict）、onnx（ONNX Runtime CPU）、torch（直接调用检测网络的精简 PyTorch 路径）
+YOLO_BACKENDS = ("ultralytics", "onnx", "torch")
+
 try:
     from config import CONFIDENCE_THRESHOLD, CAMERA_INDEX  # type: ignore
 except Exception:
@@ -56,7 +69,18 @@ class Detector:
             device: str = "cpu",
             classes: Optional[List[int]] = None,
             imgsz: int = 640,
+            model: Optional[YOLO] = None,
+            model_lock: Optional[threading.Lock] = None,
+            load_model: bool = True,
+            backend: str = "ultralytics",
     ):
+        """
+        函数级注释：初始化检测器
+        :param model: 已加载的 YOLO 模型，传入时复用该模型（多路视频流共享权重），不再重复加载
+        :param model_lock: 与共享模型配套的推理锁，同一模型的所有检测器必须使用同一把锁
+        :param load_model: 为 False 时不加载模型，仅用于预处理与校验（推理由独立的推理进程完成）
+        :param backend: 推理后端，见 YOLO_BACKENDS
+        """
         self.logger = get_logger("Detector")
 
         self.weights_path = weights_path
@@ -64,14 +88,15 @@ class Detector:
         self.device = device
         self.classes = classes
         self.imgsz = imgsz
+        self.backend = (backend or "ultralytics").lower()
 
         # ==========================================
         # 1. 动态背景与光照补偿模块
         # ==========================================
         # 用于适应不同光照条件，增强对比度
-        self.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        # 用于提取动态纹理，过滤静态照片
-        self.bg_subtractor = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=25, detectShadows=False)
+        self.enhancer = ClaheEnhancer(clip_limit=2.0, tile_grid=(8, 8))
+        # 用于提取动态纹理，过滤静态照片（估计方法与掩码分辨率由 motion_method / motion_mask_scale 热配置）
+        self.motion_estimator = create_motion_estimator()
 
         # ==========================================
         # 2. 火焰颜色模型 (HSV) 
@@ -89,8 +114,45 @@ class Detector:
         # 记录格式: { track_id: {'centroid': (x,y), 'frames': 连续帧数, 'misses': 丢失帧数} }
         self.tracked_targets = {}
         self.next_track_id = 0
+        # 最近一次 detect_frame 各阶段耗时（毫秒），用于离线评估与性能分析
+        self.last_timings: Dict[str, float] = {}
+        # 最近一次 detect_frame 的 YOLO 原始检测结果（多模态校验前，推理输入坐标系），用于模型对比评估
+        self.last_raw_detections = DetectionBatch()
+        # 最近一帧切片推理的切片数
+        self.last_tiles = 0
+        # 检测区域（每路视频流独立，由 set_roi 设置）
+        self.roi: Optional[RoiMask] = None
+        self._roi_signature = json.dumps([[], []])
+        # 远程推理函数 (enhanced_frame, imgsz) -> 原始检测结果，多进程模式下由 RemoteDetector 设置
+        self.inference_client: Optional[Callable[[np.ndarray, int], Optional[DetectionBatch]]] = None
+        # 远程批量推理函数 (frames, imgsz) -> 原始检测结果列表，切片推理一次提交同一帧的所有切片
+        self.inference_batch_client: Optional[Callable[[List[np.ndarray], int],
+                                                       List[Optional[DetectionBatch]]]] = None
+        # 运动门控状态
+        self.last_motion_ratio = 1.0
+        self.inference_skipped = 0
+        self.last_gated = False
+        self._last_full_inference = 0.0
+        # 分辨率级联状态
+        self._last_candidate_time = 0.0
+        self.last_imgsz = imgsz
+        self.cascade_escalations = 0
+        # 近重复帧缓存状态：上次推理帧的签名与校验结果
+        self._cache_signature: Optional[np.ndarray] = None
+        self._cache_key: Tuple = ()
+        self._cache_time = 0.0
+        self._cache_validation: Optional[Tuple[DetectionBatch, DetectionBatch, DetectionBatch]] = None
+        self._last_validation: Optional[Tuple[DetectionBatch, DetectionBatch, DetectionBatch]] = None
+        self.frame_cache_lookups = 0
+        self.frame_cache_hits = 0
+        self.last_cache_hit = False
         self._runtime_config_signature = ""
+        # 颜色类别定义与查找表（由火焰颜色阈值与 color_lut_enabled 决定）
+        self._fire_ranges: color_lut.Ranges = ()
+        self._color_classes: Dict[int, Tuple[str, color_lut.Ranges]] = {}
+        self._color_lut: Optional[np.ndarray] = None
         self._init_runtime_defaults()
+        self._sync_color_classes()
         self._init_runtime_config_loader()
         self._refresh_runtime_config(force=True)
 
@@ -107,9 +169,36 @@ class Detector:
             self.face_cascade = None
             self.logger.warning(f"加载人脸检测器失败: {e}")
 
-        self.logger.info(
-            f"初始化高级 Detector V2.0: weights={self.weights_path}, conf={self.conf}, device={self.device}")
-        self.model = self._load_model()
+        # 推理锁：多路视频流共享同一模型时串行化 predict 调用
+        self._model_lock = model_lock or threading.Lock()
+        if model is not None:
+            self.model = model
+            self.logger.info(f"初始化高级 Detector V2.0（共享已加载模型）: weights={self.weights_path}")
+        elif not load_model:
+            self.model = None
+            self.logger.info("初始化高级 Detector V2.0（不加载模型，仅预处理与校验）")
+        else:
+            self.logger.info(
+                f"初始化高级 Detector V2.0: weights={self.weights_path}, conf={self.conf}, device={self.device}")
+            self.model = self._load_model()
+
+    def spawn(self) -> "Detector":
+        """
+        函数级注释：为新的视频流创建检测器
+        新实例共享已加载的模型与推理锁，但拥有独立的背景建模器、追踪器状态与人脸检测器，
+        因此每增加一路视频流只增加单路状态的内存，而不是一份模型权重
+        :return: 共享模型的新检测器
+        """
+        return Detector(
+            weights_path=self.weights_path,
+            conf=self.conf,
+            device=self.device,
+            classes=self.classes,
+            imgsz=self.imgsz,
+            model=self.model,
+            model_lock=self._model_lock,
+            backend=self.backend,
+        )
 
     def _init_runtime_defaults(self):
         self.yolo_iou_threshold = 0.45
@@ -131,6 +220,34 @@ class Detector:
         self.fire_track_match_dist_px = 80
         self.fire_track_min_iou = 0.10
         self.fire_track_area_change_max = 2.0
+        # 运动门控：全局前景比例低于阈值且没有追踪目标时跳过 YOLO 推理，每隔一段时间强制推理一次
+        self.motion_gate_enabled = False
+        self.motion_gate_min_ratio = 0.002
+        self.motion_gate_force_interval = 30.0
+        # 运动估计：mog2（背景建模）或 frame_diff（帧差）；掩码分辨率为画面的 motion_mask_scale 倍
+        self.motion_method = "mog2"
+        self.motion_mask_scale = 1.0
+        # 切片推理：整帧推理之外，对存在前景运动的原分辨率切片额外推理，找回远处的小火源
+        self.tiled_inference_enabled = False
+        self.tiled_tile_size = 640
+        self.tiled_overlap = 0.2
+        self.tiled_motion_min_ratio = 0.01
+        self.tiled_max_tiles = 4
+        # 分辨率级联：没有候选目标时以低分辨率推理，出现候选目标后升级到 imgsz，安静一段时间后回落
+        self.cascade_enabled = False
+        self.cascade_idle_imgsz = 320
+        self.cascade_hold_seconds = 5.0
+        # 近重复帧缓存：与上次推理帧的缩略图差异不超过容差时复用上次的校验结果，只重新执行追踪
+        self.frame_cache_enabled = False
+        self.frame_cache_tolerance = 3.0
+        self.frame_cache_max_age = 2.0
+        # 推理尺寸光照补偿：先缩小到推理尺寸再做 CLAHE，多模态校验与切片推理只补偿用到的原分辨率区域
+        self.enhance_at_inference_size = False
+        # 颜色类别查找表：火焰色、肤色、黄色、红色与高亮判定改为每个区域查一次表（常驻 16MB，同进程共享）
+        self.color_lut_enabled = False
+        # 积分图统计：火焰候选框重叠度（面积之和 / 外接区域面积）达到阈值时，在外接区域上统一计算特征与掩码积分图
+        self.integral_stats_enabled = False
+        self.integral_stats_min_overlap = 2.0
 
     def _init_runtime_config_loader(self):
         self.config_loader = None
@@ -164,6 +281,19 @@ class Detector:
             out = min(max_val, out)
         return out
 
+    def _to_bool(self, value: Any, default: bool) -> bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float)):
+            return value != 0
+        if isinstance(value, str):
+            lowered = value.strip().lower()
+            if lowered in ("1", "true", "yes", "on"):
+                return True
+            if lowered in ("0", "false", "no", "off"):
+                return False
+        return default
+
     def _refresh_runtime_config(self, force: bool = False):
         if not self.config_loader:
             return
@@ -190,6 +320,35 @@ class Detector:
                 "fire_track_min_iou": self.config_loader.get_config("fire_track_min_iou", self.fire_track_min_iou),
                 "fire_track_area_change_max": self.config_loader.get_config("fire_track_area_change_max",
                                                                             self.fire_track_area_change_max),
+                "motion_gate_enabled": self.config_loader.get_config("motion_gate_enabled", self.motion_gate_enabled),
+                "motion_gate_min_ratio": self.config_loader.get_config("motion_gate_min_ratio",
+                                                                       self.motion_gate_min_ratio),
+                "motion_gate_force_interval": self.config_loader.get_config("motion_gate_force_interval",
+                                                                            self.motion_gate_force_interval),
+                "motion_method": self.config_loader.get_config("motion_method", self.motion_method),
+                "motion_mask_scale": self.config_loader.get_config("motion_mask_scale", self.motion_mask_scale),
+                "tiled_inference_enabled": self.config_loader.get_config("tiled_inference_enabled",
+                                                                         self.tiled_inference_enabled),
+                "tiled_tile_size": self.config_loader.get_config("tiled_tile_size", self.tiled_tile_size),
+                "tiled_overlap": self.config_loader.get_config("tiled_overlap", self.tiled_overlap),
+                "tiled_motion_min_ratio": self.config_loader.get_config("tiled_motion_min_ratio",
+                                                                        self.tiled_motion_min_ratio),
+                "tiled_max_tiles": self.config_loader.get_config("tiled_max_tiles", self.tiled_max_tiles),
+                "cascade_enabled": self.config_loader.get_config("cascade_enabled", self.cascade_enabled),
+                "cascade_idle_imgsz": self.config_loader.get_config("cascade_idle_imgsz", self.cascade_idle_imgsz),
+                "cascade_hold_seconds": self.config_loader.get_config("cascade_hold_seconds",
+                                                                      self.cascade_hold_seconds),
+                "frame_cache_enabled": self.config_loader.get_config("frame_cache_enabled", self.frame_cache_enabled),
+                "frame_cache_tolerance": self.config_loader.get_config("frame_cache_tolerance",
+                                                                       self.frame_cache_tolerance),
+                "frame_cache_max_age": self.config_loader.get_config("frame_cache_max_age", self.frame_cache_max_age),
+                "enhance_at_inference_size": self.config_loader.get_config("enhance_at_inference_size",
+                                                                           self.enhance_at_inference_size),
+                "color_lut_enabled": self.config_loader.get_config("color_lut_enabled", self.color_lut_enabled),
+                "integral_stats_enabled": self.config_loader.get_config("integral_stats_enabled",
+                                                                        self.integral_stats_enabled),
+                "integral_stats_min_overlap": self.config_loader.get_config("integral_stats_min_overlap",
+                                                                            self.integral_stats_min_overlap),
             }
         except Exception as e:
             self.logger.warning(f"读取热配置失败: {e}")
@@ -199,6 +358,8 @@ class Detector:
         if not force and signature == self._runtime_config_signature:
             return
         self._runtime_config_signature = signature
+        # 校验阈值等配置已变化，缓存的校验结果不再可信
+        self._cache_validation = None
 
         # 更新 YOLO 置信度阈值
         self.conf = self._to_float(
@@ -252,12 +413,94 @@ class Detector:
             raw_cfg.get("fire_track_area_change_max"), self.fire_track_area_change_max, min_val=1.0, max_val=20.0
         )
 
-    def _clip_det_box(self, det: Dict, frame_shape: Tuple[int, ...]) -> Optional[Tuple[int, int, int, int]]:
+        self.motion_gate_enabled = self._to_bool(raw_cfg.get("motion_gate_enabled"), self.motion_gate_enabled)
+        self.motion_gate_min_ratio = self._to_float(
+            raw_cfg.get("motion_gate_min_ratio"), self.motion_gate_min_ratio, min_val=0.0, max_val=1.0
+        )
+        self.motion_gate_force_interval = self._to_float(
+            raw_cfg.get("motion_gate_force_interval"), self.motion_gate_force_interval, min_val=0.0, max_val=3600.0
+        )
+        motion_method = str(raw_cfg.get("motion_method") or self.motion_method).strip().lower()
+        self.motion_method = motion_method if motion_method in MOTION_METHODS else self.motion_method
+        self.motion_mask_scale = self._to_float(
+            raw_cfg.get("motion_mask_scale"), self.motion_mask_scale, min_val=0.1, max_val=1.0
+        )
+        if (self.motion_method, self.motion_mask_scale) != (self.motion_estimator.method,
+                                                            self.motion_estimator.scale):
+            # 估计方法或掩码分辨率变化后重新学习背景
+            self.motion_estimator = create_motion_estimator(self.motion_method, self.motion_mask_scale)
+            self.logger.info(f"运动估计已更新: method={self.motion_method}, scale={self.motion_mask_scale}")
+
+        self.tiled_inference_enabled = self._to_bool(raw_cfg.get("tiled_inference_enabled"),
+                                                     self.tiled_inference_enabled)
+        # 切片边长即切片推理尺寸，同样按 32 对齐
+        self.tiled_tile_size = self._to_int(
+            raw_cfg.get("tiled_tile_size"), self.tiled_tile_size, min_val=160, max_val=1280
+        ) // 32 * 32
+        self.tiled_overlap = self._to_float(
+            raw_cfg.get("tiled_overlap"), self.tiled_overlap, min_val=0.0, max_val=0.5
+        )
+        self.tiled_motion_min_ratio = self._to_float(
+            raw_cfg.get("tiled_motion_min_ratio"), self.tiled_motion_min_ratio, min_val=0.0, max_val=1.0
+        )
+        self.tiled_max_tiles = self._to_int(
+            raw_cfg.get("tiled_max_tiles"), self.tiled_max_tiles, min_val=0, max_val=16
+        )
+
+        self.cascade_enabled = self._to_bool(raw_cfg.get("cascade_enabled"), self.cascade_enabled)
+        # 推理尺寸按 32 对齐（YOLO 最大步长）
+        self.cascade_idle_imgsz = self._to_int(
+            raw_cfg.get("cascade_idle_imgsz"), self.cascade_idle_imgsz, min_val=160, max_val=1280
+        ) // 32 * 32
+        self.cascade_hold_seconds = self._to_float(
+            raw_cfg.get("cascade_hold_seconds"), self.cascade_hold_seconds, min_val=0.0, max_val=600.0
+        )
+
+        self.frame_cache_enabled = self._to_bool(raw_cfg.get("frame_cache_enabled"), self.frame_cache_enabled)
+        self.frame_cache_tolerance = self._to_float(
+            raw_cfg.get("frame_cache_tolerance"), self.frame_cache_tolerance, min_val=0.0, max_val=64.0
+        )
+        self.frame_cache_max_age = self._to_float(
+            raw_cfg.get("frame_cache_max_age"), self.frame_cache_max_age, min_val=0.0, max_val=60.0
+        )
+        self.enhance_at_inference_size = self._to_bool(raw_cfg.get("enhance_at_inference_size"),
+                                                       self.enhance_at_inference_size)
+        self.color_lut_enabled = self._to_bool(raw_cfg.get("color_lut_enabled"), self.color_lut_enabled)
+        self._sync_color_classes()
+        self.integral_stats_enabled = self._to_bool(raw_cfg.get("integral_stats_enabled"),
+                                                    self.integral_stats_enabled)
+        self.integral_stats_min_overlap = self._to_float(
+            raw_cfg.get("integral_stats_min_overlap"), self.integral_stats_min_overlap, min_val=1.0, max_val=100.0
+        )
+
+    def _sync_color_classes(self):
+        """
+        函数级注释：按当前火焰颜色阈值与开关更新颜色类别定义与查找表
+        查找表按阈值缓存，阈值不变时直接复用（同进程的检测器共享），阈值变化时才重新生成
+        """
+        fire_ranges = color_lut.normalize_ranges((
+            (self.fire_color_low1, self.fire_color_high1),
+            (self.fire_color_low2, self.fire_color_high2),
+            (self.fire_color_low3, self.fire_color_high3),
+        ))
+        if fire_ranges != self._fire_ranges:
+            self._fire_ranges = fire_ranges
+            self._color_classes = color_lut.color_classes(fire_ranges)
+        if not self.color_lut_enabled:
+            self._color_lut = None
+            return
+        start = time.time()
+        lut = color_lut.build_color_lut(fire_ranges)
+        if lut is not self._color_lut:
+            self._color_lut = lut
+            self.logger.info(f"颜色类别查找表已就绪，耗时 {(time.time() - start) * 1000:.0f}ms")
+
+    def _clip_det_box(self, det: np.void, frame_shape: Tuple[int, ...]) -> Optional[Tuple[int, int, int, int]]:
         h, w = frame_shape[:2]
-        xmin = max(0, min(w - 1, int(det.get("xmin", 0))))
-        ymin = max(0, min(h - 1, int(det.get("ymin", 0))))
-        xmax = max(0, min(w, int(det.get("xmax", 0))))
-        ymax = max(0, min(h, int(det.get("ymax", 0))))
+        xmin = max(0, min(w - 1, int(det["xmin"])))
+        ymin = max(0, min(h - 1, int(det["ymin"])))
+        xmax = max(0, min(w, int(det["xmax"])))
+        ymax = max(0, min(h, int(det["ymax"])))
         if xmax <= xmin or ymax <= ymin:
             return None
         return xmin, ymin, xmax, ymax
@@ -297,6 +540,13 @@ class Detector:
         self.logger.info("=" * 50)
 
     def _load_model(self) -> YOLO:
+        if self.backend == "onnx":
+            return self._load_onnx_model()
+        if self.backend == "torch":
+            return self._load_torch_model()
+        if self.backend != "ultralytics":
+            self.logger.warning(f"未知的推理后端 {self.backend}，使用 ultralytics")
+            self.backend = "ultralytics"
         try:
             self._check_gpu_availability()
             model = YOLO(self.weights_path)
@@ -318,114 +568,534 @@ class Detector:
             self.logger.exception(f"模型加载失败: {e}")
             raise
 
-    def _format_result(self, box: List[float], conf: float, cls: int, names: Dict[int, str]) -> Dict:
-        xmin, ymin, xmax, ymax = map(int, box)
-        return {
-            "xmin": xmin,
-            "ymin": ymin,
-            "xmax": xmax,
-            "ymax": ymax,
-            "conf": float(conf),
-            "cls_id": int(cls),
-            "cls_name": names.get(int(cls), str(int(cls))),
-        }
+    def _load_onnx_model(self):
+        """
+        函数级注释：加载 ONNX Runtime 推理后端（.pt 权重首次使用时导出为同名 .onnx）
+        """
+        from core.yolo.onnx_backend import OnnxYoloModel
+
+        try:
+            model = OnnxYoloModel.from_weights(self.weights_path, imgsz=self.imgsz)
+            if self.device and "cuda" in str(self.device).lower():
+                self.logger.warning("ONNX 推理后端只使用 CPU，忽略 yolo_device 设置")
+            self.logger.info(f"ONNX 模型加载成功: {model.onnx_path}")
+            return model
+        except Exception as e:
+            self.logger.exception(f"ONNX 模型加载失败: {e}")
+            raise
+
+    def warmup(self, runs: int = 3) -> float:
+        """
+        函数级注释：模型预热：以配置的推理尺寸对空白帧执行若干次推理
+        首次推理会触发层融合、内存分配与算子选择等惰性初始化，预热后第一个真实帧的延迟与稳态一致；
+        空白帧取常见的 16:9 画面比例，开启分辨率级联时同时预热空闲推理尺寸
+        :param runs: 每个推理尺寸的推理次数
+        :return: 预热耗时（毫秒）
+        """
+        if self.model is None or runs <= 0:
+            return 0.0
+        sizes = [self.imgsz]
+        if self.cascade_enabled and self.cascade_idle_imgsz < self.imgsz:
+            sizes.append(self.cascade_idle_imgsz)
+        start = time.time()
+        for imgsz in sizes:
+            dummy = np.full((imgsz * 9 // 16, imgsz, 3), 114, dtype=np.uint8)
+            for _ in range(runs):
+                self.infer(dummy, imgsz=imgsz)
+        elapsed_ms = (time.time() - start) * 1000
+        self.logger.info(f"模型预热完成: imgsz={sizes}, runs={runs}, 耗时 {elapsed_ms:.0f} ms")
+        return elapsed_ms
+
+    def _load_torch_model(self):
+        """
+        函数级注释：加载精简 PyTorch 推理后端（不经过 YOLO.predict 的预测器流水线）
+        """
+        from core.yolo.torch_backend import TorchYoloModel
+
+        try:
+            target = self.device or "cpu"
+            if "cuda" in str(target).lower() and not (_TORCH_AVAILABLE and torch.cuda.is_available()):
+                self.logger.warning("请求使用 GPU，但 CUDA 不可用，回退到 CPU")
+                target = "cpu"
+            model = TorchYoloModel.from_weights(self.weights_path, device=target)
+            self.logger.info(f"精简 PyTorch 推理后端加载成功: device={target}")
+            return model
+        except Exception as e:
+            self.logger.exception(f"精简 PyTorch 推理后端加载失败: {e}")
+            raise
 
     def detect_frame(self, frame: np.ndarray, draw: bool = True, return_time: bool = False,
-                     is_static_test: bool = False) -> Tuple[np.ndarray, List[Dict]]:
+                     is_static_test: bool = False,
+                     frame_time: Optional[float] = None) -> Tuple[np.ndarray, List[Dict]]:
         if frame is None:
             raise ValueError("输入帧为空")
         self._refresh_runtime_config(force=False)
 
-        if not is_static_test:
-            fg_mask = self.bg_subtractor.apply(frame)
+        start = time.time()
+        # 帧时间戳（秒）：离线评估按视频时间（帧号 / fps）传入，实时流默认取当前时间
+        now = start if frame_time is None else frame_time
+        self.last_raw_detections = DetectionBatch()
+        # 配置了检测区域时，背景建模、光照补偿、推理与校验都只在裁剪框内进行
+        work_frame, offset = frame, (0, 0)
+        if self.roi is not None and not is_static_test:
+            box = self.roi.prepare(frame.shape)
+            if box is None:
+                self.last_timings = {"preprocess_ms": 0.0, "infer_ms": 0.0, "postprocess_ms": 0.0, "total_ms": 0.0}
+                if return_time:
+                    return (frame.copy() if draw else frame), [], 0.0
+                return (frame.copy() if draw else frame), []
+            work_frame, offset = self.roi.crop(frame), (box[0], box[1])
+
+        self.last_cache_hit = False
+        fg_mask = self.update_foreground(work_frame, is_static_test=is_static_test)
+        if not is_static_test and self.motion_gate_skips(fg_mask, now, frame_shape=work_frame.shape):
+            self.last_timings = {
+                "preprocess_ms": (time.time() - start) * 1000,
+                "infer_ms": 0.0,
+                "postprocess_ms": 0.0,
+                "total_ms": (time.time() - start) * 1000,
+            }
+            if return_time:
+                return (frame.copy() if draw else frame), [], 0.0
+            return (frame.copy() if draw else frame), []
+        base_imgsz = self.imgsz if is_static_test else self.cascade_imgsz(now)
+        signature, cache_key = None, ()
+        if not is_static_test and self.frame_cache_enabled:
+            signature = self.frame_signature(work_frame)
+            cache_key = (work_frame.shape, base_imgsz)
+            if self._frame_cache_hit(signature, cache_key, now=now):
+                # 近重复帧：跳过光照补偿、推理与多模态校验，复用上次的校验结果，只重新执行追踪
+                annotated = frame.copy() if draw else frame
+                canvas = self.roi.crop(annotated) if work_frame is not frame else annotated
+                others, candidates, rejected = (group.copy() for group in self._cache_validation)
+                detections = self._finish_postprocess(canvas, others, candidates, rejected, draw=draw, now=now)
+                detections = detections.shift(*offset).to_dicts()
+                total_ms = (time.time() - start) * 1000
+                self.last_timings = {"preprocess_ms": total_ms, "infer_ms": 0.0, "postprocess_ms": 0.0,
+                                     "total_ms": total_ms}
+                if return_time:
+                    return annotated, detections, 0.0
+                return annotated, detections
+        infer_imgsz = self._roi_imgsz(frame.shape, work_frame.shape, base_imgsz)
+        box_scale = None
+        if self.enhance_at_inference_size:
+            # 推理输入在推理尺寸上补偿；校验与切片推理用到的原分辨率区域按需补偿
+            enhanced_frame = LazyEnhancedFrame(work_frame, self.enhancer)
+            infer_input, box_scale = self.enhancer.enhance_for_inference(work_frame, infer_imgsz)
+        else:
+            enhanced_frame = infer_input = self.enhance_frame(work_frame)
+        preprocess_done = time.time()
+        raw_detections, elapsed = self.infer(infer_input, imgsz=infer_imgsz)
+        if raw_detections is not None and box_scale is not None:
+            raw_detections.scale(*box_scale)
+        if raw_detections is not None and self.tiled_inference_enabled and not is_static_test:
+            tile_start = time.time()
+            tile_detections = self.infer_motion_tiles(enhanced_frame, fg_mask)
+            elapsed += time.time() - tile_start
+            if len(tile_detections):
+                raw_detections = merge_detections(
+                    DetectionBatch.concat([raw_detections, tile_detections]), self.yolo_iou_threshold
+                )
+        infer_done = time.time()
+        self.last_timings = {
+            "preprocess_ms": (preprocess_done - start) * 1000,
+            "infer_ms": (infer_done - preprocess_done) * 1000,
+            "postprocess_ms": 0.0,
+            "total_ms": (infer_done - start) * 1000,
+        }
+        if raw_detections is None:
+            empty_dets: List[Dict] = []
+            if return_time:
+                return (frame.copy() if draw else frame), empty_dets, elapsed
+            return (frame.copy() if draw else frame), empty_dets
+
+        annotated = frame.copy() if draw else frame
+        if work_frame is not frame:
+            # 区域外（被排除区域）的候选框不进入多模态校验
+            raw_detections = raw_detections[self.roi.contains_boxes(raw_detections.boxes)]
+            canvas = self.roi.crop(annotated)
+        else:
+            canvas = annotated
+        # 多模态校验与追踪会写入检测批的字段，保留副本
+        self.last_raw_detections = raw_detections.copy()
+        self._last_validation = None
+        _, detections = self.postprocess(work_frame, enhanced_frame, fg_mask, raw_detections,
+                                         draw=draw, is_static_test=is_static_test, canvas=canvas, now=now)
+        if signature is not None and self._last_validation is not None:
+            self._cache_signature = signature
+            self._cache_key = cache_key
+            self._cache_time = now
+            self._cache_validation = self._last_validation
+        # 对外接口：检测批换算回整帧坐标后转换为字典列表
+        detections = detections.shift(*offset).to_dicts()
+        done = time.time()
+        self.last_timings["postprocess_ms"] = (done - infer_done) * 1000
+        self.last_timings["total_ms"] = (done - start) * 1000
+        if return_time:
+            return annotated, detections, elapsed
+        return annotated, detections
+
+    @staticmethod
+    def frame_signature(frame: np.ndarray) -> np.ndarray:
+        """
+        函数级注释：帧签名：32x32 灰度缩略图
+        INTER_AREA 缩放即分块求均值，1080p 画面每块约 60x34 像素，传感器噪声被平均掉，
+        而局部出现的小火苗仍会让所在块的均值明显变化
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def _frame_cache_hit(self, signature: np.ndarray, cache_key: Tuple, now: Optional[float] = None) -> bool:
+        """
+        函数级注释：判断当前帧能否复用上次推理帧的校验结果
+        与上次实际推理的帧比较（而不是上一帧），缓慢变化不会无限累积；
+        裁剪框或推理尺寸变化、任一块差异超过容差、缓存超过 frame_cache_max_age 秒时重新推理
+        """
+        now = time.time() if now is None else now
+        self.frame_cache_lookups += 1
+        hit = (
+                self._cache_validation is not None
+                and cache_key == self._cache_key
+                and now - self._cache_time <= self.frame_cache_max_age
+                and int(np.abs(signature - self._cache_signature).max()) <= self.frame_cache_tolerance
+        )
+        if hit:
+            self.frame_cache_hits += 1
+        self.last_cache_hit = hit
+        return hit
+
+    def frame_cache_stats(self) -> Dict[str, Any]:
+        """
+        函数级注释：近重复帧缓存统计
+        """
+        return {
+            "lookups": self.frame_cache_lookups,
+            "hits": self.frame_cache_hits,
+            "hit_rate": round(self.frame_cache_hits / self.frame_cache_lookups, 3) if self.frame_cache_lookups else 0.0,
+        }
+
+    def set_roi(self, include: Any = None, exclude: Any = None):
+        """
+        函数级注释：设置检测区域（包含/排除多边形，归一化坐标）
+        配置未变化时直接返回；变化后重置背景建模与追踪器，因为裁剪框坐标系已改变
+        """
+        signature = json.dumps([include or [], exclude or []], sort_keys=True, default=str)
+        if signature == self._roi_signature:
+            return
+        self._roi_signature = signature
+
+        roi = RoiMask(include, exclude)
+        self.roi = roi if roi.enabled else None
+        self.motion_estimator.reset()
+        self.tracked_targets = {}
+        self._cache_validation = None
+        if self.roi is not None:
+            self.logger.info(f"检测区域已更新: 包含 {len(roi.include)} 个多边形, 排除 {len(roi.exclude)} 个多边形")
         else:
-            fg_mask = np.ones(frame.shape[:2], dtype=np.uint8) * 255
+            self.logger.info("检测区域已清除，使用整帧检测")
+
+    def _roi_imgsz(self, frame_shape: Tuple[int, ...], work_shape: Tuple[int, ...],
+                   imgsz: Optional[int] = None) -> int:
+        """
+        函数级注释：裁剪后的推理尺寸
+        按裁剪框与整帧的长边比例缩小 imgsz（32 对齐），保持与整帧推理相同的像素尺度，
+        推理开销随裁剪面积成比例下降
+        :param imgsz: 整帧推理尺寸，None 表示使用 self.imgsz
+        """
+        imgsz = imgsz or self.imgsz
+        if work_shape[:2] == frame_shape[:2]:
+            return imgsz
+        ratio = max(work_shape[0], work_shape[1]) / float(max(frame_shape[0], frame_shape[1]))
+        return max(32, min(imgsz, int(math.ceil(imgsz * ratio / 32.0)) * 32))
+
+    def cascade_imgsz(self, now: Optional[float] = None) -> int:
+        """
+        函数级注释：分辨率级联：当前帧的整帧推理尺寸
+        存在追踪中的目标或距最近一次候选目标不足 cascade_hold_seconds 秒时使用 imgsz，保证确认帧的检测精度；
+        否则使用 cascade_idle_imgsz，绝大多数空闲帧的推理开销随像素数下降
+        """
+        imgsz = self.imgsz
+        if self.cascade_enabled:
+            now = time.time() if now is None else now
+            if not self.tracked_targets and now - self._last_candidate_time >= self.cascade_hold_seconds:
+                imgsz = min(self.imgsz, self.cascade_idle_imgsz)
+        if imgsz != self.last_imgsz:
+            if imgsz > self.last_imgsz:
+                self.cascade_escalations += 1
+            self.logger.info(f"分辨率级联: 推理尺寸 {self.last_imgsz} -> {imgsz}")
+            self.last_imgsz = imgsz
+        return imgsz
+
+    def preprocess_frame(self, frame: np.ndarray, is_static_test: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        函数级注释：帧预处理（检测流水线第 1 段）
+        更新背景建模得到前景掩码，并做 CLAHE 光照补偿
+        :return: (前景掩码, 增强后的帧)
+        """
+        fg_mask = self.update_foreground(frame, is_static_test=is_static_test)
+        return fg_mask, self.enhance_frame(frame)
 
-        yuv = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV)
-        yuv[:, :, 0] = self.clahe.apply(yuv[:, :, 0])
-        enhanced_frame = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR)
+    def update_foreground(self, frame: np.ndarray, is_static_test: bool = False) -> np.ndarray:
+        """
+        函数级注释：更新运动估计并返回前景掩码（分辨率可能低于画面，见 motion_mask_scale）
+        """
+        if not is_static_test:
+            return self.motion_estimator.apply(frame)
+        return np.ones(frame.shape[:2], dtype=np.uint8) * 255
 
+    def enhance_frame(self, frame: np.ndarray) -> np.ndarray:
+        """
+        函数级注释：CLAHE 光照补偿
+        """
+        return self.enhancer.enhance(frame)
+
+    def motion_gate_skips(self, fg_mask: np.ndarray, now: Optional[float] = None,
+                          frame_shape: Optional[Tuple[int, ...]] = None) -> bool:
+        """
+        函数级注释：运动门控：判断当前帧是否可以跳过 YOLO 推理
+        在 1/4 分辨率的采样掩码上计算全局前景比例；存在追踪中的目标或距上次完整推理超过
+        motion_gate_force_interval 秒时不跳过，保证追踪连续并定期兜底检查静止火源
+        :param frame_shape: 画面尺寸，掩码低于画面分辨率时按比例减小采样步长
+        :return: True 表示跳过推理
+        """
+        now = time.time() if now is None else now
+        step = sample_step(fg_mask, frame_shape)
+        sampled = fg_mask[::step, ::step]
+        self.last_motion_ratio = cv2.countNonZero(sampled) / float(max(sampled.size, 1))
+
+        skip = (
+                self.motion_gate_enabled
+                and not self.tracked_targets
+                and self.last_motion_ratio < self.motion_gate_min_ratio
+                and now - self._last_full_inference < self.motion_gate_force_interval
+        )
+        if skip:
+            self.inference_skipped += 1
+        else:
+            self._last_full_inference = now
+        self.last_gated = skip
+        return skip
+
+    def infer(self, enhanced_frame: np.ndarray,
+              imgsz: Optional[int] = None) -> Tuple[Optional[DetectionBatch], float]:
+        """
+        函数级注释：YOLO 推理（检测流水线第 2 段）
+        只做模型前向与格式化，不做多模态校验，可在独立的推理进程中调用；
+        设置了 inference_client 时（多进程模式的工作进程）交给推理进程完成
+        :param imgsz: 推理尺寸，None 表示使用 self.imgsz
+        :return: (原始检测结果，推理失败时为 None, 推理耗时秒数)
+        """
+        imgsz = imgsz or self.imgsz
         start = time.time()
+        if self.inference_client is not None:
+            raw_detections = self.inference_client(enhanced_frame, imgsz)
+            return raw_detections, time.time() - start
         try:
-            results = self.model.predict(
-                source=enhanced_frame,
-                conf=self.conf,
-                iou=self.yolo_iou_threshold,
-                classes=self.classes,
-                imgsz=self.imgsz,
-                verbose=False,
-            )
+            with self._model_lock:
+                results = self.model.predict(
+                    source=enhanced_frame,
+                    conf=self.conf,
+                    iou=self.yolo_iou_threshold,
+                    classes=self.classes,
+                    imgsz=imgsz,
+                    verbose=False,
+                )
         except Exception as e:
             elapsed = time.time() - start
             self.logger.exception(f"YOLO 单帧推理失败: {e}")
-            empty_dets: List[Dict] = []
-            if return_time:
-                return (frame.copy() if draw else frame), empty_dets, elapsed
-            return (frame.copy() if draw else frame), empty_dets
+            return None, elapsed
 
         elapsed = time.time() - start
+        raw_detections = self._parse_result(results[0]) if results and len(results) > 0 else DetectionBatch()
+        return raw_detections, elapsed
 
-        detections: List[Dict] = []
-        annotated = frame.copy() if draw else frame
-        current_fire_candidates: List[Dict] = []
+    def infer_batch(self, frames: List[np.ndarray], imgsz: Optional[int] = None) -> List[Optional[DetectionBatch]]:
+        """
+        函数级注释：批量 YOLO 推理（一次前向处理多路视频流的帧）
+        直接调用模型，不经过 inference_client，供 InferenceBatcher 与推理进程使用
+        :param frames: 增强后的帧列表
+        :param imgsz: 推理尺寸，None 表示使用 self.imgsz
+        :return: 与 frames 一一对应的原始检测结果，推理失败时全部为 None
+        """
+        if not frames:
+            return []
+        try:
+            with self._model_lock:
+                results = self.model.predict(
+                    source=list(frames),
+                    conf=self.conf,
+                    iou=self.yolo_iou_threshold,
+                    classes=self.classes,
+                    imgsz=imgsz or self.imgsz,
+                    verbose=False,
+                )
+        except Exception as e:
+            self.logger.exception(f"YOLO 批量推理失败（{len(frames)} 帧）: {e}")
+            return [None] * len(frames)
+        return [self._parse_result(res) for res in results]
 
-        if results and len(results) > 0:
-            res = results[0]
-            try:
-                cls_names = res.names if hasattr(res, "names") and res.names else (
-                    self.model.names if hasattr(self.model, "names") else {})
-            except Exception:
-                cls_names = {}
-
-            boxes = getattr(res, "boxes", None)
-            if boxes is not None:
-                try:
-                    xyxy = boxes.xyxy.cpu().numpy() if hasattr(boxes.xyxy, "cpu") else np.array(boxes.xyxy)
-                    confs = boxes.conf.cpu().numpy() if hasattr(boxes.conf, "cpu") else np.array(boxes.conf)
-                    clss = boxes.cls.cpu().numpy() if hasattr(boxes.cls, "cpu") else np.array(boxes.cls)
-                except Exception:
-                    xyxy, confs, clss = np.array([]), np.array([]), np.array([])
-
-                for box, conf, cls in zip(xyxy, confs, clss):
-                    det = self._format_result(box.tolist(), float(conf), int(cls), cls_names)
-                    cls_name_lower = det.get('cls_name', '').lower()
-
-                    if cls_name_lower == 'fire':
-                        self.logger.info(
-                            f"YOLO检测到火灾: conf={det['conf']:.3f}, box=[{det['xmin']},{det['ymin']},{det['xmax']},{det['ymax']}]")
-                        is_valid = self._validate_fire(frame, enhanced_frame, fg_mask, det,
-                                                       skip_motion_check=is_static_test)
-                        if is_valid:
-                            current_fire_candidates.append(det)
-                        else:
-                            if draw:
-                                self._draw_box(annotated, det, level=0)
-
-                    elif cls_name_lower == 'smoke':
-                        # smoke 继续禁用，避免加湿器误报
-                        pass
-
-                    else:
-                        detections.append(det)
-                        if draw:
-                            self._draw_box(annotated, det, level=-1)
+    def infer_motion_tiles(self, enhanced_frame: np.ndarray, fg_mask: np.ndarray) -> DetectionBatch:
+        """
+        函数级注释：切片推理：对前景运动最明显的切片按原始分辨率推理
+        画面长边不超过切片尺寸时整帧推理已是原分辨率，直接返回
+        :return: 整帧坐标系的切片检测结果
+        """
+        height, width = enhanced_frame.shape[:2]
+        self.last_tiles = 0
+        if max(height, width) <= self.tiled_tile_size:
+            return DetectionBatch()
+        tiles = select_motion_tiles(
+            fg_mask,
+            tile_grid(width, height, self.tiled_tile_size, self.tiled_overlap),
+            min_ratio=self.tiled_motion_min_ratio,
+            max_tiles=self.tiled_max_tiles,
+            frame_shape=enhanced_frame.shape,
+        )
+        if not tiles:
+            return DetectionBatch()
+        self.last_tiles = len(tiles)
+
+        crops = [enhanced_frame[y0:y1, x0:x1] for x0, y0, x1, y1 in tiles]
+        if self.inference_batch_client is not None:
+            results = self.inference_batch_client(crops, self.tiled_tile_size)
+        elif self.inference_client is not None:
+            results = [self.inference_client(crop, self.tiled_tile_size) for crop in crops]
+        else:
+            results = self.infer_batch(crops, imgsz=self.tiled_tile_size)
+
+        return DetectionBatch.concat([shift_detections(result, tile)
+                                      for tile, result in zip(tiles, results) if result is not None])
+
+    def _parse_result(self, res: Any) -> DetectionBatch:
+        """
+        函数级注释：将单张图像的推理结果转换为检测批
+        """
+        try:
+            cls_names = res.names if hasattr(res, "names") and res.names else (
+                self.model.names if hasattr(self.model, "names") else {})
+        except Exception:
+            cls_names = {}
+
+        boxes = getattr(res, "boxes", None)
+        if boxes is None:
+            return DetectionBatch(names=cls_names)
+        try:
+            xyxy = boxes.xyxy.cpu().numpy() if hasattr(boxes.xyxy, "cpu") else np.array(boxes.xyxy)
+            confs = boxes.conf.cpu().numpy() if hasattr(boxes.conf, "cpu") else np.array(boxes.conf)
+            clss = boxes.cls.cpu().numpy() if hasattr(boxes.cls, "cpu") else np.array(boxes.cls)
+        except Exception:
+            return DetectionBatch(names=cls_names)
+        return DetectionBatch.from_arrays(xyxy, confs, clss.astype(np.int32), cls_names)
+
+    def postprocess(self, frame: np.ndarray, enhanced_frame: np.ndarray, fg_mask: np.ndarray,
+                    raw_detections: DetectionBatch, draw: bool = True,
+                    is_static_test: bool = False,
+                    canvas: Optional[np.ndarray] = None,
+                    now: Optional[float] = None) -> Tuple[np.ndarray, DetectionBatch]:
+        """
+        函数级注释：多模态校验与三级预警追踪（检测流水线第 3 段）
+        :param enhanced_frame: 光照补偿后的帧，或按区域补偿的 LazyEnhancedFrame（只做切片访问）
+        :param canvas: 绘制目标，None 时在 frame 的副本上绘制（检测区域模式下为整帧副本中的裁剪框视图）
+        :param now: 帧时间戳（秒），None 时取当前时间
+        :return: (标注后的帧, 检测结果)
+        """
+        if canvas is not None:
+            annotated = canvas
+        else:
+            annotated = frame.copy() if draw else frame
+
+        # 按类别分组只需查一次类别名称表
+        cls_ids = raw_detections.data["cls_id"]
+        kinds = {int(cls_id): raw_detections.names.get(int(cls_id), str(int(cls_id))).lower()
+                 for cls_id in np.unique(cls_ids)}
+        kind = np.array([kinds[int(cls_id)] for cls_id in cls_ids], dtype=object)
+        valid = np.zeros(len(raw_detections), dtype=bool)
+
+        fire_indices = np.flatnonzero(kind == 'fire')
+        region = None
+        if self.integral_stats_enabled and len(fire_indices) > 1:
+            region = self._build_region_features(frame, enhanced_frame, fg_mask, raw_detections[fire_indices])
+        for i in fire_indices:
+            det = raw_detections[i]
+            self.logger.info(
+                f"YOLO检测到火灾: conf={det['conf']:.3f}, box=[{det['xmin']},{det['ymin']},{det['xmax']},{det['ymax']}]")
+            valid[i] = self._validate_fire(frame, enhanced_frame, fg_mask, det, skip_motion_check=is_static_test,
+                                           region=region)
+
+        # smoke 继续禁用，避免加湿器误报
+        detections = raw_detections[(kind != 'fire') & (kind != 'smoke')]
+        current_fire_candidates = raw_detections[valid]
+        rejected = raw_detections[(kind == 'fire') & ~valid]
+
+        # 追踪会写入检测批的字段，保留校验结果的副本供近重复帧复用
+        self._last_validation = (detections.copy(), current_fire_candidates.copy(), rejected.copy())
+        detections = self._finish_postprocess(annotated, detections, current_fire_candidates, rejected,
+                                              draw=draw, is_static_test=is_static_test, now=now)
+        return annotated, detections
+
+    def _build_region_features(self, frame: np.ndarray, enhanced_frame: np.ndarray, fg_mask: np.ndarray,
+                               candidates: DetectionBatch) -> Optional[RoiFeatures]:
+        """
+        函数级注释：火焰候选框外接区域的共享特征，附带前景与各颜色类别掩码的积分图
+        只有候选框面积之和达到外接区域面积的 integral_stats_min_overlap 倍
+        （重叠严重，逐框计算会多次处理同一批像素）时才生成
+        :return: 外接区域特征（stats 为积分图统计），不值得生成时为 None
+        """
+        h, w = frame.shape[:2]
+        boxes = candidates.boxes.astype(np.int64)
+        # 与 _clip_det_box 相同的裁剪方式
+        x0 = np.clip(boxes[:, 0], 0, w - 1)
+        y0 = np.clip(boxes[:, 1], 0, h - 1)
+        x1 = np.clip(boxes[:, 2], 0, w)
+        y1 = np.clip(boxes[:, 3], 0, h)
+        keep = (x1 > x0) & (y1 > y0)
+        if not keep.any():
+            return None
+        x0, y0, x1, y1 = x0[keep], y0[keep], x1[keep], y1[keep]
+        region = (int(x0.min()), int(y0.min()), int(x1.max()), int(y1.max()))
+        region_area = (region[2] - region[0]) * (region[3] - region[1])
+        if int(((x1 - x0) * (y1 - y0)).sum()) < region_area * self.integral_stats_min_overlap:
+            return None
+
+        features = RoiFeatures(frame, enhanced_frame, region, self._color_classes, self._color_lut)
+        stats = IntegralStats(region)
+        stats.set_foreground(fg_mask, frame.shape)
+        for flag in (color_lut.SKIN, color_lut.YELLOW, color_lut.RED, color_lut.HIGHLIGHT):
+            stats.add((flag, False), features.color_mask(flag))
+        stats.add((color_lut.FIRE, True), features.color_mask(color_lut.FIRE, enhanced=True))
+        features.stats = stats
+        return features
+
+    def _finish_postprocess(self, annotated: np.ndarray, detections: DetectionBatch,
+                            current_fire_candidates: DetectionBatch, rejected: DetectionBatch,
+                            draw: bool = True, is_static_test: bool = False,
+                            now: Optional[float] = None) -> DetectionBatch:
+        """
+        函数级注释：校验之后的追踪与绘制
+        :param detections: 非火焰类别的检测结果
+        :param current_fire_candidates: 通过多模态校验的火焰候选
+        :param rejected: 未通过校验的火焰候选（仅绘制）
+        :param now: 帧时间戳（秒），None 时取当前时间
+        :return: 检测结果（非火焰类别在前，追踪后的火焰目标在后）
+        """
+        if draw:
+            for i in range(len(rejected)):
+                self._draw_box(annotated, rejected, i, level=0)
+            for i in range(len(detections)):
+                self._draw_box(annotated, detections, i, level=-1)
 
         if not is_static_test:
-            confirmed_detections = self._update_tracker(current_fire_candidates)
+            confirmed_detections = self._update_tracker(current_fire_candidates, now)
         else:
-            confirmed_detections = []
-            for det in current_fire_candidates:
-                det['warning_level'] = 3
-                confirmed_detections.append(det)
+            confirmed_detections = current_fire_candidates
+            confirmed_detections.data['warning_level'] = 3
 
-        for det in confirmed_detections:
-            detections.append(det)
-            if draw:
-                self._draw_box(annotated, det, level=det.get('warning_level', 1))
+        if draw:
+            for i in range(len(confirmed_detections)):
+                level = int(confirmed_detections.data['warning_level'][i]) or 1
+                self._draw_box(annotated, confirmed_detections, i, level=level)
 
-        if return_time:
-            return annotated, detections, elapsed
-        return annotated, detections
+        return DetectionBatch.concat([detections, confirmed_detections])
 
     def _bbox_iou(self, a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -> float:
         ax1, ay1, ax2, ay2 = a
@@ -440,16 +1110,13 @@ class Detector:
         union = area_a + area_b - inter
         return float(inter / union) if union > 0 else 0.0
 
-    def _match_track_score(self, track: Dict, det: Dict) -> Optional[float]:
-        cx = (det['xmin'] + det['xmax']) / 2
-        cy = (det['ymin'] + det['ymax']) / 2
+    def _match_track_score(self, track: Dict, det_bbox: Tuple[int, int, int, int], det_area: int) -> Optional[float]:
+        cx = (det_bbox[0] + det_bbox[2]) / 2
+        cy = (det_bbox[1] + det_bbox[3]) / 2
         dist = math.hypot(cx - track['centroid'][0], cy - track['centroid'][1])
         if dist > self.fire_track_match_dist_px:
             return None
 
-        det_bbox = (det['xmin'], det['ymin'], det['xmax'], det['ymax'])
-        det_area = max((det['xmax'] - det['xmin']) * (det['ymax'] - det['ymin']), 1)
-
         track_bbox = track.get('bbox')
         track_area = float(track.get('area', det_area))
         iou = self._bbox_iou(track_bbox, det_bbox) if track_bbox else 0.0
@@ -480,26 +1147,31 @@ class Detector:
         area_jitter = float(np.std(areas) / max(np.mean(areas), 1.0))
         return center_jitter + area_jitter
 
-    def _update_tracker(self, current_detections: List[Dict]) -> List[Dict]:
+    def _update_tracker(self, current_detections: DetectionBatch, now: Optional[float] = None) -> DetectionBatch:
         """
         基于中心点的追踪与三级预警升级。
         小目标在升到 L3 前需要满足抖动阈值。
+        预警等级与追踪指标直接写入检测批的字段，返回同一个检测批。
+        now 为帧时间戳（秒），None 时取当前时间。
         """
-        updated_detections = []
         unmatched_tracks = set(self.tracked_targets.keys())
-
-        for det in current_detections:
-            det_area = max((det['xmax'] - det['xmin']) * (det['ymax'] - det['ymin']), 1)
-            box_diag = math.hypot(det['xmax'] - det['xmin'], det['ymax'] - det['ymin'])
-            det_bbox = (det['xmin'], det['ymin'], det['xmax'], det['ymax'])
-            cx = (det['xmin'] + det['xmax']) / 2
-            cy = (det['ymin'] + det['ymax']) / 2
+        if len(current_detections):
+            # 出现 L1 候选目标，分辨率级联在之后的帧升级到完整推理尺寸
+            self._last_candidate_time = time.time() if now is None else now
+
+        data = current_detections.data
+        for i, (xmin, ymin, xmax, ymax) in enumerate(current_detections.boxes.tolist()):
+            det_area = max((xmax - xmin) * (ymax - ymin), 1)
+            box_diag = math.hypot(xmax - xmin, ymax - ymin)
+            det_bbox = (xmin, ymin, xmax, ymax)
+            cx = (xmin + xmax) / 2
+            cy = (ymin + ymax) / 2
 
             best_track_id = None
             best_score = -1.0
             for tid in list(unmatched_tracks):
                 track = self.tracked_targets[tid]
-                score = self._match_track_score(track, det)
+                score = self._match_track_score(track, det_bbox, det_area)
                 if score is None:
                     continue
                 if score > best_score:
@@ -535,13 +1207,13 @@ class Detector:
             jitter = self._compute_track_jitter(track.get('history', []), box_diag)
             is_small_target = det_area < self.fire_small_area_threshold
             confirm_frames = self.fire_small_target_confirm_frames if is_small_target else 5
-            original_cls = det.get('cls_name', 'fire')
+            det = data[i]
 
             if frames >= confirm_frames:
                 if jitter < self.fire_small_target_jitter_min:
                     level = 2
-                    det['cls_name'] = f'suspected_{original_cls}'
-                    det['hold_reason'] = 'low_jitter'
+                    det['suspected'] = True
+                    det['low_jitter'] = True
                     self.logger.info(
                         f"目标抖动不足，维持在 L2: area={det_area}, jitter={jitter:.4f}, threshold={self.fire_small_target_jitter_min:.4f}"
                     )
@@ -549,22 +1221,21 @@ class Detector:
                     level = 3
             elif frames >= 2:
                 level = 2
-                det['cls_name'] = f'suspected_{original_cls}'
+                det['suspected'] = True
             else:
                 level = 1
-                det['cls_name'] = f'suspected_{original_cls}'
+                det['suspected'] = True
 
             det['warning_level'] = level
-            det['track_jitter'] = round(jitter, 4)
+            det['track_jitter'] = jitter
             det['track_frames'] = frames
-            updated_detections.append(det)
 
         for tid in list(unmatched_tracks):
             self.tracked_targets[tid]['misses'] += 1
             if self.tracked_targets[tid]['misses'] > 3:
                 del self.tracked_targets[tid]
 
-        return updated_detections
+        return current_detections
 
     def _get_dynamic_fire_thresholds(self, total_pixels: int) -> Dict[str, Any]:
         if total_pixels < self.fire_small_area_threshold:
@@ -590,21 +1261,15 @@ class Detector:
 
     def _is_yellow_object_false_alarm(
             self,
-            roi_raw: np.ndarray,
-            roi_enhanced: np.ndarray,
-            det: Dict,
+            features: RoiFeatures,
+            det: np.void,
             motion_ratio: float,
     ) -> bool:
-        total_pixels = max(roi_raw.shape[0] * roi_raw.shape[1], 1)
-        hsv_raw = cv2.cvtColor(roi_raw, cv2.COLOR_BGR2HSV)
-
-        yellow_mask = cv2.inRange(hsv_raw, np.array([15, 80, 80]), np.array([45, 255, 255]))
-        red_mask1 = cv2.inRange(hsv_raw, np.array([0, 70, 70]), np.array([15, 255, 255]))
-        red_mask2 = cv2.inRange(hsv_raw, np.array([165, 70, 70]), np.array([180, 255, 255]))
-        red_mask = cv2.bitwise_or(red_mask1, red_mask2)
+        total_pixels = features.total_pixels
+        hsv_raw = features.convert('hsv')
 
-        yellow_ratio = cv2.countNonZero(yellow_mask) / total_pixels
-        red_ratio = cv2.countNonZero(red_mask) / total_pixels
+        yellow_ratio = features.color_ratio(color_lut.YELLOW)
+        red_ratio = features.color_ratio(color_lut.RED)
 
         hit_count = 0
         reasons = []
@@ -631,7 +1296,7 @@ class Detector:
             reasons.append('small-stable')
 
         kernel = np.ones((3, 3), np.uint8)
-        yellow_clean = cv2.morphologyEx(yellow_mask, cv2.MORPH_OPEN, kernel)
+        yellow_clean = cv2.morphologyEx(features.color_mask(color_lut.YELLOW), cv2.MORPH_OPEN, kernel)
         contours, _ = cv2.findContours(yellow_clean, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         if contours:
             c = max(contours, key=cv2.contourArea)
@@ -654,10 +1319,12 @@ class Detector:
 
         return False
 
-    def _validate_fire(self, raw_frame: np.ndarray, enhanced_frame: np.ndarray, fg_mask: np.ndarray, det: Dict,
-                       skip_motion_check: bool = False) -> bool:
+    def _validate_fire(self, raw_frame: np.ndarray, enhanced_frame: np.ndarray, fg_mask: np.ndarray, det: np.void,
+                       skip_motion_check: bool = False, region: Optional[RoiFeatures] = None) -> bool:
         """
         火焰多模态校验（含黄色小物体抑制与动态阈值）。
+        det 为检测批中的记录视图，校验指标写回检测批。
+        region 为本帧候选框外接区域的共享特征（_build_region_features），提供时逐像素特征取其视图、各比例直接查积分图。
         """
         clipped = self._clip_det_box(det, raw_frame.shape)
         if clipped is None:
@@ -671,22 +1338,20 @@ class Detector:
             self.logger.info(f"验证2/10失败: ROI面积太小，area={total_pixels} < 200")
             return False
 
-        roi_raw = raw_frame[ymin:ymax, xmin:xmax]
-        roi_enhanced = enhanced_frame[ymin:ymax, xmin:xmax]
-        if roi_raw.size == 0 or roi_enhanced.size == 0:
+        # 各阶段共用的区域特征，颜色空间转换与阈值掩码只计算一次；增强图区域到颜色校验时才裁剪
+        features = RoiFeatures(raw_frame, enhanced_frame, clipped, self._color_classes, self._color_lut, region)
+        if features.raw.size == 0:
             self.logger.info("验证2/10失败: ROI为空")
             return False
 
         thresholds = self._get_dynamic_fire_thresholds(total_pixels)
 
-        roi_fg = fg_mask[ymin:ymax, xmin:xmax]
-        motion_ratio = cv2.countNonZero(roi_fg) / total_pixels
+        if region is not None and region.stats is not None and region.stats.has_foreground:
+            motion_ratio = region.stats.foreground_ratio(clipped)
+        else:
+            motion_ratio = foreground_ratio(fg_mask, clipped, raw_frame.shape)
 
-        ycrcb = cv2.cvtColor(roi_raw, cv2.COLOR_BGR2YCrCb)
-        skin_low = np.array([70, 130, 80])
-        skin_high = np.array([210, 180, 135])
-        skin_mask = cv2.inRange(ycrcb, skin_low, skin_high)
-        skin_ratio = cv2.countNonZero(skin_mask) / total_pixels
+        skin_ratio = features.color_ratio(color_lut.SKIN)
 
         # 计算检测框宽高比（人脸通常是接近方形的）
         box_ratio = width / max(height, 1)
@@ -698,7 +1363,7 @@ class Detector:
             return False
 
         # 提前创建灰度图，供后续所有检测使用
-        gray_roi = cv2.cvtColor(roi_raw, cv2.COLOR_BGR2GRAY)
+        gray_roi = features.convert('gray')
 
         # 人脸检测触发阈值降低，同时增加人脸比例条件
         if self.face_cascade and (skin_ratio > 0.08 or is_face_like_ratio):
@@ -726,25 +1391,17 @@ class Detector:
             self.logger.info(f"验证5/10失败: 检测到过多直线，lines={len(lines)} >= 8")
             return False
 
-        hsv = cv2.cvtColor(roi_enhanced, cv2.COLOR_BGR2HSV)
-        mask1 = cv2.inRange(hsv, self.fire_color_low1, self.fire_color_high1)
-        mask2 = cv2.inRange(hsv, self.fire_color_low2, self.fire_color_high2)
-        mask3 = cv2.inRange(hsv, self.fire_color_low3, self.fire_color_high3)
-        white_core_mask = cv2.inRange(hsv, np.array([0, 0, 220]), np.array([180, 60, 255]))
-        fire_mask = cv2.bitwise_or(cv2.bitwise_or(mask1, mask2), mask3)
-        fire_mask = cv2.bitwise_or(fire_mask, white_core_mask)
-
-        fire_ratio = cv2.countNonZero(fire_mask) / total_pixels
+        # 火焰色（含白色焰心）在增强图上判定
+        fire_ratio = features.color_ratio(color_lut.FIRE, enhanced=True)
         if fire_ratio < thresholds['min_fire_ratio']:
             self.logger.info(
                 f"验证6/10失败: 火焰颜色比例不足，fire_ratio={fire_ratio:.3f} < {thresholds['min_fire_ratio']:.3f}, scale={thresholds['scale']}"
             )
             return False
 
-        hsv_raw = cv2.cvtColor(roi_raw, cv2.COLOR_BGR2HSV)
+        hsv_raw = features.convert('hsv')
         v_channel = hsv_raw[:, :, 2]
-        highlight_mask = v_channel > 250
-        highlight_ratio = np.count_nonzero(highlight_mask) / total_pixels
+        highlight_ratio = features.color_ratio(color_lut.HIGHLIGHT)
 
         avg_saturation = float(np.mean(hsv_raw[:, :, 1]))
         if avg_saturation < 35 and highlight_ratio < 0.1:
@@ -752,7 +1409,7 @@ class Detector:
                 f"验证6/10失败: 平均饱和度不足，avg_saturation={avg_saturation:.2f} < 35 且 highlight_ratio={highlight_ratio:.3f} < 0.1")
             return False
 
-        if self._is_yellow_object_false_alarm(roi_raw, roi_enhanced, det, motion_ratio):
+        if self._is_yellow_object_false_alarm(features, det, motion_ratio):
             self.logger.info("验证7/10失败: 黄色小物体抑制命中")
             return False
 
@@ -760,6 +1417,7 @@ class Detector:
             self.logger.info(f"验证8/10失败: 高亮区域过多，highlight_ratio={highlight_ratio:.3f} > 0.75")
             return False
 
+        fire_mask = features.color_mask(color_lut.FIRE, enhanced=True)
         contours, _ = cv2.findContours(fire_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         complexity = 0.0
         c_area = 0.0
@@ -799,9 +1457,10 @@ class Detector:
                 )
                 return False
 
-        det['_box_area'] = total_pixels
-        det['_motion_ratio'] = motion_ratio
-        det['_fire_ratio'] = fire_ratio
+        det['validated'] = True
+        det['box_area'] = total_pixels
+        det['motion_ratio'] = motion_ratio
+        det['fire_ratio'] = fire_ratio
 
         # 火焰颜色与肤色重叠检查：如果同时有较高的火焰比例和肤色比例，增加验证标准
         if fire_ratio > 0.5 and skin_ratio > 0.08:
@@ -852,27 +1511,27 @@ class Detector:
 
         return False
 
-    def _validate_smoke(self, raw_frame: np.ndarray, det: Dict) -> bool:
+    def _validate_smoke(self, raw_frame: np.ndarray, det: np.void) -> bool:
         """
         函数级注释：烟雾特征验证，专门过滤加湿器水汽、白色反光等
         水汽特征：饱和度极低，亮度极高，内部没有高频纹理（很平滑）
         火灾烟雾特征：通常夹杂灰/黑/黄色，有颗粒感（高频细节）
         """
-        xmin, ymin, xmax, ymax = det['xmin'], det['ymin'], det['xmax'], det['ymax']
+        xmin, ymin, xmax, ymax = int(det['xmin']), int(det['ymin']), int(det['xmax']), int(det['ymax'])
         width, height = xmax - xmin, ymax - ymin
-        conf = det['conf']
+        conf = float(det['conf'])
 
         # 面积太小很难判断，直接放行或者过滤视需求而定，这里设定最小面积
         if width * height < 400:
             return False
 
-        roi_raw = raw_frame[ymin:ymax, xmin:xmax]
-        if roi_raw.size == 0: return False
+        features = RoiFeatures(raw_frame, None, (xmin, ymin, xmax, ymax))
+        if features.raw.size == 0: return False
 
         # ==========================================
         # 1. 亮度与饱和度分析 (HSV)
         # ==========================================
-        hsv = cv2.cvtColor(roi_raw, cv2.COLOR_BGR2HSV)
+        hsv = features.convert('hsv')
         s_channel = hsv[:, :, 1]
         v_channel = hsv[:, :, 2]
 
@@ -901,7 +1560,7 @@ class Detector:
         # 2. 纹理高频细节分析 (Laplacian 边缘检测方差)
         # ==========================================
         # 水汽内部非常平滑，边缘模糊；而浓烟内部有颗粒感，滚动时有明显的不规则纹理
-        gray_roi = cv2.cvtColor(roi_raw, cv2.COLOR_BGR2GRAY)
+        gray_roi = features.convert('gray')
         laplacian = cv2.Laplacian(gray_roi, cv2.CV_64F)
         variance = laplacian.var()
 
@@ -915,9 +1574,9 @@ class Detector:
         self.logger.info(f"烟雾验证通过: Conf={conf:.2f}, V={avg_v:.1f}, S={avg_s:.1f}, Var={variance:.1f}")
         return True
 
-    def _draw_box(self, img: np.ndarray, det: Dict, level: int = 1):
+    def _draw_box(self, img: np.ndarray, detections: DetectionBatch, index: int, level: int = 1):
         """
-        函数级注释：分级绘制检测框
+        函数级注释：分级绘制检测批中的一个检测框
         """
         if level == 3:
             color = (0, 0, 255)  # 红色: 高级确认 (真实报警)
@@ -935,9 +1594,11 @@ class Detector:
             color = (255, 0, 0)  # 蓝色: 其他类别
             status = ""
 
-        cv2.rectangle(img, (det["xmin"], det["ymin"]), (det["xmax"], det["ymax"]), color, 2)
-        label = f'{det["cls_name"]} {det["conf"]:.2f}{status}'
+        det = detections[index]
+        xmin, ymin, xmax, ymax = int(det["xmin"]), int(det["ymin"]), int(det["xmax"]), int(det["ymax"])
+        cv2.rectangle(img, (xmin, ymin), (xmax, ymax), color, 2)
+        label = f'{detections.label(index)} {float(det["conf"]):.2f}{status}'
         (w, h), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
-        y0 = max(det["ymin"], h + 6)
-        cv2.rectangle(img, (det["xmin"], y0 - h - 6), (det["xmin"] + w, y0), color, -1)
-        cv2.putText(img, label, (det["xmin"], y0 - 4), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        y0 = max(ymin, h + 6)
+        cv2.rectangle(img, (xmin, y0 - h - 6), (xmin + w, y0), color, -1)
+        cv2.putText(img, label, (xmin, y0 - 4), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
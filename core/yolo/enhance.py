@@ -0,0 +1,129 @@
+"""
+类级注释：CLAHE 光照补偿
+原流程对整帧（4K 时 800 万像素）做 YUV 转换与 CLAHE，随后 YOLO 又把画面缩小到 640。
+ClaheEnhancer 支持两种更省的用法：
+- enhance_for_inference：先缩小到推理尺寸再补偿，YOLO 的 letterbox 只需填充边缘
+- enhance_region：只补偿多模态校验需要的检测框区域，结果与整帧补偿后裁剪一致
+LazyEnhancedFrame 把后者包装成可切片的"增强帧"，只有被切片的区域才会计算
+"""
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+
+class ClaheEnhancer:
+    """
+    类级注释：YUV 亮度通道 CLAHE 光照补偿
+    """
+
+    def __init__(self, clip_limit: float = 2.0, tile_grid: Tuple[int, int] = (8, 8)):
+        """
+        函数级注释：初始化光照补偿
+        :param clip_limit: 对比度限制
+        :param tile_grid: 整帧的分块数 (列, 行)
+        """
+        self.clip_limit = clip_limit
+        self.tile_grid = tile_grid
+        self._clahes: Dict[Tuple[int, int], cv2.CLAHE] = {}
+
+    def _clahe(self, tile_grid: Tuple[int, int]) -> "cv2.CLAHE":
+        """
+        函数级注释：按分块数缓存 CLAHE 对象
+        """
+        clahe = self._clahes.get(tile_grid)
+        if clahe is None:
+            clahe = cv2.createCLAHE(clipLimit=self.clip_limit, tileGridSize=tile_grid)
+            self._clahes[tile_grid] = clahe
+        return clahe
+
+    def _apply(self, frame: np.ndarray, tile_grid: Tuple[int, int]) -> np.ndarray:
+        yuv = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV)
+        yuv[:, :, 0] = self._clahe(tile_grid).apply(yuv[:, :, 0])
+        return cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR)
+
+    def enhance(self, frame: np.ndarray) -> np.ndarray:
+        """
+        函数级注释：整帧光照补偿
+        """
+        return self._apply(frame, self.tile_grid)
+
+    def enhance_for_inference(self, frame: np.ndarray, imgsz: int) -> Tuple[np.ndarray, Tuple[float, float]]:
+        """
+        函数级注释：按推理尺寸缩小后再做光照补偿
+        缩放方式与 YOLO letterbox 相同（INTER_LINEAR、长边等于 imgsz），模型输入尺寸与原流程一致
+        :return: (补偿后的小图, 检测框换算回原画面的缩放系数 (sx, sy))
+        """
+        h, w = frame.shape[:2]
+        ratio = imgsz / float(max(h, w))
+        if ratio >= 1.0:
+            return self.enhance(frame), (1.0, 1.0)
+        size = (max(1, int(round(w * ratio))), max(1, int(round(h * ratio))))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+        return self.enhance(small), (w / float(size[0]), h / float(size[1]))
+
+    def _tile_layout(self, shape: Tuple[int, ...]) -> Tuple[int, int]:
+        """
+        函数级注释：整帧 CLAHE 的分块尺寸 (宽, 高)
+        与 OpenCV 一致：宽高任一不能被分块数整除时，两个方向都镜像填充到下一个整倍数（整除的方向多填充一整轮）
+        """
+        h, w = shape[:2]
+        tiles_x, tiles_y = self.tile_grid
+        if w % tiles_x == 0 and h % tiles_y == 0:
+            return w // tiles_x, h // tiles_y
+        return (w + tiles_x - w % tiles_x) // tiles_x, (h + tiles_y - h % tiles_y) // tiles_y
+
+    @staticmethod
+    def _tile_span(start: int, stop: int, tile: int, tiles: int) -> Tuple[int, int]:
+        """
+        函数级注释：单个方向上覆盖 [start, stop) 所需的分块区间
+        CLAHE 对每个像素在相邻两个分块的映射表之间双线性插值，因此两侧各多取一个分块
+        :return: (起始像素, 结束像素)，结束像素可能超出画面（整帧的填充区域）
+        """
+        first = max(0, start // tile - 1)
+        last = min(tiles, (stop - 1) // tile + 2)
+        return first * tile, last * tile
+
+    def enhance_region(self, frame: np.ndarray, box: Tuple[int, int, int, int]) -> np.ndarray:
+        """
+        函数级注释：只补偿画面中的一个区域，结果与 enhance(frame)[ymin:ymax, xmin:xmax] 一致
+        区域按整帧的分块边界外扩（贴边时按 OpenCV 的方式镜像填充）后单独补偿，分块直方图与插值邻居都与整帧相同；
+        插值坐标的原点不同，极少数像素因浮点舍入相差 1 个灰度级
+        :param box: (xmin, ymin, xmax, ymax)
+        """
+        xmin, ymin, xmax, ymax = box
+        h, w = frame.shape[:2]
+        if xmax <= xmin or ymax <= ymin:
+            return np.zeros((max(ymax - ymin, 0), max(xmax - xmin, 0)) + frame.shape[2:], dtype=frame.dtype)
+        tile_w, tile_h = self._tile_layout(frame.shape)
+        x0, x1 = self._tile_span(xmin, xmax, tile_w, self.tile_grid[0])
+        y0, y1 = self._tile_span(ymin, ymax, tile_h, self.tile_grid[1])
+        crop = frame[y0:min(y1, h), x0:min(x1, w)]
+        pad_x, pad_y = x1 - min(x1, w), y1 - min(y1, h)
+        if pad_x or pad_y:
+            if pad_x >= crop.shape[1] or pad_y >= crop.shape[0]:
+                # 画面过小，镜像填充需要的像素超出裁剪区，退回整帧补偿
+                return self.enhance(frame)[ymin:ymax, xmin:xmax]
+            crop = cv2.copyMakeBorder(crop, 0, pad_y, 0, pad_x, cv2.BORDER_REFLECT_101)
+        enhanced = self._apply(crop, ((x1 - x0) // tile_w, (y1 - y0) // tile_h))
+        return enhanced[ymin - y0:ymax - y0, xmin - x0:xmax - x0]
+
+
+class LazyEnhancedFrame:
+    """
+    类级注释：惰性的整帧光照补偿结果
+    支持 frame[y0:y1, x0:x1] 形式的切片与 shape 属性，可直接替代增强帧传给多模态校验与切片推理；
+    每次切片只补偿对应区域
+    """
+
+    def __init__(self, frame: np.ndarray, enhancer: ClaheEnhancer):
+        self.frame = frame
+        self.enhancer = enhancer
+        self.shape = frame.shape
+
+    def __getitem__(self, key) -> np.ndarray:
+        rows, cols = key
+        h, w = self.shape[:2]
+        y0, y1, _ = rows.indices(h)
+        x0, x1, _ = cols.indices(w)
+        return self.enhancer.enhance_region(self.frame, (x0, y0, x1, y1))
@@ -0,0 +1,167 @@
+"""
+类级注释：运动估计（前景掩码）
+前景掩码只用于运动门控、切片选择与火焰校验中的区域前景比例，并不需要逐像素精度。
+全分辨率 MOG2 每个像素维护 5 个高斯分量，1080p 画面仅模型就占用约 200MB，4K 约 800MB，且每帧都要全图更新。
+MotionEstimator 统一前景掩码的获取方式：
+- mog2：MOG2 背景建模，scale < 1 时先缩小画面再建模（掩码为缩小后的分辨率）
+- frame_diff：缩小后的灰度帧差，几乎不占内存，适合性能受限的主机
+掩码可以低于画面分辨率，使用方通过 mask_region / sampled_mask 把画面坐标映射到掩码上
+"""
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+MOTION_METHODS = ("mog2", "frame_diff")
+
+
+class MotionEstimator(ABC):
+    """
+    类级注释：运动估计器抽象基类
+    apply 返回 uint8 前景掩码（前景为 255），尺寸为画面尺寸乘以 scale
+    """
+
+    method = ""
+
+    def __init__(self, scale: float = 1.0):
+        """
+        函数级注释：初始化运动估计器
+        :param scale: 掩码相对画面的缩放比例（0.1~1.0）
+        """
+        self.scale = min(max(float(scale), 0.1), 1.0)
+
+    def _resize(self, frame: np.ndarray) -> np.ndarray:
+        """
+        函数级注释：按 scale 缩小画面（INTER_AREA 同时起到降噪作用）
+        """
+        if self.scale >= 1.0:
+            return frame
+        h, w = frame.shape[:2]
+        size = (max(1, int(round(w * self.scale))), max(1, int(round(h * self.scale))))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    @abstractmethod
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """
+        函数级注释：输入 BGR 帧，更新模型并返回前景掩码
+        """
+        pass
+
+    @abstractmethod
+    def reset(self):
+        """
+        函数级注释：丢弃已学习的背景（画面坐标系变化时调用）
+        """
+        pass
+
+
+class Mog2MotionEstimator(MotionEstimator):
+    """
+    类级注释：MOG2 背景建模（scale=1.0 即原有的全分辨率建模）
+    """
+
+    method = "mog2"
+
+    def __init__(self, scale: float = 1.0, history: int = 500, var_threshold: float = 25):
+        super().__init__(scale)
+        self.history = history
+        self.var_threshold = var_threshold
+        self.reset()
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        return self._subtractor.apply(self._resize(frame))
+
+    def reset(self):
+        self._subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=self.history, varThreshold=self.var_threshold, detectShadows=False
+        )
+
+
+class FrameDiffMotionEstimator(MotionEstimator):
+    """
+    类级注释：帧差运动估计
+    与上一帧的灰度缩略图逐像素比较，差值超过阈值的像素为前景；只保存一帧缩略图。
+    不学习背景，静止火源在画面中没有运动时不会成为前景（与 MOG2 长期静止后融入背景的行为一致）
+    """
+
+    method = "frame_diff"
+
+    def __init__(self, scale: float = 0.25, threshold: int = 15):
+        """
+        :param threshold: 灰度差阈值
+        """
+        super().__init__(scale)
+        self.threshold = int(threshold)
+        self._previous: Optional[np.ndarray] = None
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        small = self._resize(frame)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        previous, self._previous = self._previous, gray
+        if previous is None or previous.shape != gray.shape:
+            return np.zeros(gray.shape, dtype=np.uint8)
+        _, mask = cv2.threshold(cv2.absdiff(gray, previous), self.threshold, 255, cv2.THRESH_BINARY)
+        return mask
+
+    def reset(self):
+        self._previous = None
+
+
+def create_motion_estimator(method: str = "mog2", scale: float = 1.0) -> MotionEstimator:
+    """
+    函数级注释：按名称创建运动估计器
+    :param method: mog2 或 frame_diff，未知名称回退为 mog2
+    :param scale: 掩码相对画面的缩放比例
+    """
+    if method == "frame_diff":
+        return FrameDiffMotionEstimator(scale=scale)
+    return Mog2MotionEstimator(scale=scale)
+
+
+def mask_bounds(mask_shape: Tuple[int, ...], box: Tuple[int, int, int, int],
+                frame_shape: Tuple[int, ...]) -> Tuple[int, int, int, int]:
+    """
+    函数级注释：画面坐标系中的区域映射到前景掩码上的坐标
+    掩码与画面同尺寸时原样返回；缩小的掩码上按比例向外取整，且至少保留 1 个像素
+    :param box: 画面坐标 (xmin, ymin, xmax, ymax)
+    :param frame_shape: 画面尺寸
+    :return: 掩码坐标 (x0, y0, x1, y1)
+    """
+    mh, mw = mask_shape[:2]
+    fh, fw = frame_shape[:2]
+    if (mh, mw) == (fh, fw):
+        return box
+    xmin, ymin, xmax, ymax = box
+    sx, sy = mw / float(fw), mh / float(fh)
+    x0, y0 = min(int(xmin * sx), mw - 1), min(int(ymin * sy), mh - 1)
+    x1 = min(max(int(np.ceil(xmax * sx)), x0 + 1), mw)
+    y1 = min(max(int(np.ceil(ymax * sy)), y0 + 1), mh)
+    return x0, y0, x1, y1
+
+
+def mask_region(fg_mask: np.ndarray, box: Tuple[int, int, int, int], frame_shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    函数级注释：画面坐标系中的区域映射到前景掩码上的视图
+    掩码与画面同尺寸时等价于 fg_mask[ymin:ymax, xmin:xmax]
+    """
+    x0, y0, x1, y1 = mask_bounds(fg_mask.shape, box, frame_shape)
+    return fg_mask[y0:y1, x0:x1]
+
+
+def foreground_ratio(fg_mask: np.ndarray, box: Tuple[int, int, int, int], frame_shape: Tuple[int, ...]) -> float:
+    """
+    函数级注释：画面坐标系中区域的前景比例
+    """
+    region = mask_region(fg_mask, box, frame_shape)
+    return cv2.countNonZero(region) / float(max(region.size, 1))
+
+
+def sample_step(fg_mask: np.ndarray, frame_shape: Optional[Tuple[int, ...]] = None, step: int = 4) -> int:
+    """
+    函数级注释：统计前景比例时的采样步长
+    全分辨率掩码每 step 个像素取一个；缩小的掩码按缩放比例减小步长，采样点在画面上的密度保持不变
+    """
+    if frame_shape is None or frame_shape[1] <= 0:
+        return step
+    return max(1, int(round(step * fg_mask.shape[1] / float(frame_shape[1]))))
@@ -0,0 +1,120 @@
+"""
+类级注释：ONNX Runtime 推理后端
+生产环境为纯 CPU 主机时，将 best.pt 一次性导出为 ONNX，由 ONNX Runtime 在 CPU 上推理，
+letterbox、解码与 NMS 使用 yolo_ops 的 NumPy 实现，不再经过 ultralytics/PyTorch 的 predict。
+OnnxYoloModel 提供与 YOLO.predict 相同的调用方式与结果结构，Detector.infer 无需区分后端
+"""
+import os
+import ast
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from core.yolo import yolo_ops
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+logger = logging.getLogger("OnnxBackend")
+
+def export_onnx(weights_path: str, imgsz: int = 640, onnx_path: Optional[str] = None) -> str:
+    """
+    函数级注释：将 PyTorch 权重导出为 ONNX（动态输入尺寸）
+    导出结果与权重放在同一目录，权重未更新时直接复用已导出的文件
+    :param weights_path: .pt 权重路径
+    :param imgsz: 导出时的参考输入尺寸
+    :param onnx_path: 导出路径，默认与权重同名的 .onnx
+    :return: ONNX 文件路径
+    """
+    onnx_path = onnx_path or os.path.splitext(weights_path)[0] + ".onnx"
+    if os.path.exists(onnx_path) and os.path.getmtime(onnx_path) >= os.path.getmtime(weights_path):
+        return onnx_path
+
+    from ultralytics import YOLO
+
+    logger.info(f"导出 ONNX 模型: {weights_path} -> {onnx_path}")
+    exported = YOLO(weights_path).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=False,
+                                         device="cpu", verbose=False)
+    if os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+    return onnx_path
+
+
+class OnnxYoloModel:
+    """
+    类级注释：ONNX Runtime 上的 YOLO 检测模型
+    会话对象线程安全；Detector 仍用推理锁串行调用，会话内部使用 intra_op 线程并行
+    """
+
+    def __init__(self, onnx_path: str, num_threads: int = 0, names: Optional[Dict[int, str]] = None):
+        """
+        函数级注释：加载 ONNX 模型
+        :param onnx_path: ONNX 文件路径
+        :param num_threads: 推理线程数，0 表示由 ONNX Runtime 按物理核数决定
+        :param names: 类别名称，默认读取 ultralytics 导出时写入的元数据
+        """
+        if ort is None:
+            raise ImportError("未安装 onnxruntime，无法使用 ONNX 推理后端")
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = max(0, int(num_threads))
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.onnx_path = onnx_path
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        height, width = model_input.shape[2], model_input.shape[3]
+        # 动态输入模型使用最小矩形填充（与 ultralytics 对 .pt 模型的处理一致），固定输入模型填充为方形
+        self.dynamic = not (isinstance(height, int) and isinstance(width, int))
+        self.fixed_imgsz = None if self.dynamic else int(max(height, width))
+        self.input_dtype = np.float16 if "float16" in model_input.type else np.float32
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.stride = int(ast.literal_eval(metadata.get("stride", "32")))
+        if names is None:
+            names = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+        self.names = {int(k): v for k, v in names.items()}
+
+    @classmethod
+    def from_weights(cls, weights_path: str, imgsz: int = 640, num_threads: int = 0) -> "OnnxYoloModel":
+        """
+        函数级注释：从权重加载（.pt 先导出为 ONNX，.onnx 直接加载）
+        """
+        if not weights_path.lower().endswith(".onnx"):
+            weights_path = export_onnx(weights_path, imgsz=imgsz)
+        return cls(weights_path, num_threads=num_threads)
+
+    def predict(self, source: Any, conf: float = 0.25, iou: float = 0.7, classes: Optional[List[int]] = None,
+                imgsz: int = 640, verbose: bool = False, **kwargs: Any) -> List[yolo_ops.YoloResult]:
+        """
+        函数级注释：BGR 图像推理（参数与 YOLO.predict 一致）
+        :param source: 单张图像或图像列表；列表一次前向完成（批量推理）
+        :return: 与输入图像一一对应的 YoloResult 列表
+        """
+        images = list(source) if isinstance(source, (list, tuple)) else [source]
+        imgsz = self.fixed_imgsz or int(imgsz)
+        # 与 ultralytics 一致：同尺寸图像使用最小矩形填充，尺寸不一时统一填充为方形才能拼成一个批次
+        auto = self.dynamic and len({image.shape for image in images}) == 1
+        letterboxed = [yolo_ops.letterbox(image, imgsz, stride=self.stride, auto=auto) for image in images]
+        blob = np.concatenate([yolo_ops.to_input_tensor(padded, dtype=self.input_dtype)
+                               for padded, _, _ in letterboxed])
+        outputs = self.session.run(None, {self.input_name: blob})[0].astype(np.float32, copy=False)
+
+        results = []
+        for image, output, (_, ratio, pad) in zip(images, outputs, letterboxed):
+            boxes, scores, cls_ids = yolo_ops.decode_predictions(output, conf, iou, classes=classes)
+            boxes = yolo_ops.scale_boxes(boxes, ratio, pad, image.shape)
+            boxes = yolo_ops.YoloBoxes(boxes, scores, cls_ids.astype(np.float32))
+            results.append(yolo_ops.YoloResult(self.names, boxes))
+        return results
+
+    def to(self, device: str) -> "OnnxYoloModel":
+        """
+        函数级注释：兼容 YOLO.to，ONNX 后端固定在 CPU 上运行
+        """
+        if device and "cuda" in str(device).lower():
+            logger.warning("ONNX 推理后端只使用 CPU，忽略设备设置")
+        return self
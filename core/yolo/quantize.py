@@ -0,0 +1,459 @@
+"""
+类级注释：INT8 静态量化与精度对比
+quantize：将火灾模型导出为 ONNX 后，用现场抓拍帧目录做校准，生成 QDQ 格式的 INT8 模型，
+          检测头的解码部分（DFL、坐标拼接、类别 Sigmoid）保持 FP32，避免框坐标精度损失；
+          生成的 .onnx 可直接通过 yolo_backend=onnx、yolo_weights=<int8 模型> 由 Detector 加载
+compare：在录像上同时运行 FP32 与 INT8 检测器（完整流水线），以 FP32 的原始检测结果为参照，
+         报告 INT8 的 mAP@0.5、召回率漂移与逐帧 L3 报警判定差异，用于评估能否上线
+
+用法：
+    python -m core.yolo.quantize quantize <权重.pt> <校准帧目录> [-o best_int8.onnx] [--imgsz 640] [--max-images 200]
+    python -m core.yolo.quantize compare <fp32 权重> <int8 模型> <录像目录或文件> [--stride 1] [--report report.json]
+"""
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from core.yolo import yolo_ops
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+logger = logging.getLogger("Quantize")
+
+try:
+    from onnxruntime.quantization import CalibrationDataReader
+except ImportError:
+    CalibrationDataReader = object
+
+
+class FrameCalibrationReader(CalibrationDataReader):
+    """
+    类级注释：校准数据读取器
+    按推理时相同的 letterbox 与归一化处理目录中的图片，逐张提供给 ONNX Runtime 统计激活值范围
+    """
+
+    def __init__(self, image_dir: str, input_name: str, imgsz: int = 640, max_images: int = 200):
+        """
+        函数级注释：初始化读取器
+        :param image_dir: 校准帧目录（递归查找图片）
+        :param input_name: 模型输入名
+        :param imgsz: 推理尺寸，校准帧填充为 imgsz x imgsz
+        :param max_images: 最多使用的图片数（按文件名均匀抽样）
+        """
+        paths = []
+        for root, _, files in os.walk(image_dir):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(IMAGE_EXTENSIONS))
+        paths.sort()
+        if max_images and len(paths) > max_images:
+            paths = [paths[int(i)] for i in np.linspace(0, len(paths) - 1, max_images)]
+        self.paths = paths
+        self.input_name = input_name
+        self.imgsz = imgsz
+        self._iter = iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+        """
+        函数级注释：返回下一张校准帧的输入张量，读完返回 None
+        """
+        for path in self._iter:
+            image = cv2.imread(path)
+            if image is None:
+                logger.warning(f"无法读取校准帧，已跳过: {path}")
+                continue
+            padded, _, _ = yolo_ops.letterbox(image, self.imgsz, auto=False)
+            return {self.input_name: yolo_ops.to_input_tensor(padded)}
+        return None
+
+    def rewind(self):
+        """
+        函数级注释：重新从第一张开始读取
+        """
+        self._iter = iter(self.paths)
+
+
+def head_nodes_to_exclude(model) -> List[str]:
+    """
+    函数级注释：找出检测头中不参与量化的节点
+    ultralytics 导出的节点名形如 /model.22/cv2.0/...，最后一个模块为检测头；
+    其中 cv2/cv3 卷积分支照常量化，其余解码节点（DFL、Reshape/Concat、Sigmoid 等）保持 FP32
+    :param model: onnx.ModelProto
+    """
+    indices = []
+    for node in model.graph.node:
+        parts = node.name.split("/")
+        if len(parts) > 1 and parts[1].startswith("model."):
+            try:
+                indices.append(int(parts[1].split(".")[1]))
+            except ValueError:
+                continue
+    if not indices:
+        return []
+    head = f"/model.{max(indices)}/"
+    return [node.name for node in model.graph.node
+            if node.name.startswith(head) and "/cv2." not in node.name and "/cv3." not in node.name]
+
+
+def quantize_model(weights_path: str, calib_dir: str, output_path: Optional[str] = None, imgsz: int = 640,
+                   max_images: int = 200, method: str = "minmax", per_channel: bool = True) -> str:
+    """
+    函数级注释：生成 INT8 静态量化模型
+    :param weights_path: FP32 权重（.pt 会先导出为 ONNX）
+    :param calib_dir: 校准帧目录，建议覆盖白天/夜间/有火/无火等现场画面
+    :param output_path: 输出路径，默认为 <权重名>_int8.onnx
+    :param imgsz: 推理尺寸
+    :param max_images: 最多使用的校准帧数
+    :param method: 校准方法，minmax / entropy / percentile
+    :param per_channel: 卷积权重是否逐通道量化
+    :return: INT8 模型路径
+    """
+    import onnx
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    from core.yolo.onnx_backend import export_onnx
+
+    methods = {
+        "minmax": CalibrationMethod.MinMax,
+        "entropy": CalibrationMethod.Entropy,
+        "percentile": CalibrationMethod.Percentile,
+    }
+    if method not in methods:
+        raise ValueError(f"未知的校准方法: {method}")
+
+    fp32_path = weights_path if weights_path.lower().endswith(".onnx") else export_onnx(weights_path, imgsz=imgsz)
+    output_path = output_path or os.path.splitext(fp32_path)[0] + "_int8.onnx"
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        # 量化前做形状推断与图优化，ONNX Runtime 才能为全部卷积插入量化节点
+        prepared = os.path.join(tmpdir, "prepared.onnx")
+        quant_pre_process(fp32_path, prepared, skip_symbolic_shape=True)
+        model = onnx.load(prepared)
+        reader = FrameCalibrationReader(calib_dir, model.graph.input[0].name, imgsz=imgsz, max_images=max_images)
+        if not len(reader):
+            raise ValueError(f"校准帧目录中没有图片: {calib_dir}")
+        excluded = head_nodes_to_exclude(model)
+        logger.info(f"开始 INT8 量化: 校准帧 {len(reader)} 张, 方法 {method}, 检测头保留 FP32 节点 {len(excluded)} 个")
+
+        quantize_static(
+            prepared,
+            output_path,
+            reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=per_channel,
+            calibrate_method=methods[method],
+            nodes_to_exclude=excluded,
+        )
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    # quant_pre_process 不保留自定义元数据，补回类别名称与步长
+    fp32_meta = {prop.key: prop.value for prop in onnx.load(fp32_path, load_external_data=False).metadata_props}
+    quantized = onnx.load(output_path)
+    onnx.helper.set_model_props(quantized, fp32_meta)
+    onnx.save(quantized, output_path)
+    logger.info(f"INT8 模型已生成: {output_path}")
+    return output_path
+
+
+def _box_iou(box: Dict, others: List[Dict]) -> np.ndarray:
+    """
+    函数级注释：一个检测框与一组检测框的 IoU
+    """
+    if not others:
+        return np.zeros(0)
+    other = np.array([[d['xmin'], d['ymin'], d['xmax'], d['ymax']] for d in others], dtype=np.float64)
+    ix1 = np.maximum(box['xmin'], other[:, 0])
+    iy1 = np.maximum(box['ymin'], other[:, 1])
+    ix2 = np.minimum(box['xmax'], other[:, 2])
+    iy2 = np.minimum(box['ymax'], other[:, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area = (box['xmax'] - box['xmin']) * (box['ymax'] - box['ymin'])
+    areas = (other[:, 2] - other[:, 0]) * (other[:, 3] - other[:, 1])
+    return inter / np.maximum(area + areas - inter, 1e-9)
+
+
+def match_detections(reference: List[Dict], candidate: List[Dict],
+                     iou_threshold: float = 0.5) -> Dict[int, Tuple[List[Tuple[float, bool]], int]]:
+    """
+    函数级注释：单帧内按类别将候选检测匹配到参照检测（置信度从高到低贪心匹配）
+    :return: {类别: ([(候选置信度, 是否命中)], 参照检测数)}
+    """
+    result: Dict[int, Tuple[List[Tuple[float, bool]], int]] = {}
+    classes = {d['cls_id'] for d in reference} | {d['cls_id'] for d in candidate}
+    for cls_id in classes:
+        refs = [d for d in reference if d['cls_id'] == cls_id]
+        cands = sorted((d for d in candidate if d['cls_id'] == cls_id), key=lambda d: d['conf'], reverse=True)
+        used = np.zeros(len(refs), dtype=bool)
+        records = []
+        for det in cands:
+            ious = _box_iou(det, refs)
+            if len(ious):
+                ious[used] = -1.0
+                best = int(ious.argmax())
+                if ious[best] >= iou_threshold:
+                    used[best] = True
+                    records.append((det['conf'], True))
+                    continue
+            records.append((det['conf'], False))
+        result[cls_id] = (records, len(refs))
+    return result
+
+
+def average_precision(records: List[Tuple[float, bool]], num_reference: int) -> float:
+    """
+    函数级注释：全点插值 AP
+    :param records: 所有帧的 (候选置信度, 是否命中)
+    :param num_reference: 参照检测总数
+    """
+    if num_reference == 0:
+        return float('nan')
+    if not records:
+        return 0.0
+    records = sorted(records, key=lambda item: item[0], reverse=True)
+    hits = np.array([hit for _, hit in records], dtype=np.float64)
+    tp = np.cumsum(hits)
+    fp = np.cumsum(1.0 - hits)
+    recall = np.concatenate([[0.0], tp / num_reference, [1.0]])
+    precision = np.concatenate([[1.0], tp / np.maximum(tp + fp, 1e-9), [0.0]])
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    steps = np.where(recall[1:] != recall[:-1])[0]
+    return float(np.sum((recall[steps + 1] - recall[steps]) * precision[steps + 1]))
+
+
+class DriftAccumulator:
+    """
+    类级注释：累计候选模型相对参照模型的检测与报警差异
+    """
+
+    def __init__(self, iou_threshold: float = 0.5):
+        self.iou_threshold = iou_threshold
+        self.records: Dict[int, List[Tuple[float, bool]]] = {}
+        self.num_reference: Dict[int, int] = {}
+        self.frames = 0
+        self.l3_both = 0
+        self.l3_reference_only = 0
+        self.l3_candidate_only = 0
+        self.timings: Dict[str, List[float]] = {"reference": [], "candidate": []}
+
+    def add_frame(self, reference_raw: List[Dict], candidate_raw: List[Dict], reference_l3: bool, candidate_l3: bool):
+        """
+        函数级注释：累计一帧的对比结果
+        :param reference_raw: 参照模型的原始检测
+        :param candidate_raw: 候选模型的原始检测
+        :param reference_l3: 参照流水线该帧是否存在 L3 预警
+        :param candidate_l3: 候选流水线该帧是否存在 L3 预警
+        """
+        self.frames += 1
+        for cls_id, (records, count) in match_detections(reference_raw, candidate_raw, self.iou_threshold).items():
+            self.records.setdefault(cls_id, []).extend(records)
+            self.num_reference[cls_id] = self.num_reference.get(cls_id, 0) + count
+        if reference_l3 and candidate_l3:
+            self.l3_both += 1
+        elif reference_l3:
+            self.l3_reference_only += 1
+        elif candidate_l3:
+            self.l3_candidate_only += 1
+
+    def summary(self, names: Optional[Dict[int, str]] = None) -> Dict[str, Any]:
+        """
+        函数级注释：汇总 mAP、召回率与 L3 判定差异
+        """
+        names = names or {}
+        per_class = {}
+        aps = []
+        total_hits = 0
+        total_ref = 0
+        for cls_id in sorted(set(self.records) | set(self.num_reference)):
+            records = self.records.get(cls_id, [])
+            count = self.num_reference.get(cls_id, 0)
+            hits = sum(1 for _, hit in records if hit)
+            ap = average_precision(records, count)
+            if count:
+                aps.append(ap)
+            total_hits += hits
+            total_ref += count
+            per_class[names.get(cls_id, str(cls_id))] = {
+                "reference": count,
+                "candidate": len(records),
+                "recall": round(hits / count, 4) if count else None,
+                "ap50": round(ap, 4) if count else None,
+            }
+        l3_reference = self.l3_both + self.l3_reference_only
+        return {
+            "frames": self.frames,
+            "map50": round(float(np.mean(aps)), 4) if aps else None,
+            "recall": round(total_hits / total_ref, 4) if total_ref else None,
+            "per_class": per_class,
+            "l3_frames_reference": l3_reference,
+            "l3_frames_candidate": self.l3_both + self.l3_candidate_only,
+            "l3_missed": self.l3_reference_only,
+            "l3_extra": self.l3_candidate_only,
+            "l3_agreement": round(1.0 - (self.l3_reference_only + self.l3_candidate_only) / self.frames, 4)
+            if self.frames else None,
+        }
+
+
+def compare_on_video(reference, candidate, video_path: str, accumulator: DriftAccumulator,
+                     stride: int = 1) -> Dict[str, Any]:
+    """
+    函数级注释：在一段录像上逐帧对比两个检测器
+    :param reference: 参照检测器（FP32），状态从零开始
+    :param candidate: 候选检测器（INT8），状态从零开始
+    :return: 该录像的 L3 判定汇总与平均推理耗时
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return {"video": video_path, "error": "无法打开视频"}
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    stride = max(1, int(stride))
+    first_l3 = {"reference": None, "candidate": None}
+    infer_ms = {"reference": [], "candidate": []}
+    frame_idx = -1
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame_idx += 1
+            if frame_idx % stride != 0:
+                continue
+            frame_time = frame_idx / fps
+            levels = {}
+            raws = {}
+            for key, detector in (("reference", reference), ("candidate", candidate)):
+                _, detections = detector.detect_frame(frame, draw=False, frame_time=frame_time)
+                raws[key] = detector.last_raw_detections.to_dicts()
+                levels[key] = any(det.get('warning_level', 0) == 3 for det in detections)
+                infer_ms[key].append(detector.last_timings.get("infer_ms", 0.0))
+                if levels[key] and first_l3[key] is None:
+                    first_l3[key] = round(frame_time, 3)
+            accumulator.add_frame(raws["reference"], raws["candidate"], levels["reference"], levels["candidate"])
+    finally:
+        cap.release()
+
+    return {
+        "video": video_path,
+        "first_l3_time_s": first_l3,
+        "mean_infer_ms": {key: round(float(np.mean(values)), 2) if values else None
+                          for key, values in infer_ms.items()},
+    }
+
+
+def _every_frame_inferred(detector):
+    """
+    函数级注释：关闭近重复帧缓存与运动门控，并固定当前配置（不再热加载）
+    两者跳过推理的帧没有原始检测结果（last_raw_detections 为空），漂移统计会只覆盖部分帧
+    """
+    detector._refresh_runtime_config(force=True)
+    detector.config_loader = None
+    detector.frame_cache_enabled = False
+    detector.motion_gate_enabled = False
+    return detector
+
+
+def compare_models(reference, candidate, videos: Iterable[str], stride: int = 1,
+                   iou_threshold: float = 0.5) -> Dict[str, Any]:
+    """
+    函数级注释：在多段录像上对比两个检测器（每段录像派生独立状态的检测器）
+    对比期间两个检测器逐帧推理，不受 system.json 中近重复帧缓存与运动门控开关的影响
+    :return: 总体漂移报告与逐录像结果
+    """
+    accumulator = DriftAccumulator(iou_threshold)
+    per_video = [compare_on_video(_every_frame_inferred(reference.spawn()), _every_frame_inferred(candidate.spawn()),
+                                  path, accumulator, stride=stride)
+                 for path in videos]
+    names = getattr(reference.model, "names", None) or {}
+    report = accumulator.summary(names)
+    report["videos"] = per_video
+    return report
+
+
+def _print_report(report: Dict[str, Any]):
+    """
+    函数级注释：输出对比报告
+    """
+    print(f"对比帧数 {report['frames']}，INT8 相对 FP32：mAP@0.5 = {report['map50']}，召回率 = {report['recall']}")
+    for name, item in report["per_class"].items():
+        print(f"  {name}: FP32 {item['reference']} 个, INT8 {item['candidate']} 个, "
+              f"召回率 {item['recall']}, AP@0.5 {item['ap50']}")
+    print(f"L3 报警帧：FP32 {report['l3_frames_reference']}，INT8 {report['l3_frames_candidate']}，"
+          f"漏报 {report['l3_missed']}，多报 {report['l3_extra']}，一致率 {report['l3_agreement']}")
+    for item in report["videos"]:
+        if "error" in item:
+            print(f"  [失败] {item['video']}: {item['error']}")
+        else:
+            print(f"  {item['video']}: 首次 L3 {item['first_l3_time_s']}, 平均推理耗时 {item['mean_infer_ms']} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    函数级注释：命令行入口
+    """
+    parser = argparse.ArgumentParser(description="YOLO INT8 静态量化与精度对比")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    q = sub.add_parser("quantize", help="用校准帧生成 INT8 模型")
+    q.add_argument("weights", help="FP32 权重（.pt 或 .onnx）")
+    q.add_argument("calib_dir", help="校准帧目录")
+    q.add_argument("-o", "--output", help="输出路径，默认 <权重名>_int8.onnx")
+    q.add_argument("--imgsz", type=int, default=640)
+    q.add_argument("--max-images", type=int, default=200)
+    q.add_argument("--method", choices=("minmax", "entropy", "percentile"), default="minmax")
+
+    c = sub.add_parser("compare", help="在录像上对比 FP32 与 INT8 模型")
+    c.add_argument("reference", help="FP32 权重（.pt 或 .onnx）")
+    c.add_argument("candidate", help="INT8 模型（.onnx）")
+    c.add_argument("videos", help="录像目录或单个录像文件")
+    c.add_argument("--stride", type=int, default=1, help="每隔多少帧检测一次")
+    c.add_argument("--imgsz", type=int, default=640)
+    c.add_argument("--iou", type=float, default=0.5, help="匹配 IoU 阈值")
+    c.add_argument("--report", help="JSON 报告输出路径")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.command == "quantize":
+        if not os.path.isdir(args.calib_dir):
+            print(f"校准帧目录不存在: {args.calib_dir}", file=sys.stderr)
+            return 1
+        logger.setLevel(logging.INFO)
+        path = quantize_model(args.weights, args.calib_dir, args.output, imgsz=args.imgsz,
+                              max_images=args.max_images, method=args.method)
+        print(f"INT8 模型已生成: {path}（yolo_backend 设为 onnx、yolo_weights 指向该文件即可使用）")
+        return 0
+
+    from core.yolo.batch_eval import discover_videos
+    from core.yolo.detector import Detector
+
+    videos = discover_videos(args.videos) if os.path.isdir(args.videos) else [args.videos]
+    if not videos:
+        print(f"没有找到录像: {args.videos}", file=sys.stderr)
+        return 1
+    reference_backend = "onnx" if args.reference.lower().endswith(".onnx") else "ultralytics"
+    # 置信度等检测参数由两个检测器共同的 system.json 热加载配置决定
+    reference = Detector(weights_path=args.reference, device="cpu", imgsz=args.imgsz, backend=reference_backend)
+    candidate = Detector(weights_path=args.candidate, device="cpu", imgsz=args.imgsz, backend="onnx")
+
+    report = compare_models(reference, candidate, videos, stride=args.stride, iou_threshold=args.iou)
+    _print_report(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+类级注释：候选区域特征缓存
+同一候选框的多模态校验会在多个阶段用到同一区域的 HSV / YCrCb / 灰度图与颜色阈值掩码，
+原流程每个阶段各自转换（原图 HSV 转换两次），RoiFeatures 按需计算并缓存，每种特征对每个区域最多计算一次。
+增强图区域同样按需裁剪，配合 LazyEnhancedFrame 时只有走到颜色校验的候选框才会做光照补偿。
+提供颜色类别查找表（color_lut）时，color_mask 对每个区域只查一次表即可得到所有颜色类别的掩码。
+多个候选框相互重叠时，可以先为它们的外接区域建立一个 RoiFeatures（附带积分图统计 stats），
+各候选框以它为 parent：逐像素的转换与掩码直接取外接区域结果的视图，color_ratio 直接查积分图
+"""
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from core.yolo import color_lut
+from core.yolo.integral import IntegralStats
+
+# 原图 / 增强图区域支持的颜色空间
+_CONVERSIONS = {
+    "hsv": cv2.COLOR_BGR2HSV,
+    "ycrcb": cv2.COLOR_BGR2YCrCb,
+    "gray": cv2.COLOR_BGR2GRAY,
+}
+
+
+class RoiFeatures:
+    """
+    类级注释：单个候选区域的惰性特征
+    """
+
+    def __init__(self, raw_frame: np.ndarray, enhanced_frame: Optional[Any], box: Tuple[int, int, int, int],
+                 classes: Optional[Dict[int, Tuple[str, Sequence]]] = None, lut: Optional[np.ndarray] = None,
+                 parent: Optional["RoiFeatures"] = None):
+        """
+        函数级注释：初始化区域特征
+        :param raw_frame: 原始画面
+        :param enhanced_frame: 光照补偿后的画面（ndarray 或 LazyEnhancedFrame），不需要增强图的校验可传 None
+        :param box: 区域 (xmin, ymin, xmax, ymax)
+        :param classes: 颜色类别定义（color_lut.color_classes），使用 color_mask 时必须提供
+        :param lut: 与 classes 对应的颜色类别查找表，None 时按颜色空间转换与 inRange 计算
+        :param parent: 覆盖 box 的外接区域特征，提供时逐像素特征取其视图
+        """
+        xmin, ymin, xmax, ymax = box
+        self.box = box
+        self.classes = classes
+        self.lut = lut
+        self.parent = parent
+        # 本区域上的掩码积分图统计，键为 (位标志, 是否增强图)，由使用方设置
+        self.stats: Optional[IntegralStats] = None
+        self.raw = raw_frame[ymin:ymax, xmin:xmax]
+        self._enhanced_frame = enhanced_frame
+        self._cache: Dict[Any, np.ndarray] = {}
+
+    @property
+    def total_pixels(self) -> int:
+        return max(self.raw.shape[0] * self.raw.shape[1], 1)
+
+    def _crop(self, array: np.ndarray) -> np.ndarray:
+        """
+        函数级注释：外接区域上的逐像素结果中本区域的视图
+        """
+        ox, oy = self.parent.box[:2]
+        xmin, ymin, xmax, ymax = self.box
+        return array[ymin - oy:ymax - oy, xmin - ox:xmax - ox]
+
+    def _cached(self, key: Any, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        value = self._cache.get(key)
+        if value is None:
+            value = compute()
+            self._cache[key] = value
+        return value
+
+    @property
+    def enhanced(self) -> np.ndarray:
+        """
+        函数级注释：增强图中的同一区域
+        """
+        if self.parent is not None:
+            return self._crop(self.parent.enhanced)
+
+        def crop():
+            if self._enhanced_frame is None:
+                raise ValueError("未提供光照补偿画面")
+            xmin, ymin, xmax, ymax = self.box
+            return self._enhanced_frame[ymin:ymax, xmin:xmax]
+        return self._cached("enhanced", crop)
+
+    def convert(self, space: str, enhanced: bool = False) -> np.ndarray:
+        """
+        函数级注释：区域的颜色空间转换结果
+        :param space: hsv / ycrcb / gray
+        :param enhanced: True 时转换增强图区域，否则转换原图区域
+        """
+        if self.parent is not None:
+            return self._crop(self.parent.convert(space, enhanced))
+        key = (space, enhanced)
+        return self._cached(key, lambda: cv2.cvtColor(self.enhanced if enhanced else self.raw, _CONVERSIONS[space]))
+
+    def in_range(self, space: str, low: Sequence[int], high: Sequence[int], enhanced: bool = False) -> np.ndarray:
+        """
+        函数级注释：颜色阈值掩码，相同颜色空间与阈值的掩码只计算一次
+        """
+        if self.parent is not None:
+            return self._crop(self.parent.in_range(space, low, high, enhanced))
+        key = ("mask", space, enhanced, tuple(low), tuple(high))
+        return self._cached(key, lambda: cv2.inRange(self.convert(space, enhanced), np.asarray(low), np.asarray(high)))
+
+    def any_in_range(self, space: str, ranges: Sequence[Tuple[Sequence[int], Sequence[int]]],
+                     enhanced: bool = False) -> np.ndarray:
+        """
+        函数级注释：多个阈值区间掩码的并集（同样缓存）
+        :param ranges: [(low, high), ...]
+        """
+        if self.parent is not None:
+            return self._crop(self.parent.any_in_range(space, ranges, enhanced))
+        key = ("union", space, enhanced, tuple((tuple(low), tuple(high)) for low, high in ranges))
+
+        def union():
+            # 各区间的掩码只是中间结果，不缓存，减少候选框校验期间驻留的临时数组
+            image = self.convert(space, enhanced)
+            merged = None
+            for low, high in ranges:
+                mask = cv2.inRange(image, np.asarray(low), np.asarray(high))
+                merged = mask if merged is None else cv2.bitwise_or(merged, mask, dst=merged)
+            return merged
+        return self._cached(key, union)
+
+    def color_flags(self, enhanced: bool = False) -> np.ndarray:
+        """
+        函数级注释：查找表得到的逐像素颜色类别位标志（需要提供 lut）
+        """
+        if self.parent is not None:
+            return self._crop(self.parent.color_flags(enhanced))
+        return self._cached(("flags", enhanced),
+                            lambda: color_lut.classify(self.enhanced if enhanced else self.raw, self.lut))
+
+    def color_mask(self, flag: int, enhanced: bool = False) -> np.ndarray:
+        """
+        函数级注释：颜色类别掩码（命中为 255），有查找表时查表，否则按类别定义的颜色空间与区间计算
+        :param flag: color_lut 中的位标志，如 color_lut.FIRE
+        """
+        if self.parent is not None:
+            return self._crop(self.parent.color_mask(flag, enhanced))
+        if self.lut is None:
+            space, ranges = self.classes[flag]
+            return self.any_in_range(space, ranges, enhanced)
+        return self._cached(("flag", flag, enhanced),
+                            lambda: cv2.compare(cv2.bitwise_and(self.color_flags(enhanced), flag), 0, cv2.CMP_NE))
+
+    def color_ratio(self, flag: int, enhanced: bool = False) -> float:
+        """
+        函数级注释：颜色类别像素占区域的比例
+        """
+        stats = self.parent.stats if self.parent is not None else None
+        if stats is not None and (flag, enhanced) in stats:
+            return stats.count((flag, enhanced), self.box) / self.total_pixels
+        if self.lut is None or self.parent is not None:
+            return cv2.countNonZero(self.color_mask(flag, enhanced)) / self.total_pixels
+        return cv2.countNonZero(cv2.bitwise_and(self.color_flags(enhanced), flag)) / self.total_pixels
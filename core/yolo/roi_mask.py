@@ -0,0 +1,145 @@
+"""
+类级注释：检测区域（ROI）掩码
+将配置中的包含/排除多边形（归一化坐标）按帧尺寸栅格化一次，得到掩码与外接裁剪框：
+裁剪框用于缩小光照补偿与 YOLO 推理的输入，掩码用于在多模态校验前丢弃区域外的候选框
+"""
+from typing import Any, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def parse_polygons(value: Any) -> List[np.ndarray]:
+    """
+    函数级注释：解析多边形配置
+    支持单个多边形 [[x, y], ...] 或多个多边形 [[[x, y], ...], ...]，坐标为 0~1 的归一化值
+    :return: 多边形列表（N x 2 的 float32 数组），少于 3 个点的多边形被忽略
+    """
+    if not value:
+        return []
+    if isinstance(value[0], (list, tuple)) and value[0] and isinstance(value[0][0], (int, float)):
+        value = [value]
+
+    polygons = []
+    for poly in value:
+        try:
+            pts = np.asarray(poly, dtype=np.float32).reshape(-1, 2)
+        except (TypeError, ValueError):
+            continue
+        if len(pts) >= 3:
+            polygons.append(np.clip(pts, 0.0, 1.0))
+    return polygons
+
+
+class RoiMask:
+    """
+    类级注释：单路视频流的检测区域
+    未配置包含区域时默认整帧可检测，再减去排除区域
+    """
+
+    def __init__(self, include: Any = None, exclude: Any = None, pad: int = 16):
+        """
+        函数级注释：初始化检测区域
+        :param include: 包含区域多边形（归一化坐标）
+        :param exclude: 排除区域多边形（归一化坐标）
+        :param pad: 裁剪框外扩像素，避免贴边目标被截断
+        """
+        self.include = parse_polygons(include)
+        self.exclude = parse_polygons(exclude)
+        self.pad = pad
+
+        self._shape: Optional[Tuple[int, int]] = None
+        self.mask: Optional[np.ndarray] = None
+        self.box: Optional[Tuple[int, int, int, int]] = None
+        self._crop_mask: Optional[np.ndarray] = None
+
+    @property
+    def enabled(self) -> bool:
+        """
+        函数级注释：是否配置了任何区域
+        """
+        return bool(self.include or self.exclude)
+
+    @staticmethod
+    def _to_pixels(polygons: List[np.ndarray], width: int, height: int) -> List[np.ndarray]:
+        """
+        函数级注释：归一化坐标转像素坐标
+        """
+        scale = np.array([width - 1, height - 1], dtype=np.float32)
+        return [np.round(poly * scale).astype(np.int32) for poly in polygons]
+
+    def prepare(self, shape: Tuple[int, ...]) -> Optional[Tuple[int, int, int, int]]:
+        """
+        函数级注释：按帧尺寸栅格化掩码（尺寸不变时直接复用）
+        :param shape: 帧形状
+        :return: 裁剪框 (x0, y0, x1, y1)，区域全部被排除时返回 None
+        """
+        height, width = shape[:2]
+        if self._shape == (height, width):
+            return self.box
+        self._shape = (height, width)
+
+        if self.include:
+            mask = np.zeros((height, width), dtype=np.uint8)
+            cv2.fillPoly(mask, self._to_pixels(self.include, width, height), 255)
+        else:
+            mask = np.full((height, width), 255, dtype=np.uint8)
+        if self.exclude:
+            cv2.fillPoly(mask, self._to_pixels(self.exclude, width, height), 0)
+        self.mask = mask
+
+        if not cv2.countNonZero(mask):
+            self.box = None
+            self._crop_mask = None
+            return None
+
+        x, y, w, h = cv2.boundingRect(mask)
+        x0 = max(0, x - self.pad)
+        y0 = max(0, y - self.pad)
+        x1 = min(width, x + w + self.pad)
+        y1 = min(height, y + h + self.pad)
+        self.box = (x0, y0, x1, y1)
+        self._crop_mask = mask[y0:y1, x0:x1]
+        return self.box
+
+    @property
+    def area_ratio(self) -> float:
+        """
+        函数级注释：裁剪框面积占整帧的比例
+        """
+        if self._shape is None or self.box is None:
+            return 0.0
+        x0, y0, x1, y1 = self.box
+        return (x1 - x0) * (y1 - y0) / float(self._shape[0] * self._shape[1])
+
+    def crop(self, frame: np.ndarray) -> np.ndarray:
+        """
+        函数级注释：获取裁剪框内的零拷贝视图（需先调用 prepare）
+        """
+        x0, y0, x1, y1 = self.box
+        return frame[y0:y1, x0:x1]
+
+    def contains(self, det: dict) -> bool:
+        """
+        函数级注释：判断检测框中心是否落在检测区域内（检测框为裁剪框内坐标）
+        """
+        boxes = np.array([[det['xmin'], det['ymin'], det['xmax'], det['ymax']]], dtype=np.int64)
+        return bool(self.contains_boxes(boxes)[0])
+
+    def contains_boxes(self, boxes: np.ndarray) -> np.ndarray:
+        """
+        函数级注释：批量判断检测框中心是否落在检测区域内
+        :param boxes: (N, 4) 裁剪框内坐标 [xmin, ymin, xmax, ymax]
+        :return: (N,) 布尔数组
+        """
+        inside = np.zeros(len(boxes), dtype=bool)
+        if self._crop_mask is None or not len(boxes):
+            return inside
+        h, w = self._crop_mask.shape[:2]
+        boxes = boxes.astype(np.int64)
+        # 与 int((a + b) / 2) 一致：坐标非负时等价于整除，负坐标向零取整
+        cx = np.trunc((boxes[:, 0] + boxes[:, 2]) / 2).astype(np.int64)
+        cy = np.trunc((boxes[:, 1] + boxes[:, 3]) / 2).astype(np.int64)
+        valid = (cx >= 0) & (cx < w) & (cy >= 0) & (cy < h)
+        inside[valid] = self._crop_mask[cy[valid], cx[valid]] > 0
+        return inside
@@ -0,0 +1,92 @@
+"""
+类级注释：切片推理（远处小火源）
+1080p/4K 画面整体缩放到 imgsz=640 后，远处的小火苗只剩几个像素，YOLO 难以检出。
+切片推理把画面划分为相互重叠、按原始分辨率推理的切片，只对存在前景运动的切片推理，
+再与整帧检测结果一起做按类别 NMS，以较小的代价找回小目标
+"""
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from core.yolo import yolo_ops
+from core.yolo.detections import DetectionBatch
+from core.yolo.motion import foreground_ratio
+
+Tile = Tuple[int, int, int, int]
+
+
+def _axis_starts(length: int, tile: int, step: int) -> List[int]:
+    """
+    函数级注释：单个方向上的切片起点，最后一块与边缘对齐
+    """
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, step))
+    starts.append(length - tile)
+    return starts
+
+
+def tile_grid(width: int, height: int, tile_size: int = 640, overlap: float = 0.2) -> List[Tile]:
+    """
+    函数级注释：计算覆盖整帧的重叠切片
+    :param width: 画面宽度
+    :param height: 画面高度
+    :param tile_size: 切片边长（像素），同时作为切片的推理尺寸，即切片按原始分辨率推理
+    :param overlap: 相邻切片的重叠比例，保证跨切片边缘的目标至少完整出现在一块切片中
+    :return: 切片列表 (x0, y0, x1, y1)
+    """
+    tile_size = max(32, int(tile_size))
+    step = max(1, int(tile_size * (1.0 - min(max(overlap, 0.0), 0.9))))
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in _axis_starts(height, tile_size, step)
+        for x in _axis_starts(width, tile_size, step)
+    ]
+
+
+def select_motion_tiles(fg_mask: np.ndarray, tiles: List[Tile], min_ratio: float = 0.01,
+                        max_tiles: int = 4, frame_shape: Optional[Tuple[int, ...]] = None) -> List[Tile]:
+    """
+    函数级注释：选出前景运动比例最高的切片
+    全分辨率掩码与运动门控相同，在 1/4 分辨率的采样掩码上统计；缩小的掩码直接按比例映射切片
+    :param fg_mask: 前景掩码
+    :param tiles: 候选切片
+    :param min_ratio: 切片内前景比例下限
+    :param max_tiles: 每帧最多推理的切片数，限制单帧的最坏耗时
+    :param frame_shape: 画面尺寸，None 表示与掩码相同
+    :return: 按运动比例降序的切片
+    """
+    reduced = frame_shape is not None and fg_mask.shape[:2] != tuple(frame_shape[:2])
+    sampled = fg_mask[::4, ::4]
+    scored = []
+    for tile in tiles:
+        if reduced:
+            ratio = foreground_ratio(fg_mask, tile, frame_shape)
+        else:
+            x0, y0, x1, y1 = tile
+            region = sampled[y0 // 4:(y1 + 3) // 4, x0 // 4:(x1 + 3) // 4]
+            ratio = cv2.countNonZero(region) / float(max(region.size, 1))
+        if ratio >= min_ratio:
+            scored.append((ratio, tile))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [tile for _, tile in scored[:max(0, int(max_tiles))]]
+
+
+def shift_detections(detections: DetectionBatch, tile: Tile) -> DetectionBatch:
+    """
+    函数级注释：将切片内坐标换算为整帧坐标（原地修改）
+    """
+    return detections.shift(tile[0], tile[1])
+
+
+def merge_detections(detections: DetectionBatch, iou_threshold: float = 0.45) -> DetectionBatch:
+    """
+    函数级注释：整帧与切片检测结果的按类别 NMS（重叠区域的重复框保留置信度最高者）
+    """
+    if len(detections) < 2:
+        return detections
+    data = detections.data
+    offsets = data["cls_id"].astype(np.float32)[:, None] * yolo_ops.CLASS_OFFSET
+    keep = yolo_ops.nms(detections.boxes.astype(np.float32) + offsets, data["conf"], iou_threshold)
+    return detections[keep]
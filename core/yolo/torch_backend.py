@@ -0,0 +1,110 @@
+"""
+类级注释：精简 PyTorch 推理后端
+YOLO.predict 每次调用都要经过参数解析、预测器流水线、Results 对象构造与逐字段 .cpu().numpy() 转换，
+对单帧推理而言这些固定开销不可忽略。TorchYoloModel 直接调用融合后的检测网络：
+letterbox 写入预分配的缓冲区，在 torch.inference_mode 下前向，输出一次性转为 NumPy 后用 yolo_ops 解码与 NMS。
+predict 的调用方式与结果结构与 YOLO.predict 一致，Detector.infer 无需区分后端
+"""
+import logging
+import platform
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+from core.yolo import yolo_ops
+
+logger = logging.getLogger("TorchBackend")
+
+
+class TorchYoloModel:
+    """
+    类级注释：直接调用检测网络的 YOLO 模型
+    预分配的缓冲区不是线程安全的，由 Detector 的推理锁串行调用
+    """
+
+    def __init__(self, module: torch.nn.Module, names: Dict[int, str], stride: int = 32, device: str = "cpu"):
+        """
+        函数级注释：包装已融合的检测网络
+        :param module: ultralytics DetectionModel（已 fuse 并切换到 eval 模式）
+        :param names: 类别名称
+        :param stride: 模型最大步长
+        :param device: 推理设备
+        """
+        if getattr(module, "end2end", False):
+            raise ValueError("精简推理后端不支持端到端（无 NMS）检测头")
+        self.module = module
+        self.names = {int(k): v for k, v in names.items()}
+        self.stride = max(int(stride), 32)
+        self.device = torch.device(device)
+        self._frames: Optional[np.ndarray] = None
+        self._input: Optional[torch.Tensor] = None
+
+    @classmethod
+    def from_weights(cls, weights_path: str, device: str = "cpu") -> "TorchYoloModel":
+        """
+        函数级注释：加载 .pt 权重，融合 Conv+BN 并冻结参数
+        """
+        from ultralytics import YOLO
+
+        module = YOLO(weights_path).model
+        module = module.fuse(verbose=False).to(device).float().eval()
+        for param in module.parameters():
+            param.requires_grad = False
+        # x86 CPU 上 oneDNN 卷积使用 channels_last 权重明显更快（与 ultralytics AutoBackend 的默认行为一致）
+        if (torch.device(device).type == "cpu" and platform.machine() in ("AMD64", "x86_64")
+                and torch.backends.mkldnn.is_available()):
+            module = module.to(memory_format=torch.channels_last)
+        stride = int(module.stride.max()) if hasattr(module, "stride") else 32
+        return cls(module, module.names, stride=stride, device=device)
+
+    def _buffers(self, batch: int, height: int, width: int) -> Tuple[np.ndarray, torch.Tensor]:
+        """
+        函数级注释：取 letterbox 缓冲区与输入张量，批大小或输入尺寸变化时才重新分配
+        """
+        shape = (batch, height, width, 3)
+        if self._frames is None or self._frames.shape != shape:
+            self._frames = np.empty(shape, dtype=np.uint8)
+            self._input = torch.empty((batch, 3, height, width), dtype=torch.float32, device=self.device)
+        return self._frames, self._input
+
+    def predict(self, source: Any, conf: float = 0.25, iou: float = 0.7, classes: Optional[List[int]] = None,
+                imgsz: int = 640, verbose: bool = False, **kwargs: Any) -> List[yolo_ops.YoloResult]:
+        """
+        函数级注释：BGR 图像推理（参数与 YOLO.predict 一致）
+        :param source: 单张图像或图像列表；列表一次前向完成（批量推理）
+        :return: 与输入图像一一对应的 YoloResult 列表
+        """
+        images = list(source) if isinstance(source, (list, tuple)) else [source]
+        # 与 ultralytics 一致：同尺寸图像使用最小矩形填充，尺寸不一时统一填充为方形才能拼成一个批次
+        auto = len({image.shape for image in images}) == 1
+        height, width = yolo_ops.letterbox_shape(images[0].shape, imgsz, self.stride, auto)
+        frames, tensor = self._buffers(len(images), height, width)
+        geometry = [yolo_ops.letterbox_into(image, frames[i], imgsz) for i, image in enumerate(images)]
+
+        with torch.inference_mode():
+            src = torch.from_numpy(frames).to(self.device, non_blocking=True)
+            # BGR -> RGB 与 HWC -> CHW 在复制进预分配张量时一并完成
+            for channel in range(3):
+                tensor[:, channel].copy_(src[..., 2 - channel])
+            tensor.div_(255.0)
+            preds = self.module(tensor)
+            preds = preds[0] if isinstance(preds, (list, tuple)) else preds
+            outputs = preds.float().cpu().numpy()
+
+        results = []
+        for image, output, (ratio, pad) in zip(images, outputs, geometry):
+            boxes, scores, cls_ids = yolo_ops.decode_predictions(output, conf, iou, classes=classes)
+            boxes = yolo_ops.scale_boxes(boxes, ratio, pad, image.shape)
+            boxes = yolo_ops.YoloBoxes(boxes, scores, cls_ids.astype(np.float32))
+            results.append(yolo_ops.YoloResult(self.names, boxes))
+        return results
+
+    def to(self, device: str) -> "TorchYoloModel":
+        """
+        函数级注释：迁移到指定设备（兼容 YOLO.to），缓冲区在下次推理时按新设备重新分配
+        """
+        self.device = torch.device(device)
+        self.module.to(self.device)
+        self._frames = self._input = None
+        return self
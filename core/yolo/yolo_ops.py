@@ -0,0 +1,188 @@
+"""
+类级注释：YOLO 前后处理算子（纯 NumPy / OpenCV 实现）
+供不经过 ultralytics predict 的推理后端使用：letterbox 缩放填充、输出解码、按类别 NMS 与坐标还原，
+数值行为与 ultralytics 的 LetterBox / non_max_suppression / scale_boxes 保持一致；
+YoloBoxes / YoloResult 提供与 ultralytics Results 相同的字段，Detector 解析结果时无需区分后端
+"""
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# 按类别 NMS 时各类别框的坐标偏移量（与 ultralytics 的 max_wh 一致）
+CLASS_OFFSET = 7680
+
+
+def letterbox_shape(shape: Tuple[int, ...], imgsz: int, stride: int = 32, auto: bool = True) -> Tuple[int, int]:
+    """
+    函数级注释：letterbox 输出的 (高, 宽)
+    :param shape: 原图形状
+    :param imgsz: 推理尺寸（长边）
+    :param stride: 模型最大步长，auto 模式下填充到其整数倍
+    :param auto: True 时使用最小矩形填充（动态输入模型），False 时填充为 imgsz x imgsz（固定输入模型）
+    """
+    height, width = shape[:2]
+    ratio = min(imgsz / height, imgsz / width)
+    new_w, new_h = round(width * ratio), round(height * ratio)
+    dw, dh = imgsz - new_w, imgsz - new_h
+    if auto:
+        dw, dh = dw % stride, dh % stride
+    dw, dh = dw / 2, dh / 2
+    return new_h + round(dh - 0.1) + round(dh + 0.1), new_w + round(dw - 0.1) + round(dw + 0.1)
+
+
+def letterbox_into(image: np.ndarray, out: np.ndarray, imgsz: int,
+                   pad_value: int = 114) -> Tuple[float, Tuple[int, int]]:
+    """
+    函数级注释：等比缩放后写入预分配的缓冲区，填充区域置为 pad_value
+    缩放结果直接写入缓冲区内的视图，不再为缩放图与填充图分别分配内存
+    :param image: BGR 图像
+    :param out: 输出缓冲区，形状为 letterbox_shape 的结果
+    :param imgsz: 推理尺寸（长边）
+    :return: (缩放比例, (左侧填充, 顶部填充))
+    """
+    height, width = image.shape[:2]
+    ratio = min(imgsz / height, imgsz / width)
+    new_w, new_h = round(width * ratio), round(height * ratio)
+    top = round((out.shape[0] - new_h) / 2 - 0.1)
+    left = round((out.shape[1] - new_w) / 2 - 0.1)
+
+    out[:top] = pad_value
+    out[top + new_h:] = pad_value
+    out[top:top + new_h, :left] = pad_value
+    out[top:top + new_h, left + new_w:] = pad_value
+    region = out[top:top + new_h, left:left + new_w]
+    if (width, height) != (new_w, new_h):
+        cv2.resize(image, (new_w, new_h), dst=region, interpolation=cv2.INTER_LINEAR)
+    else:
+        region[...] = image
+    return ratio, (left, top)
+
+
+def letterbox(image: np.ndarray, imgsz: int, stride: int = 32, auto: bool = True,
+              pad_value: int = 114) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    函数级注释：等比缩放并填充到推理尺寸
+    :param image: BGR 图像
+    :param imgsz: 推理尺寸（长边）
+    :param stride: 模型最大步长，auto 模式下填充到其整数倍
+    :param auto: True 时使用最小矩形填充（动态输入模型），False 时填充为 imgsz x imgsz（固定输入模型）
+    :param pad_value: 填充灰度值
+    :return: (填充后的图像, 缩放比例, (左侧填充, 顶部填充))
+    """
+    out = np.empty(letterbox_shape(image.shape, imgsz, stride, auto) + image.shape[2:], dtype=image.dtype)
+    ratio, pad = letterbox_into(image, out, imgsz, pad_value)
+    return out, ratio, pad
+
+
+def to_input_tensor(image: np.ndarray, dtype=np.float32) -> np.ndarray:
+    """
+    函数级注释：letterbox 后的 BGR 图像转为 1x3xHxW、0~1 归一化的 RGB 输入张量
+    """
+    blob = cv2.dnn.blobFromImage(image, scalefactor=1.0 / 255.0, swapRB=True)
+    return blob.astype(dtype, copy=False)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    函数级注释：单类别非极大值抑制
+    :param boxes: N x 4 的 xyxy 框
+    :param scores: N 个置信度
+    :return: 保留框的下标（按置信度降序）
+    """
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep: List[int] = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(int(i))
+        rest = order[1:]
+        xx1 = np.maximum(x1[i], x1[rest])
+        yy1 = np.maximum(y1[i], y1[rest])
+        xx2 = np.minimum(x2[i], x2[rest])
+        yy2 = np.minimum(y2[i], y2[rest])
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-7)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def decode_predictions(output: np.ndarray, conf: float, iou: float, classes: Optional[List[int]] = None,
+                       max_det: int = 300, max_nms: int = 30000) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    函数级注释：解码 YOLOv8 检测头输出并做按类别 NMS
+    :param output: 模型输出，形状 (4 + 类别数, 候选框数) 或带批次维度的 (1, 4 + 类别数, 候选框数)
+    :param conf: 置信度阈值
+    :param iou: NMS IoU 阈值
+    :param classes: 只保留的类别，None 表示全部
+    :param max_det: 最多保留的检测框数
+    :param max_nms: 进入 NMS 的最大候选框数
+    :return: (N x 4 的 xyxy 框（输入张量坐标系）, N 个置信度, N 个类别)
+    """
+    if output.ndim == 3:
+        output = output[0]
+    # 先按最高类别分数过滤（绝大多数候选框在这里被丢弃），再只对保留的候选框求类别
+    keep = output[4:].max(axis=0) > conf
+    preds = output[:, keep].T
+    cls_ids = preds[:, 4:].argmax(axis=1)
+    scores = preds[np.arange(len(preds)), 4 + cls_ids]
+    if classes is not None:
+        keep = np.isin(cls_ids, classes)
+        preds, scores, cls_ids = preds[keep], scores[keep], cls_ids[keep]
+    if len(preds) > max_nms:
+        top = scores.argsort()[::-1][:max_nms]
+        preds, scores, cls_ids = preds[top], scores[top], cls_ids[top]
+
+    xy, wh = preds[:, :2], preds[:, 2:4]
+    boxes = np.concatenate([xy - wh / 2, xy + wh / 2], axis=1)
+    if len(boxes) == 0:
+        return boxes.reshape(0, 4), scores, cls_ids
+
+    # 不同类别的框平移到互不重叠的区域，一次 NMS 即完成按类别抑制
+    offsets = cls_ids[:, None].astype(boxes.dtype) * CLASS_OFFSET
+    kept = nms(boxes + offsets, scores, iou)[:max_det]
+    return boxes[kept], scores[kept], cls_ids[kept]
+
+
+def scale_boxes(boxes: np.ndarray, ratio: float, pad: Tuple[int, int], shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    函数级注释：将输入张量坐标系的框还原到原图坐标系并裁剪到图像范围内
+    :param boxes: N x 4 的 xyxy 框
+    :param ratio: letterbox 缩放比例
+    :param pad: letterbox 的 (左侧填充, 顶部填充)
+    :param shape: 原图形状
+    """
+    height, width = shape[:2]
+    # letterbox 对两边分别取整，还原时按取整后的实际缩放比例计算
+    gain_x, gain_y = round(width * ratio) / width, round(height * ratio) / height
+    boxes = boxes.copy()
+    boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad[0]) / gain_x
+    boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad[1]) / gain_y
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+    return boxes
+
+
+class YoloBoxes:
+    """
+    类级注释：检测框集合（字段与 ultralytics Boxes 一致，均为 NumPy 数组）
+    """
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+    def __len__(self) -> int:
+        return len(self.xyxy)
+
+
+class YoloResult:
+    """
+    类级注释：单张图像的推理结果（字段与 ultralytics Results 的 names / boxes 一致）
+    """
+
+    def __init__(self, names: Dict[int, str], boxes: YoloBoxes):
+        self.names = names
+        self.boxes = boxes
@@ -3,9 +3,13 @@
 基于YOLOv8的视觉火灾检测系统主程序
 """
 import time
+
+# 进程启动时间，用于统计从启动到检测服务就绪的耗时（模块导入与模型加载均计入）
+PROCESS_START = time.time()
+
 import logging
-import threading
 import os
+import multiprocessing as mp
 import cv2
 
 # 初始化日志系统（必须在导入其他模块之前）
@@ -17,8 +21,12 @@ setup_logging(log_dir=log_dir, log_level=logging.INFO, retention_days=7)
 
 from core.communication.communication import Communication
 from core.communication.config_hot_loader import get_config_hot_loader
+from core.communication.readiness import ReadinessReporter
 from core.yolo.detector import Detector
-from core.yolo.Onvif_to_RTSP import analysis_rtsp
+from core.yolo.batcher import InferenceBatcher
+from core.video.camera_stream import CameraStream, build_stream_config
+from core.video.source_resolver import VideoSourceResolver
+from core.video.process_pipeline import InferenceServer, run_camera_worker
 
 
 try:
@@ -61,15 +69,23 @@ class Main:
         
         # 初始化配置热加载器
         self.config_loader = get_config_hot_loader()
-        
-        self.last_alert_time = 0
+
+        # 就绪状态：管理后台据此判断重启后防护何时生效
+        self.readiness = ReadinessReporter(start_time=PROCESS_START)
+        self.readiness.publish("loading")
         
         # 从配置获取 YOLO 参数，或使用默认值
         yolo_weights = self.config_loader.get_config('yolo_weights', 'core/yolo/weights/best.pt')
         yolo_device = self.config_loader.get_config('yolo_device', 'cuda')
         yolo_conf = self.config_loader.get_config('yolo_confidence', 0.8)
+        yolo_backend = self.config_loader.get_config('yolo_backend', 'ultralytics')
         
-        self.detector = Detector(weights_path=yolo_weights, device=yolo_device, conf=yolo_conf)
+        self.detector = Detector(weights_path=yolo_weights, device=yolo_device, conf=yolo_conf, backend=yolo_backend)
+
+        # 模型预热：惰性初始化在启动阶段完成，而不是由第一个真实帧承担
+        self.readiness.publish("warming_up")
+        warmup_runs = int(self.config_loader.get_config('yolo_warmup_runs', 3) or 0)
+        self.warmup_ms = round(self.detector.warmup(warmup_runs), 1)
         
         # 初始化通信模块
         self.comm = Communication()
@@ -83,31 +99,7 @@ class Main:
         """
         函数级注释：获取最新配置
         """
-        alert_interval = self.config_loader.get_config('alert_cooldown_seconds', 360)
-        camera_index = self.config_loader.get_config('camera_index', 0)
-        detection_interval = self.config_loader.get_config('detection_interval', 4)
-        consecutive_threshold = self.config_loader.get_config('consecutive_threshold', 6)
-        #rtsp摄像头参数
-        rtsp_url = self.config_loader.get_config('rtsp_url')
-        #onvif协议摄像头参数
-        onvif_use= self.config_loader.get_config('onvif_use', False)
-        onvif_ip = self.config_loader.get_config('onvif_ip')
-        onvif_port = self.config_loader.get_config('onvif_port')
-        onvif_username = self.config_loader.get_config('onvif_username')
-        onvif_password = self.config_loader.get_config('onvif_password')
-        
-        return {
-            'alert_interval': alert_interval,
-            'camera_index': camera_index,
-            'rtsp_url': rtsp_url,
-            'detection_interval': detection_interval,
-            'consecutive_threshold': consecutive_threshold,
-            'onvif_use': onvif_use,
-            'onvif_ip': onvif_ip,
-            'onvif_port': onvif_port,
-            'onvif_username': onvif_username,
-            'onvif_password': onvif_password
-        }
+        return build_stream_config(self.config_loader)
     
     def _is_local_mode(self) -> bool:
         """
@@ -121,174 +113,217 @@ class Main:
         # 否则默认本地模式
         return True
 
-    def _resolve_video_source(self, config):
+    def _create_source_resolver(self, config):
         """
-        函数级注释：判断视频画面来源
+        函数级注释：创建视频源解析器
         优先级：
         1) 显式配置的 RTSP URL
-        2) ONVIF 协议动态获取 RTSP URL
+        2) ONVIF 协议动态获取 RTSP URL（缓存，重连失败时才重新获取）
         3) 本地摄像头索引
         """
-        # 1) 优先使用显式 RTSP
-        if config.get('rtsp_url'):
-            self.logger.info("使用配置的 RTSP 视频源")
-            return config['rtsp_url']
+        return VideoSourceResolver(config)
 
-        # 2) 其次使用 ONVIF 动态获取 RTSP
-        if config.get('onvif_use'):
-            try:
-                rtsp_url = analysis_rtsp(
-                    ip=config.get('onvif_ip'),
-                    port=int(config.get('onvif_port') or 80),
-                    username=config.get('onvif_username'),
-                    password=config.get('onvif_password'),
-                )
-                self.logger.info("使用 ONVIF 获取到的 RTSP 视频源")
-                return rtsp_url
-            except Exception as e:
-                self.logger.exception(f"ONVIF 获取 RTSP 失败，回退本地摄像头: {e}")
+    def _get_stream_configs(self, config):
+        """
+        函数级注释：获取需要监控的视频流列表
+        system.json 中配置了 camera_sources 列表时进入多路监控模式，每项可覆盖
+        rtsp_url / onvif_* / camera_index / detection_interval 等参数；
+        未配置时沿用单路参数，保持原有行为
+        """
+        sources = self.config_loader.get_config('camera_sources') or []
+        if not isinstance(sources, list):
+            self.logger.warning(f"camera_sources 配置格式错误，应为列表，已忽略: {sources}")
+            sources = []
 
-        # 3) 最后回退本地摄像头
-        self.logger.info("使用本地摄像头 camera_index")
-        return config['camera_index']
+        stream_configs = []
+        for idx, item in enumerate(sources):
+            if isinstance(item, str):
+                item = {'rtsp_url': item}
+            if not isinstance(item, dict):
+                self.logger.warning(f"camera_sources[{idx}] 配置格式错误，已忽略: {item}")
+                continue
+            if item.get('enabled', True) is False:
+                continue
+            stream_cfg = dict(item)
+            stream_cfg.setdefault('name', f"camera{idx}")
+            stream_configs.append(stream_cfg)
+
+        if not stream_configs:
+            stream_configs.append({'name': 'main'})
+        return stream_configs
+
+    def _get_stream_config(self, stream_cfg):
+        """
+        函数级注释：获取单路视频流的最新配置（全局热配置 + 该路覆盖项）
+        """
+        return build_stream_config(self.config_loader, stream_cfg)
 
     def run_detection_loop(self):
         """
         函数级注释：主检测循环
-        处理视频流，连续检测到火灾后触发报警
+        为每路视频流启动独立的抓帧与检测线程（共享同一份 YOLO 模型），连续检测到火灾后触发报警；
+        主线程负责本地画面显示与退出控制
         """
-        config = self._get_config()
         is_local = self._is_local_mode()
-        #获取视频源
-        source = self._resolve_video_source(config)
+        stream_configs = self._get_stream_configs(self._get_config())
+        multi_stream = len(stream_configs) > 1
+        if self.config_loader.get_config('multi_camera_mode', 'thread') == 'process':
+            self._run_process_pipeline(stream_configs, multi_stream, is_local)
+            return
+        if multi_stream:
+            self.logger.info(f"多路监控模式，共 {len(stream_configs)} 路视频流，共享同一模型")
 
-        cap = cv2.VideoCapture(source)
-        
-        # RTSP 流优化参数
-        if config['rtsp_url']:
-            # 设置缓冲区大小，减少延迟
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 3)
-        
-        if not cap.isOpened():
-            self.logger.error(f"无法打开视频源: {source}")
+        # 多路视频流时把各路的推理请求合并为批量前向
+        batcher = None
+        max_batch = int(self.config_loader.get_config('inference_batch_size', 1) or 1)
+        if multi_stream and max_batch > 1:
+            batcher = InferenceBatcher(
+                self.detector,
+                max_batch=max_batch,
+                max_wait_ms=self.config_loader.get_config('inference_batch_wait_ms', 5),
+            )
+            batcher.start()
+
+        streams = []
+        for stream_cfg in stream_configs:
+            config = self._get_stream_config(stream_cfg)
+            name = stream_cfg['name']
+            #获取视频源
+            resolver = self._create_source_resolver(config)
+            source = resolver.resolve()
+            # 第一路直接使用主检测器，其余各路共享模型、独立维护背景建模与追踪状态
+            detector = self.detector if not streams else self.detector.spawn()
+            if batcher is not None:
+                detector.inference_client = batcher.infer
+                detector.inference_batch_client = batcher.infer_many
+            stream = CameraStream(
+                name=name,
+                source=source,
+                detector=detector,
+                comm=self.comm,
+                get_config=lambda cfg=stream_cfg: self._get_stream_config(cfg),
+                buffer_size=3 if config['rtsp_url'] else None,
+                display=is_local,
+                alert_prefix=f"fire_alert_{name}" if multi_stream else "fire_alert",
+                resolver=resolver,
+                on_first_analysis=self.readiness.first_detection,
+            )
+            if not stream.start():
+                self.logger.error(f"无法打开视频源: {source}")
+                continue
+            streams.append(stream)
+
+        if not streams:
+            self.logger.error("没有可用的视频源，退出")
+            self.readiness.publish("stopped", error="没有可用的视频源")
+            if batcher is not None:
+                batcher.stop()
             return
-        
-        self.logger.info(f"视频源打开成功: {source}")
-        
-        frame_count = 0
-        consecutive_fire_detections = 0
-        fire_state_active = False
-        consecutive_read_errors = 0
-        max_read_errors = 10
-        
-        while cap.isOpened():
-            # 每次循环获取最新配置
-            config = self._get_config()
-            
-            ret, frame = cap.read()
-            if not ret:
-                consecutive_read_errors += 1
-                if consecutive_read_errors >= max_read_errors:
-                    self.logger.error(f"连续 {consecutive_read_errors} 次无法读取视频帧，尝试重新连接...")
-                    cap.release()
-                    time.sleep(2)
-                    cap = cv2.VideoCapture(source)
-                    if config['rtsp_url']:
-                        cap.set(cv2.CAP_PROP_BUFFERSIZE, 3)
-                    if cap.isOpened():
-                        self.logger.info("视频源重新连接成功")
-                        consecutive_read_errors = 0
-                    else:
-                        self.logger.error("视频源重新连接失败，退出")
-                        break
-                else:
-                    self.logger.warning(f"无法读取视频帧 ({consecutive_read_errors}/{max_read_errors}，继续尝试...")
+
+        for stream in streams:
+            stream.start_thread()
+        self.readiness.ready(warmup_ms=self.warmup_ms, streams=[stream.name for stream in streams])
+
+        try:
+            while any(stream.is_running for stream in streams):
+                self.readiness.heartbeat()
+                if not is_local:
                     time.sleep(0.5)
                     continue
-            
-            consecutive_read_errors = 0
-            frame_count += 1
-            annotated_frame = frame.copy()
-            
-            # 每隔 DETECTION_INTERVAL 帧进行一次识别
-            if frame_count % config['detection_interval'] == 0:
-                try:
-                    annotated_frame, detections = self.detector.detect_frame(frame, draw=True)
-                except Exception as e:
-                    self.logger.exception(f"Detector 单帧检测失败，已跳过当前帧: {e}")
-                    detections = []
-                    annotated_frame = frame.copy()
-                    continue
-                
-                # 检查是否存在 Level 3 (高级确认) 的火灾或烟雾
-                # 在 Detector V2.0 中，warning_level=3 意味着已经通过了多模态验证和连续多帧的追踪
-                is_confirmed_danger = False
-                has_l2_warning = False
-                danger_types = set()
-                
-                for det in detections:
-                    if det.get('warning_level', 0) == 3:
-                        is_confirmed_danger = True
-                        danger_types.add(det.get('cls_name', 'unknown'))
-                    elif det.get('warning_level', 0) == 2:
-                        has_l2_warning = True
-                
-                if is_confirmed_danger:
-                    danger_desc = " 和 ".join(danger_types)
-                    consecutive_fire_detections += 1
-                    if not fire_state_active:
-                        fire_state_active = True
-                        self.logger.warning(f"🚨 Detector已确认高级预警 ({danger_desc})，进入最终报警确认阶段...")
-                else:
-                    if has_l2_warning:
-                        self.logger.info("⚠️ 检测到持续 L2 预警目标，继续观察，不触发正式报警")
-                    if consecutive_fire_detections > 0:
-                        self.logger.info(f"危险目标消失或降级，报警计数重置 (上次计数: {consecutive_fire_detections})")
-                    consecutive_fire_detections = 0
-                    fire_state_active = False
-                
-                # 为了防止网络抖动导致的偶然丢失，这里仍然保留一个极小的连续确认阈值 (建议在配置里把 threshold 调小，比如 2-3)
-                # 因为 Detector 内部已经做过连续 5 帧的严格校验了
-                if consecutive_fire_detections >= config['consecutive_threshold']:
-                    current_time = time.time()
-                    if current_time - self.last_alert_time > config['alert_interval']:
-                        self.logger.warning(
-                            f"🔥 触发正式报警: 已确认存在 {danger_desc}!"
-                        )
-                        self.last_alert_time = current_time
-                        
-                        # 保存带有检测框的图片用于报警
-                        image_path = f"output/fire_alert_{int(current_time)}.jpg"
-                        cv2.imwrite(image_path, annotated_frame)
-                        self.logger.info(f"报警截图已保存: {image_path}")
-                        
-                        # 启动报警线程
-                        alarm_thread = threading.Thread(
-                            target=self.comm.run_fire_alarm_process_feishu,
-                            args=(image_path,)
-                        )
-                        alarm_thread.start()
-                        
-                        # 报警后重置计数器
-                        consecutive_fire_detections = 0
-                        fire_state_active = False
-                    else:
-                        remaining = int(config['alert_interval'] - (current_time - self.last_alert_time))
-                        if remaining < 0:
-                            remaining = 0
-                        self.logger.info(f"报警冷却中，剩余 {remaining}s，本次不重复触发")
-            
-            # 显示画面（仅在本地模式下）
-            if is_local:
-                cv2.imshow("Fire Detection", annotated_frame)
-                
+
+                # 显示画面（仅在本地模式下）
+                shown = False
+                for stream in streams:
+                    frame = stream.pop_display_frame()
+                    if frame is not None:
+                        window = f"Fire Detection - {stream.name}" if multi_stream else "Fire Detection"
+                        cv2.imshow(window, frame)
+                        shown = True
+                if not shown:
+                    time.sleep(0.005)
+
                 # 按 'q' 退出
                 if cv2.waitKey(1) & 0xFF == ord('q'):
                     break
-        
-        cap.release()
-        cv2.destroyAllWindows()
-        self.logger.info("程序已退出。")
+        except KeyboardInterrupt:
+            self.logger.info("收到中断信号，准备退出")
+        finally:
+            for stream in streams:
+                stream.stop()
+            if batcher is not None:
+                batcher.stop()
+                self.logger.info(f"批量推理统计: {batcher.stats()}")
+            self.readiness.publish("stopped")
+            cv2.destroyAllWindows()
+            self.logger.info("程序已退出。")
+
+    def _run_process_pipeline(self, stream_configs, multi_stream, is_local):
+        """
+        函数级注释：多进程检测模式
+        每路摄像头一个工作进程（解码、背景建模、校验、追踪、报警），
+        主进程作为唯一的推理进程，通过共享内存环形缓冲接收帧并回传 YOLO 检测结果
+        """
+        if is_local:
+            self.logger.warning("多进程模式不支持本地画面显示，将以无界面方式运行")
+
+        ctx = mp.get_context("spawn")
+        request_queue = ctx.Queue()
+        response_queues = [ctx.Queue() for _ in stream_configs]
+        stop_event = ctx.Event()
+        detector_kwargs = {
+            'weights_path': self.detector.weights_path,
+            'conf': self.detector.conf,
+            'device': self.detector.device,
+            'classes': self.detector.classes,
+            'imgsz': self.detector.imgsz,
+            'backend': self.detector.backend,
+        }
+
+        workers = []
+        for worker_id, stream_cfg in enumerate(stream_configs):
+            config = self._get_stream_config(stream_cfg)
+            #获取视频源（在主进程解析并缓存，工作进程重连失败时再自行重新获取）
+            resolver = self._create_source_resolver(config)
+            resolver.resolve()
+            worker = ctx.Process(
+                target=run_camera_worker,
+                args=(worker_id, stream_cfg['name'], resolver, stream_cfg, detector_kwargs,
+                      request_queue, response_queues[worker_id], stop_event, log_dir,
+                      3 if config['rtsp_url'] else None, multi_stream),
+                name=f"CameraWorker-{stream_cfg['name']}",
+                daemon=True,
+            )
+            worker.start()
+            workers.append(worker)
+        self.logger.info(f"多进程检测模式，已启动 {len(workers)} 个摄像头工作进程，主进程负责集中推理")
+
+        server = InferenceServer(
+            self.detector,
+            request_queue,
+            response_queues,
+            max_batch=int(self.config_loader.get_config('inference_batch_size', 1) or 1),
+            max_wait_ms=self.config_loader.get_config('inference_batch_wait_ms', 5),
+        )
+        self.readiness.ready(warmup_ms=self.warmup_ms, streams=[cfg['name'] for cfg in stream_configs])
+        try:
+            while any(worker.is_alive() for worker in workers):
+                server.serve_once(timeout=0.5)
+                # 工作进程的检测都经过推理服务，首个推理请求完成即视为防护生效
+                if server.requests_served:
+                    self.readiness.first_detection("inference_server")
+                self.readiness.heartbeat()
+        except KeyboardInterrupt:
+            self.logger.info("收到中断信号，准备退出")
+        finally:
+            stop_event.set()
+            for worker in workers:
+                worker.join(timeout=5.0)
+                if worker.is_alive():
+                    worker.terminate()
+            server.close()
+            self.readiness.publish("stopped")
+            self.logger.info(f"程序已退出，共处理推理请求 {server.requests_served} 次，"
+                             f"批大小分布: {server.batch_size_hist.snapshot()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,80 @@
+"""
+类级注释：光照补偿基准测试
+对比两种方式得到 YOLO 输入（含 letterbox 缩放）与校验区域增强像素的单帧耗时：
+- full：整帧 CLAHE 后由 letterbox 缩放到推理尺寸（原流程）
+- inference：先缩放到推理尺寸再 CLAHE，校验区域按需补偿（enhance_at_inference_size）
+
+用法：
+    PYTHONPATH=. python test/benchmark/bench_enhance.py [--imgsz 640] [--repeat 30] [--rois 2] [--sizes 1080p 4k]
+"""
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+from core.yolo import yolo_ops
+from core.yolo.enhance import ClaheEnhancer, LazyEnhancedFrame
+
+SIZES = {"720p": (1280, 720), "1080p": (1920, 1080), "4k": (3840, 2160)}
+
+
+def _rois(width: int, height: int, count: int):
+    """
+    函数级注释：画面中的若干 160x160 候选区域
+    """
+    return [(int(width * (i + 1) / (count + 1)) - 80, height // 2 - 80,
+             int(width * (i + 1) / (count + 1)) + 80, height // 2 + 80) for i in range(count)]
+
+
+def bench(frame: np.ndarray, imgsz: int, rois, repeat: int) -> dict:
+    """
+    函数级注释：交替测量两种方式的耗时
+    :return: 各方式的单帧耗时中位数（毫秒）
+    """
+    enhancer = ClaheEnhancer()
+
+    def full():
+        enhanced = enhancer.enhance(frame)
+        yolo_ops.letterbox(enhanced, imgsz)
+        for x0, y0, x1, y1 in rois:
+            enhanced[y0:y1, x0:x1].copy()
+
+    def inference():
+        small, _ = enhancer.enhance_for_inference(frame, imgsz)
+        yolo_ops.letterbox(small, imgsz)
+        lazy = LazyEnhancedFrame(frame, enhancer)
+        for x0, y0, x1, y1 in rois:
+            lazy[y0:y1, x0:x1]
+
+    runners = {"full": full, "inference": inference}
+    latencies = {name: [] for name in runners}
+    for run in runners.values():
+        run()
+    for _ in range(repeat):
+        for name, run in runners.items():
+            start = time.perf_counter()
+            run()
+            latencies[name].append((time.perf_counter() - start) * 1000)
+    return {name: float(np.median(values)) for name, values in latencies.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="光照补偿单帧耗时对比")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--rois", type=int, default=2, help="每帧需要校验的候选区域数")
+    parser.add_argument("--sizes", nargs="+", default=["1080p", "4k"], choices=sorted(SIZES))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for size_name in args.sizes:
+        width, height = SIZES[size_name]
+        frame = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (0, 0), 3)
+        result = bench(frame, args.imgsz, _rois(width, height, args.rois), args.repeat)
+        print(f"{size_name:<6} 整帧补偿 {result['full']:7.2f} ms  推理尺寸补偿 {result['inference']:7.2f} ms  "
+              f"节省 {result['full'] - result['inference']:7.2f} ms（imgsz={args.imgsz}, 校验区域 {args.rois} 个）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+类级注释：积分图区域统计基准测试
+模拟 YOLO 对同一处火焰输出大量重叠子框的情况，对比逐框统计与积分图统计（integral_stats_enabled）下
+多模态校验（postprocess）的单帧耗时，可同时开启颜色类别查找表（--lut）
+
+用法：
+    PYTHONPATH=. python test/benchmark/bench_integral_stats.py [--repeat 20] [--boxes 1 4 16 64] [--lut]
+"""
+import time
+import argparse
+import logging
+
+import cv2
+import numpy as np
+
+from core.yolo.detections import DetectionBatch
+from core.yolo.detector import Detector
+
+
+def make_scene(rng: np.random.Generator) -> np.ndarray:
+    """
+    函数级注释：1080p 暗背景上约 400x400 的火焰区域
+    """
+    frame = np.full((1080, 1920, 3), 30, dtype=np.uint8)
+    flame = np.zeros(frame.shape[:2], dtype=np.uint8)
+    cv2.ellipse(flame, (960, 640), (180, 160), 0, 0, 360, 255, -1)
+    for x in range(800, 1120, 40):
+        tip = (x + int(rng.integers(-30, 30)), int(rng.integers(300, 450)))
+        cv2.fillPoly(flame, [np.array([(x - 25, 640), (x + 25, 640), tip])], 255)
+    colors = cv2.GaussianBlur(rng.integers(0, 256, frame.shape, dtype=np.uint8), (0, 0), 6)
+    colors = cv2.normalize(colors, None, 0, 255, cv2.NORM_MINMAX)
+    colors[:, :, 0] //= 4
+    colors[:, :, 2] = np.maximum(colors[:, :, 2], 200)
+    frame[flame > 0] = colors[flame > 0]
+    return frame
+
+
+def make_boxes(rng: np.random.Generator, count: int) -> DetectionBatch:
+    """
+    函数级注释：火焰区域内的重叠子框（首个为整体框）
+    """
+    boxes = [(770, 300, 1150, 810)]
+    for _ in range(count - 1):
+        x0, y0 = int(rng.integers(770, 1000)), int(rng.integers(300, 650))
+        boxes.append((x0, y0, x0 + int(rng.integers(80, 200)), y0 + int(rng.integers(80, 200))))
+    xyxy = np.array(boxes, dtype=np.float32)
+    return DetectionBatch.from_arrays(xyxy, np.full(count, 0.9), np.zeros(count), {0: "fire"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重叠候选框的多模态校验耗时对比")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--boxes", nargs="+", type=int, default=[1, 4, 16, 64], help="每帧火焰候选框数")
+    parser.add_argument("--lut", action="store_true", help="同时开启颜色类别查找表")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = np.random.default_rng(0)
+    frame = make_scene(rng)
+    enhanced = cv2.convertScaleAbs(frame, alpha=1.1, beta=5)
+    fg_mask = np.full((270, 480), 255, dtype=np.uint8)
+    detector = Detector(weights_path="unused.pt", model=object())
+    detector.config_loader = None
+    detector.color_lut_enabled = args.lut
+    detector._sync_color_classes()
+
+    for count in args.boxes:
+        batch = make_boxes(rng, count)
+        result = {}
+        for enabled in (False, True):
+            detector.integral_stats_enabled = enabled
+            latencies = []
+            for _ in range(args.repeat + 1):
+                start = time.perf_counter()
+                detector.postprocess(frame, enhanced, fg_mask, batch.copy(), draw=False, is_static_test=True)
+                latencies.append((time.perf_counter() - start) * 1000)
+            result[enabled] = float(np.median(latencies[1:]))
+        print(f"{count:>3} 个候选框  逐框统计 {result[False]:8.2f} ms  积分图 {result[True]:8.2f} ms  "
+              f"加速 {result[False] / result[True]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
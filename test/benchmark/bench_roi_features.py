@@ -0,0 +1,110 @@
+"""
+类级注释：候选区域特征缓存基准测试
+按火焰多模态校验的阶段顺序，对比颜色空间转换与阈值掩码的两种计算方式在常见检测框尺寸下的耗时：
+- per_stage：原流程，先裁剪原图与增强图区域，各阶段各自转换（原图 HSV 转换两次）
+- cached：RoiFeatures 共享特征，每种转换只计算一次，增强图区域到颜色校验时才裁剪
+- lut：在 cached 的基础上用颜色类别查找表得到各类别掩码（color_lut_enabled）
+候选框分两种：走完所有阶段的（full）与在肤色阶段被拒绝的（early）；
+增强画面分为整帧补偿结果（ndarray）与按需补偿的 LazyEnhancedFrame（enhance_at_inference_size）
+
+用法：
+    PYTHONPATH=. python test/benchmark/bench_roi_features.py [--repeat 300] [--sizes 48 96 192 384]
+"""
+import time
+import argparse
+from functools import partial
+
+import cv2
+import numpy as np
+
+from core.yolo import color_lut
+from core.yolo.enhance import ClaheEnhancer, LazyEnhancedFrame
+from core.yolo.roi_features import RoiFeatures
+
+# 检测器默认的火焰色区间（不含白色焰心）
+DETECTOR_FIRE_RANGES = color_lut.normalize_ranges((
+    ((0, 50, 50), (15, 255, 255)),
+    ((165, 50, 50), (180, 255, 255)),
+    ((10, 50, 50), (40, 255, 255)),
+))
+FIRE_RANGES = DETECTOR_FIRE_RANGES + (color_lut.WHITE_CORE_RANGE,)
+CLASSES = color_lut.color_classes(DETECTOR_FIRE_RANGES)
+RED_RANGES = (((0, 70, 70), (15, 255, 255)), ((165, 70, 70), (180, 255, 255)))
+YELLOW = ((15, 80, 80), (45, 255, 255))
+SKIN = ((70, 130, 80), (210, 180, 135))
+
+
+def per_stage(raw, enhanced, box, early):
+    """
+    函数级注释：原流程的特征计算
+    """
+    xmin, ymin, xmax, ymax = box
+    roi_raw, roi_enhanced = raw[ymin:ymax, xmin:xmax], enhanced[ymin:ymax, xmin:xmax]
+    cv2.inRange(cv2.cvtColor(roi_raw, cv2.COLOR_BGR2YCrCb), np.array(SKIN[0]), np.array(SKIN[1]))
+    if early:
+        return
+    cv2.cvtColor(roi_raw, cv2.COLOR_BGR2GRAY)
+    hsv = cv2.cvtColor(roi_enhanced, cv2.COLOR_BGR2HSV)
+    fire = cv2.inRange(hsv, np.array(FIRE_RANGES[0][0]), np.array(FIRE_RANGES[0][1]))
+    for low, high in FIRE_RANGES[1:]:
+        fire = cv2.bitwise_or(fire, cv2.inRange(hsv, np.array(low), np.array(high)))
+    cv2.cvtColor(roi_raw, cv2.COLOR_BGR2HSV)
+    hsv_raw = cv2.cvtColor(roi_raw, cv2.COLOR_BGR2HSV)
+    cv2.inRange(hsv_raw, np.array(YELLOW[0]), np.array(YELLOW[1]))
+    cv2.bitwise_or(*(cv2.inRange(hsv_raw, np.array(low), np.array(high)) for low, high in RED_RANGES))
+    np.count_nonzero(hsv_raw[:, :, 2] > 250)
+
+
+def cached(raw, enhanced, box, early, lut=None):
+    """
+    函数级注释：RoiFeatures 的特征计算（饱和度与黄色抑制两个阶段取用同一原图 HSV，统计量仍需原图 HSV）
+    """
+    features = RoiFeatures(raw, enhanced, box, CLASSES, lut)
+    features.color_ratio(color_lut.SKIN)
+    if early:
+        return
+    features.convert("gray")
+    features.color_mask(color_lut.FIRE, enhanced=True)
+    features.convert("hsv")
+    features.color_ratio(color_lut.HIGHLIGHT)
+    features.convert("hsv")
+    features.color_mask(color_lut.YELLOW)
+    features.color_ratio(color_lut.RED)
+
+
+def measure(run, raw, enhanced, box, early, repeat) -> float:
+    """
+    函数级注释：单个候选框的平均耗时（微秒）
+    """
+    run(raw, enhanced, box, early)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run(raw, enhanced, box, early)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="候选区域特征计算耗时对比")
+    parser.add_argument("--repeat", type=int, default=300)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[48, 96, 192, 384], help="正方形检测框边长")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    raw = cv2.GaussianBlur(rng.integers(0, 255, (1080, 1920, 3), dtype=np.uint8), (0, 0), 2)
+    enhancer = ClaheEnhancer()
+    frames = (("ndarray", enhancer.enhance(raw)), ("lazy", LazyEnhancedFrame(raw, enhancer)))
+    with_lut = partial(cached, lut=color_lut.build_color_lut(DETECTOR_FIRE_RANGES))
+    for size in args.sizes:
+        box = (800, 400, 800 + size, 400 + size)
+        for frame_name, enhanced in frames:
+            for early in (False, True):
+                old = measure(per_stage, raw, enhanced, box, early, args.repeat)
+                new = measure(cached, raw, enhanced, box, early, args.repeat)
+                lut = measure(with_lut, raw, enhanced, box, early, args.repeat)
+                print(f"{size:>4}x{size:<4} {frame_name:<8} {'early' if early else 'full':<6} "
+                      f"各阶段转换 {old:8.1f} us  共享特征 {new:8.1f} us ({old / new:.2f}x)  "
+                      f"查找表 {lut:8.1f} us ({old / lut:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
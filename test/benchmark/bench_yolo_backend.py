@@ -0,0 +1,126 @@
+"""
+类级注释：YOLO 推理后端基准测试
+在测试图片上对比 ultralytics（YOLO.predict）、精简 PyTorch 路径与 ONNX Runtime 后端的单帧推理延迟
+（Detector.infer，含前后处理）；同时单独测量 PyTorch 检测网络前向耗时，两者之差即每次调用的前后处理与框架开销。
+各后端按帧交替调用，机器负载波动对所有后端的影响相同
+
+用法：
+    PYTHONPATH=. python test/benchmark/bench_yolo_backend.py [权重] [--imgsz 640] [--repeat 50] [--threads 0]
+        [--backends ultralytics torch onnx]
+"""
+import os
+import glob
+import time
+import shutil
+import argparse
+import tempfile
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+
+from core.yolo.detector import Detector
+
+DEFAULT_IMAGES = os.path.join(os.path.dirname(__file__), "..", "yolo_test", "test_imgs", "*")
+
+
+def forward_runner(weights: str, imgsz: int) -> Callable[[np.ndarray], None]:
+    """
+    函数级注释：只执行 PyTorch 检测网络前向的调用（输入张量预先准备好），作为计算调用开销的基准
+    """
+    import torch
+    from core.yolo import yolo_ops
+    from core.yolo.torch_backend import TorchYoloModel
+
+    model = TorchYoloModel.from_weights(weights)
+    tensors: Dict[int, "torch.Tensor"] = {}
+
+    def run(image: np.ndarray):
+        key = id(image)
+        if key not in tensors:
+            padded, _, _ = yolo_ops.letterbox(image, imgsz, stride=model.stride)
+            tensors[key] = torch.from_numpy(yolo_ops.to_input_tensor(padded))
+        with torch.inference_mode():
+            model.module(tensors[key])
+
+    return run
+
+
+def bench_interleaved(runners: Dict[str, Callable[[np.ndarray], None]], images: List[np.ndarray], repeat: int,
+                      warmup: int = 3) -> Dict[str, dict]:
+    """
+    函数级注释：按帧交替调用各后端并测量延迟
+    :return: 各后端的延迟分位数（毫秒）与 CPU 时间
+    """
+    for run in runners.values():
+        for image in images[:1] * warmup:
+            run(image)
+
+    latencies = {name: [] for name in runners}
+    cpu = {name: 0.0 for name in runners}
+    for _ in range(repeat):
+        for image in images:
+            for name, run in runners.items():
+                cpu_start = time.process_time()
+                start = time.perf_counter()
+                run(image)
+                latencies[name].append((time.perf_counter() - start) * 1000)
+                cpu[name] += time.process_time() - cpu_start
+
+    results = {}
+    for name, values in latencies.items():
+        values = np.asarray(values)
+        results[name] = {
+            "p50_ms": float(np.percentile(values, 50)),
+            "p90_ms": float(np.percentile(values, 90)),
+            "mean_ms": float(values.mean()),
+            "cpu_ms_per_frame": cpu[name] * 1000 / len(values),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO 推理后端延迟对比")
+    parser.add_argument("weights", nargs="?", default="core/yolo/weights/best.pt", help=".pt 权重路径")
+    parser.add_argument("--images", default=DEFAULT_IMAGES, help="测试图片 glob")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=0, help="PyTorch 推理线程数，0 表示不修改")
+    parser.add_argument("--backends", nargs="+", default=["ultralytics", "torch", "onnx"], help="参与对比的推理后端")
+    args = parser.parse_args()
+
+    images = [cv2.imread(path) for path in sorted(glob.glob(args.images))]
+    images = [image for image in images if image is not None]
+    if not images:
+        raise SystemExit(f"没有找到测试图片: {args.images}")
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    # 在临时目录中导出 ONNX，不改动权重目录
+    tmpdir = tempfile.mkdtemp()
+    try:
+        weights = os.path.join(tmpdir, os.path.basename(args.weights))
+        shutil.copy(args.weights, weights)
+        print(f"测试图片 {len(images)} 张, imgsz={args.imgsz}, 每张重复 {args.repeat} 次")
+
+        runners = {"forward": forward_runner(weights, args.imgsz)}
+        for backend in args.backends:
+            detector = Detector(weights_path=weights, device="cpu", imgsz=args.imgsz, backend=backend)
+            detector.config_loader = None
+            runners[backend] = lambda image, d=detector: d.infer(image, imgsz=args.imgsz)
+        results = bench_interleaved(runners, images, args.repeat)
+
+        forward_ms = results["forward"]["p50_ms"]
+        print(f"{'forward':<12} p50 {forward_ms:7.1f} ms（仅 PyTorch 检测网络前向）")
+        for backend in args.backends:
+            result = results[backend]
+            print(f"{backend:<12} p50 {result['p50_ms']:7.1f} ms  p90 {result['p90_ms']:7.1f} ms  "
+                  f"mean {result['mean_ms']:7.1f} ms  cpu {result['cpu_ms_per_frame']:7.1f} ms/帧  "
+                  f"调用开销 {result['p50_ms'] - forward_ms:+6.1f} ms")
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+类级注释：单元测试共用的辅助函数与占位对象
+"""
+import time
+from types import SimpleNamespace
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def write_test_video(path: str, frames: int = 10, size=(64, 48), step: int = 20):
+    """
+    函数级注释：生成带帧编号亮度的测试视频（第 i 帧为纯色，亮度 i * step）
+    :param step: 相邻帧的亮度差
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, size)
+    for i in range(frames):
+        writer.write(np.full((size[1], size[0], 3), i * step % 256, dtype=np.uint8))
+    writer.release()
+
+
+class FakeModel:
+    """
+    类级注释：占位 YOLO 模型
+    记录每次 predict 的输入尺寸与推理尺寸，对每张输入图像返回固定检测框（输入坐标系，置信度 0.9，类别 fire）
+    """
+
+    names = {0: "fire", 1: "smoke"}
+
+    def __init__(self, boxes=(), input_shape: Optional[Tuple[int, int]] = None):
+        """
+        函数级注释：初始化占位模型
+        :param boxes: 返回的检测框 [[xmin, ymin, xmax, ymax], ...]，默认不返回检测结果
+        :param input_shape: 只对该尺寸（高, 宽）的输入返回检测框，None 表示所有输入
+        """
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.input_shape = input_shape
+        # [(输入尺寸，批量输入时为尺寸列表, imgsz), ...]
+        self.calls = []
+
+    @property
+    def imgsz(self):
+        """
+        函数级注释：历次 predict 的推理尺寸
+        """
+        return [imgsz for _, imgsz in self.calls]
+
+    def _result(self, image: np.ndarray) -> SimpleNamespace:
+        xyxy = self.boxes
+        if self.input_shape is not None and image.shape[:2] != tuple(self.input_shape):
+            xyxy = xyxy[:0]
+        boxes = SimpleNamespace(xyxy=xyxy, conf=np.full(len(xyxy), 0.9), cls=np.zeros(len(xyxy)))
+        return SimpleNamespace(names=self.names, boxes=boxes)
+
+    def predict(self, source, imgsz=None, **kwargs):
+        if isinstance(source, list):
+            self.calls.append(([image.shape for image in source], imgsz))
+            return [self._result(image) for image in source]
+        self.calls.append((source.shape, imgsz))
+        return [self._result(source)]
+
+
+class FakeBatchDetector:
+    """
+    类级注释：占位检测器，记录单帧与批量推理调用，返回以帧像素值编码的检测结果
+    """
+
+    def __init__(self, delay: float = 0.0):
+        """
+        函数级注释：初始化占位检测器
+        :param delay: 每次推理的模拟耗时（秒）
+        """
+        self.delay = delay
+        # [(帧数, imgsz), ...]
+        self.calls = []
+
+    def _refresh_runtime_config(self, force=False):
+        pass
+
+    def infer(self, frame, imgsz=None):
+        self.calls.append((1, imgsz))
+        time.sleep(self.delay)
+        return [{'frame_id': int(frame[0, 0, 0])}], 0.0
+
+    def infer_batch(self, frames, imgsz=None):
+        self.calls.append((len(frames), imgsz))
+        time.sleep(self.delay)
+        return [[{'frame_id': int(frame[0, 0, 0])}] for frame in frames]
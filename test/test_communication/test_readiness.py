@@ -0,0 +1,63 @@
+"""
+类级注释：检测服务就绪状态单元测试
+"""
+import os
+import json
+import time
+import tempfile
+from unittest import TestCase
+
+from core.communication.readiness import ReadinessReporter
+
+
+class TestReadinessReporter(TestCase):
+    """
+    类级注释：测试就绪状态文件的发布
+    """
+
+    def setUp(self):
+        """
+        函数级注释：在临时目录中创建状态文件
+        """
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.status_path = os.path.join(tmp_dir.name, "config", "detector_status.json")
+
+    def _read(self):
+        with open(self.status_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_startup_phases_and_timings(self):
+        """
+        函数级注释：测试启动阶段依次写入，就绪与首帧检测耗时从进程启动时间算起
+        """
+        reporter = ReadinessReporter(self.status_path, start_time=time.time() - 10.0)
+        reporter.publish("warming_up")
+        self.assertEqual(self._read()["state"], "warming_up")
+
+        reporter.ready(warmup_ms=120.0, streams=["main"])
+        reporter.first_detection("main")
+        first = self._read()["first_detection_seconds"]
+        reporter.first_detection("other")
+
+        status = self._read()
+        self.assertEqual(status["state"], "ready")
+        self.assertGreaterEqual(status["startup_seconds"], 10.0)
+        self.assertEqual(status["streams"], ["main"])
+        self.assertEqual(status["first_detection_seconds"], first)
+        self.assertEqual(status["first_detection_stream"], "main")
+
+    def test_heartbeat_respects_interval(self):
+        """
+        函数级注释：测试心跳只在超过间隔后刷新 updated_at
+        """
+        reporter = ReadinessReporter(self.status_path, heartbeat_interval=60.0)
+        reporter.publish("ready")
+        updated_at = self._read()["updated_at"]
+
+        reporter.heartbeat()
+        self.assertEqual(self._read()["updated_at"], updated_at)
+
+        reporter._last_write -= 61.0
+        reporter.heartbeat()
+        self.assertGreater(self._read()["updated_at"], updated_at)
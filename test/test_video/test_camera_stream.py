@@ -0,0 +1,47 @@
+"""
+类级注释：视频流配置构建单元测试
+验证全局热配置与单路覆盖项的合并
+"""
+from unittest import TestCase
+
+from core.video.camera_stream import build_stream_config
+
+
+class _FakeConfigLoader:
+    """
+    类级注释：基于字典的假配置加载器
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+    def get_config(self, key, default=None):
+        return self.values.get(key, default)
+
+
+class TestBuildStreamConfig(TestCase):
+    """
+    类级注释：测试单路视频流配置构建
+    """
+
+    def test_global_scheduling_keys_are_passed_through(self):
+        """
+        函数级注释：测试 system.json 中的抓帧与调度参数传递到视频流配置
+        """
+        loader = _FakeConfigLoader({'grab_skip_decode': False, 'analysis_target_fps': 5,
+                                    'analysis_latency_slo_ms': 300})
+        config = build_stream_config(loader)
+        self.assertFalse(config['grab_skip_decode'])
+        self.assertEqual(config['analysis_target_fps'], 5)
+        self.assertEqual(config['analysis_latency_slo_ms'], 300)
+        self.assertEqual(config['detection_interval'], 4)
+
+    def test_stream_overrides_win_except_none(self):
+        """
+        函数级注释：测试单路覆盖项优先，值为 None 的覆盖项不生效
+        """
+        loader = _FakeConfigLoader({'analysis_target_fps': 5, 'rtsp_url': 'rtsp://global'})
+        config = build_stream_config(loader, {'analysis_target_fps': 2, 'rtsp_url': None, 'name': 'gate'})
+        self.assertEqual(config['analysis_target_fps'], 2)
+        self.assertEqual(config['rtsp_url'], 'rtsp://global')
+        self.assertEqual(config['name'], 'gate')
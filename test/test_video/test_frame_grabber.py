@@ -0,0 +1,176 @@
+"""
+类级注释：最新帧抓取器单元测试
+使用临时生成的视频文件验证单槽缓冲、丢帧计数、读取超时与断线重连
+"""
+import os
+import time
+import random
+import shutil
+import tempfile
+from unittest import TestCase
+
+from core.video.frame_grabber import LatestFrameGrabber, ReconnectBackoff
+from helpers import write_test_video
+
+
+class TestLatestFrameGrabber(TestCase):
+    """
+    类级注释：测试抓帧线程的最新帧语义
+    """
+
+    def setUp(self):
+        """
+        函数级注释：测试前生成视频文件
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.video_path = os.path.join(self.temp_dir, "test.avi")
+        write_test_video(self.video_path, frames=30, step=8)
+
+    def test_open_invalid_source_fails(self):
+        """
+        函数级注释：测试无法打开的视频源返回 False
+        """
+        grabber = LatestFrameGrabber(os.path.join(self.temp_dir, "missing.avi"))
+        self.assertFalse(grabber.start())
+
+    def test_slow_consumer_gets_latest_frame_and_counts_drops(self):
+        """
+        函数级注释：测试慢消费者只拿到最新帧，被覆盖的帧计入丢帧
+        """
+        grabber = LatestFrameGrabber(self.video_path, max_read_errors=1000)
+        self.assertTrue(grabber.start())
+        self.addCleanup(grabber.stop)
+
+        deadline = time.time() + 2.0
+        while grabber.frames_captured < 30 and time.time() < deadline:
+            time.sleep(0.01)
+
+        ok, frame, latest_seq, _ = grabber.read(timeout=1.0)
+        self.assertTrue(ok)
+        self.assertEqual(frame.shape, (48, 64, 3))
+        self.assertEqual(latest_seq, 30)
+        stats = grabber.stats()
+        self.assertEqual(stats["consumed"], 1)
+        self.assertGreater(stats["dropped"], 0)
+        self.assertEqual(stats["captured"], stats["consumed"] + stats["dropped"])
+
+    def test_read_times_out_without_new_frame(self):
+        """
+        函数级注释：测试没有新帧时 read 超时返回失败
+        """
+        grabber = LatestFrameGrabber(self.video_path, max_read_errors=1000)
+        self.assertTrue(grabber.start())
+        self.addCleanup(grabber.stop)
+
+        deadline = time.time() + 2.0
+        while grabber.frames_captured < 30 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(grabber.read(timeout=1.0)[0])
+        ok, frame, _, _ = grabber.read(timeout=0.1)
+        self.assertFalse(ok)
+        self.assertIsNone(frame)
+
+    def test_decode_every_only_delivers_scheduled_frames(self):
+        """
+        函数级注释：测试 decode_every 模式只交付需要分析的帧，其余帧仅 grab
+        """
+        grabber = LatestFrameGrabber(self.video_path, max_read_errors=1000, decode_every=5)
+        self.assertTrue(grabber.start())
+        self.addCleanup(grabber.stop)
+
+        seqs = []
+        deadline = time.time() + 3.0
+        while len(seqs) < 6 and time.time() < deadline:
+            ok, frame, seq, _ = grabber.read(timeout=0.5)
+            if ok:
+                self.assertIsNotNone(frame)
+                seqs.append(seq)
+
+        while grabber.frames_captured < 30 and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertTrue(seqs)
+        self.assertTrue(all(seq % 5 == 0 for seq in seqs))
+        self.assertEqual(grabber.frames_captured, 30)
+        self.assertEqual(grabber.frames_skipped, 24)
+
+    def test_reconnects_after_source_ends(self):
+        """
+        函数级注释：测试读帧持续失败后在后台重连并继续交付新帧
+        """
+        grabber = LatestFrameGrabber(self.video_path, max_read_errors=2,
+                                     backoff=ReconnectBackoff(initial=0.05, maximum=0.1))
+        self.assertTrue(grabber.start())
+        self.addCleanup(grabber.stop)
+
+        deadline = time.time() + 5.0
+        while grabber.frames_captured <= 30 and time.time() < deadline:
+            time.sleep(0.01)
+        ok, _, seq, _ = grabber.read(timeout=2.0)
+        self.assertTrue(ok)
+        self.assertGreater(seq, 30)
+        self.assertGreaterEqual(grabber.reconnects, 1)
+        self.assertTrue(grabber.is_running)
+
+    def test_refreshes_source_when_cached_uri_fails(self):
+        """
+        函数级注释：测试缓存地址无法打开时通过解析器重新获取地址
+        """
+        video_path = self.video_path
+
+        class _FakeResolver:
+            can_refresh = True
+            refreshes = 0
+
+            def resolve(self, refresh=False):
+                _FakeResolver.refreshes += 1
+                return video_path
+
+        grabber = LatestFrameGrabber(self.video_path, max_read_errors=2, resolver=_FakeResolver(),
+                                     backoff=ReconnectBackoff(initial=0.05, maximum=0.1))
+        self.assertTrue(grabber.start())
+        self.addCleanup(grabber.stop)
+        grabber.source = os.path.join(self.temp_dir, "moved.avi")
+
+        deadline = time.time() + 5.0
+        while grabber.reconnects < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(grabber.reconnects, 1)
+        self.assertEqual(_FakeResolver.refreshes, 1)
+        self.assertEqual(grabber.source, video_path)
+
+    def test_gives_up_after_max_reconnect_attempts(self):
+        """
+        函数级注释：测试设置最大重连次数后，视频源始终不可用时停止抓帧
+        """
+        grabber = LatestFrameGrabber(self.video_path, max_read_errors=2, max_reconnect_attempts=2,
+                                     backoff=ReconnectBackoff(initial=0.01, maximum=0.02))
+        self.assertTrue(grabber.start())
+        self.addCleanup(grabber.stop)
+        grabber.source = os.path.join(self.temp_dir, "missing.avi")
+
+        deadline = time.time() + 5.0
+        while grabber.is_running and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(grabber.is_running)
+        self.assertEqual(grabber.reconnect_failures, 2)
+
+
+class TestReconnectBackoff(TestCase):
+    """
+    类级注释：测试重连退避策略
+    """
+
+    def test_delay_grows_exponentially_with_cap_and_jitter(self):
+        """
+        函数级注释：测试等待时间指数增长、受上限约束且抖动在范围内
+        """
+        backoff = ReconnectBackoff(initial=0.5, maximum=4.0, jitter=0.2, rng=random.Random(0))
+        delays = [backoff.next_delay() for _ in range(6)]
+        for delay, base in zip(delays, [0.5, 1.0, 2.0, 4.0, 4.0, 4.0]):
+            self.assertGreaterEqual(delay, base * 0.8)
+            self.assertLessEqual(delay, base * 1.2)
+
+        backoff.reset()
+        self.assertLessEqual(backoff.next_delay(), 0.6)
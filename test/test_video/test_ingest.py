@@ -0,0 +1,127 @@
+"""
+类级注释：视频接入后端单元测试
+使用临时生成的视频文件对比 PyAV 与 OpenCV 解码结果
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from core.video import ingest
+from core.video.ingest import PyAVCapture, open_video_capture
+from helpers import write_test_video
+
+
+def _write_gop_video(path: str, frames: int = 60, size=(160, 120)):
+    """
+    函数级注释：生成帧间编码的测试视频（带移动色块，保证产生非关键帧）
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 25, size)
+    background = np.random.default_rng(0).integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+    for i in range(frames):
+        frame = background.copy()
+        cv2.rectangle(frame, (i % 100, 30), (i % 100 + 40, 70), (0, 0, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+class TestOpenVideoCapture(TestCase):
+    """
+    类级注释：测试接入后端选择
+    """
+
+    def setUp(self):
+        """
+        函数级注释：测试前生成视频文件
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.video_path = os.path.join(self.temp_dir, "test.avi")
+        write_test_video(self.video_path)
+
+    def test_unknown_backend_falls_back_to_opencv(self):
+        """
+        函数级注释：测试无效的后端名称回退为 OpenCV
+        """
+        cap = open_video_capture(self.video_path, backend="gstreamer")
+        self.addCleanup(cap.release)
+        self.assertIsInstance(cap, cv2.VideoCapture)
+
+    @unittest.skipIf(ingest.av is None, "未安装 PyAV")
+    def test_pyav_frames_match_opencv(self):
+        """
+        函数级注释：测试 PyAV 后端输出与 OpenCV 一致的 BGR 帧
+        """
+        cap = open_video_capture(self.video_path, backend="pyav")
+        self.addCleanup(cap.release)
+        self.assertIsInstance(cap, PyAVCapture)
+        self.assertTrue(cap.isOpened())
+        self.assertEqual(cap.get(cv2.CAP_PROP_FRAME_WIDTH), 64)
+
+        reference = cv2.VideoCapture(self.video_path)
+        self.addCleanup(reference.release)
+        frames = 0
+        while True:
+            ok, frame = cap.read()
+            ref_ok, ref_frame = reference.read()
+            self.assertEqual(ok, ref_ok)
+            if not ok:
+                break
+            self.assertEqual(frame.shape, ref_frame.shape)
+            self.assertEqual(frame.dtype, np.uint8)
+            self.assertLessEqual(int(np.abs(frame.astype(int) - ref_frame.astype(int)).mean()), 3)
+            frames += 1
+        self.assertEqual(frames, 10)
+
+    @unittest.skipIf(ingest.av is None, "未安装 PyAV")
+    def test_pyav_grab_without_retrieve(self):
+        """
+        函数级注释：测试 grab 后不 retrieve 时跳过颜色转换
+        """
+        cap = PyAVCapture(self.video_path)
+        self.addCleanup(cap.release)
+        self.assertTrue(cap.grab())
+        self.assertTrue(cap.grab())
+        ok, frame = cap.retrieve()
+        self.assertTrue(ok)
+        self.assertEqual(frame.shape, (48, 64, 3))
+        self.assertEqual(cap.retrieve(), (False, None))
+
+    @unittest.skipIf(ingest.av is None, "未安装 PyAV")
+    def test_pyav_missing_source_is_not_opened(self):
+        """
+        函数级注释：测试无法打开的视频源返回未打开状态
+        """
+        cap = PyAVCapture(os.path.join(self.temp_dir, "missing.avi"))
+        self.assertFalse(cap.isOpened())
+        self.assertEqual(cap.read(), (False, None))
+
+    @unittest.skipIf(ingest.av is None, "未安装 PyAV")
+    def test_keyframe_mode_only_decodes_keyframes(self):
+        """
+        函数级注释：测试 keyframe 模式只交付关键帧，非关键帧数据包不送入解码器
+        """
+        path = os.path.join(self.temp_dir, "gop.mp4")
+        _write_gop_video(path, frames=60)
+
+        cap = PyAVCapture(path, decode_mode="keyframe")
+        self.addCleanup(cap.release)
+        frames = []
+        while cap.grab():
+            frames.append(cap._pending)
+        self.assertTrue(frames)
+        self.assertLess(len(frames), 60)
+        self.assertTrue(all(frame.key_frame for frame in frames))
+        self.assertEqual(len(frames) + cap.packets_skipped, 60)
+
+    def test_decode_mode_ignored_by_opencv(self):
+        """
+        函数级注释：测试 OpenCV 后端忽略稀疏解码模式
+        """
+        cap = open_video_capture(self.video_path, backend="opencv", options={"decode_mode": "keyframe"})
+        self.addCleanup(cap.release)
+        self.assertIsInstance(cap, cv2.VideoCapture)
@@ -0,0 +1,95 @@
+"""
+类级注释：集中推理服务单元测试
+"""
+import time
+import queue
+import threading
+from types import SimpleNamespace
+from unittest import TestCase
+
+import numpy as np
+
+from core.video.process_pipeline import InferenceServer, RemoteDetector
+from core.video.shm_ring import SharedFrameRing
+from helpers import FakeBatchDetector
+
+
+class TestInferenceServer(TestCase):
+    """
+    类级注释：测试推理进程合并多个工作进程的请求
+    """
+
+    def test_pending_requests_are_served_in_one_batch(self):
+        """
+        函数级注释：测试已排队的多个工作进程请求合并为一次批量推理，结果按 worker_id 与序号回传
+        """
+        rings = [SharedFrameRing.create((4, 4, 3), slots=2) for _ in range(3)]
+        for ring in rings:
+            self.addCleanup(ring.close)
+        request_queue = queue.Queue()
+        response_queues = [queue.Queue() for _ in rings]
+        for worker_id, ring in enumerate(rings):
+            slot = ring.write(np.full((4, 4, 3), worker_id + 10, dtype=np.uint8))
+            request_queue.put((worker_id, ring.name, ring.shape, ring.slots, slot, 1, 640))
+
+        detector = FakeBatchDetector()
+        server = InferenceServer(detector, request_queue, response_queues, max_batch=4, max_wait_ms=0)
+        self.addCleanup(server.close)
+
+        self.assertTrue(server.serve_once(timeout=0.1))
+
+        self.assertEqual([frames for frames, _ in detector.calls], [3])
+        self.assertEqual(server.requests_served, 3)
+        for worker_id, response_queue in enumerate(response_queues):
+            self.assertEqual(response_queue.get_nowait(), (1, [{'frame_id': worker_id + 10}]))
+
+
+class TestRemoteDetector(TestCase):
+    """
+    类级注释：测试工作进程一侧的远程推理
+    """
+
+    def setUp(self):
+        """
+        函数级注释：构造同进程内的远程检测器与推理服务
+        """
+        self.request_queue = queue.Queue()
+        response_queue = queue.Queue()
+        self.remote = RemoteDetector(SimpleNamespace(), 0, self.request_queue, response_queue, ring_slots=2)
+        self.addCleanup(self.remote.close)
+        self.detector = FakeBatchDetector()
+        self.server = InferenceServer(self.detector, self.request_queue, [response_queue], max_batch=8,
+                                      max_wait_ms=0)
+        self.addCleanup(self.server.close)
+
+    def _request(self, frames):
+        """
+        函数级注释：在后台线程提交请求，全部入队后由推理服务处理一次
+        """
+        results = []
+        thread = threading.Thread(target=lambda: results.extend(self.remote._request_inference_many(frames, 640)))
+        thread.start()
+        deadline = time.time() + 2.0
+        while self.request_queue.qsize() < len(frames) and time.time() < deadline:
+            time.sleep(0.005)
+        self.server.serve_once(timeout=0.1)
+        thread.join()
+        return results
+
+    def test_tiles_are_submitted_together(self):
+        """
+        函数级注释：测试同一帧的多个切片先全部提交再等待，推理服务合并为一次批量前向；
+        切片数超过槽位数时扩容，整帧与切片交替提交时各自的环形缓冲保持不变
+        """
+        results = self._request([np.full((8, 8, 3), i, dtype=np.uint8) for i in range(3)])
+
+        self.assertEqual([r[0]['frame_id'] for r in results], [0, 1, 2])
+        self.assertEqual([frames for frames, _ in self.detector.calls], [3])
+        tile_ring = self.remote._rings[(8, 8, 3)]
+        self.assertEqual(tile_ring.slots, 3)
+
+        results = self._request([np.full((16, 16, 3), 9, dtype=np.uint8)])
+
+        self.assertEqual(results, [[{'frame_id': 9}]])
+        self.assertIs(self.remote._rings[(8, 8, 3)], tile_ring)
+        self.assertEqual(len(self.server._rings), 2)
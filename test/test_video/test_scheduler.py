@@ -0,0 +1,80 @@
+"""
+类级注释：检测调度器单元测试
+使用模拟时间驱动调度器，验证目标帧率、自适应降频与过期帧丢弃
+"""
+from unittest import TestCase
+
+from core.video.scheduler import DetectionScheduler
+
+
+def _feed(scheduler: DetectionScheduler, source_fps: float, seconds: float, cost: float) -> int:
+    """
+    函数级注释：按固定视频源帧率喂帧，被选中的帧按给定耗时记录
+    :return: 被检测的帧数
+    """
+    analyzed = 0
+    busy_until = 0.0
+    frames = int(source_fps * seconds)
+    for seq in range(1, frames + 1):
+        t = seq / source_fps
+        if t < busy_until:
+            continue
+        if scheduler.should_analyze(seq, t, now=t):
+            analyzed += 1
+            scheduler.record(cost, now=t + cost)
+            busy_until = t + cost
+    return analyzed
+
+
+class TestDetectionScheduler(TestCase):
+    """
+    类级注释：测试检测调度策略
+    """
+
+    def test_fallback_interval_matches_legacy_cadence(self):
+        """
+        函数级注释：测试未设置目标帧率时按 detection_interval 跳帧
+        """
+        scheduler = DetectionScheduler(target_fps=0, latency_slo=0, fallback_interval=4)
+        picked = [seq for seq in range(1, 21) if scheduler.should_analyze(seq, seq / 25.0, now=seq / 25.0)]
+        self.assertEqual(picked, [4, 8, 12, 16, 20])
+        self.assertEqual(scheduler.decode_every, 4)
+
+    def test_sparse_source_analyzes_every_delivered_frame(self):
+        """
+        函数级注释：测试稀疏解码（只交付关键帧）时不再按 detection_interval 二次跳帧
+        """
+        scheduler = DetectionScheduler(target_fps=0, latency_slo=0, fallback_interval=4)
+        scheduler.sparse_source = True
+        picked = [seq for seq in range(1, 6) if scheduler.should_analyze(seq, seq * 2.0, now=seq * 2.0)]
+        self.assertEqual(picked, [1, 2, 3, 4, 5])
+        self.assertEqual(scheduler.decode_every, 1)
+
+    def test_target_rate_independent_of_source_fps(self):
+        """
+        函数级注释：测试不同帧率的摄像头得到相同的分析帧率
+        """
+        for source_fps in (25.0, 10.0):
+            scheduler = DetectionScheduler(target_fps=5.0, latency_slo=0)
+            analyzed = _feed(scheduler, source_fps, seconds=10.0, cost=0.01)
+            self.assertAlmostEqual(analyzed / 10.0, 5.0, delta=0.3)
+            self.assertAlmostEqual(scheduler.achieved_fps, 5.0, delta=0.3)
+
+    def test_rate_adapts_to_measured_cost(self):
+        """
+        函数级注释：测试检测耗时超过目标周期时自动降低有效帧率并增大跳帧比例
+        """
+        scheduler = DetectionScheduler(target_fps=10.0, latency_slo=0)
+        _feed(scheduler, 25.0, seconds=10.0, cost=0.3)
+        self.assertAlmostEqual(scheduler.effective_fps, 3.0, delta=0.1)
+        self.assertEqual(scheduler.decode_every, 8)
+
+    def test_stale_frames_are_dropped(self):
+        """
+        函数级注释：测试超过延迟 SLO 的过期帧被丢弃并计数
+        """
+        scheduler = DetectionScheduler(target_fps=5.0, latency_slo=0.5)
+        self.assertFalse(scheduler.should_analyze(1, 0.0, now=2.0))
+        self.assertEqual(scheduler.dropped_stale, 1)
+        self.assertTrue(scheduler.should_analyze(2, 2.0, now=2.1))
+        self.assertEqual(scheduler.stats()["dropped_stale"], 1)
@@ -0,0 +1,48 @@
+"""
+类级注释：共享内存帧环形缓冲单元测试
+"""
+from unittest import TestCase
+
+import numpy as np
+
+from core.video.shm_ring import SharedFrameRing
+
+
+class TestSharedFrameRing(TestCase):
+    """
+    类级注释：测试环形缓冲的写入、挂载与槽位轮转
+    """
+
+    def setUp(self):
+        """
+        函数级注释：创建 3 槽位的环形缓冲
+        """
+        self.ring = SharedFrameRing.create((4, 6, 3), slots=3)
+        self.addCleanup(self.ring.close)
+
+    def test_attached_ring_sees_written_frame(self):
+        """
+        函数级注释：测试挂载方能零拷贝读到写入方写入的帧
+        """
+        reader = SharedFrameRing.attach(self.ring.name, self.ring.shape, self.ring.slots)
+        self.addCleanup(reader.close)
+
+        frame = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+        slot = self.ring.write(frame)
+
+        np.testing.assert_array_equal(reader.view(slot), frame)
+
+    def test_slots_rotate(self):
+        """
+        函数级注释：测试写入槽位循环使用
+        """
+        frame = np.zeros((4, 6, 3), dtype=np.uint8)
+        slots = [self.ring.write(frame) for _ in range(4)]
+        self.assertEqual(slots, [0, 1, 2, 0])
+
+    def test_shape_mismatch_raises(self):
+        """
+        函数级注释：测试帧形状不一致时拒绝写入
+        """
+        with self.assertRaises(ValueError):
+            self.ring.write(np.zeros((5, 6, 3), dtype=np.uint8))
@@ -0,0 +1,81 @@
+"""
+类级注释：视频源解析器单元测试
+使用假的 ONVIF 查询函数验证解析优先级与地址缓存
+"""
+import pickle
+from unittest import TestCase
+
+from core.video.source_resolver import VideoSourceResolver
+
+
+class _FakeOnvif:
+    """
+    类级注释：记录调用次数的假 ONVIF 查询
+    """
+
+    def __init__(self, uris):
+        self.uris = list(uris)
+        self.calls = 0
+
+    def __call__(self, ip, port, username, password):
+        self.calls += 1
+        uri = self.uris.pop(0)
+        if isinstance(uri, Exception):
+            raise uri
+        return uri
+
+
+class TestVideoSourceResolver(TestCase):
+    """
+    类级注释：测试视频源解析与缓存
+    """
+
+    def _config(self, **kwargs):
+        """
+        函数级注释：构造基础视频流配置
+        """
+        config = {'rtsp_url': None, 'onvif_use': True, 'onvif_ip': '10.0.0.2', 'onvif_port': 80,
+                  'onvif_username': 'admin', 'onvif_password': 'pw', 'camera_index': 0}
+        config.update(kwargs)
+        return config
+
+    def test_explicit_rtsp_wins(self):
+        """
+        函数级注释：测试显式 RTSP 地址优先且不触发 ONVIF 查询
+        """
+        onvif = _FakeOnvif([])
+        resolver = VideoSourceResolver(self._config(rtsp_url="rtsp://cam/1"), onvif_resolver=onvif)
+        self.assertEqual(resolver.resolve(), "rtsp://cam/1")
+        self.assertFalse(resolver.can_refresh)
+        self.assertEqual(onvif.calls, 0)
+
+    def test_onvif_uri_is_cached_until_refresh(self):
+        """
+        函数级注释：测试 ONVIF 地址被缓存，只有 refresh 时才重新查询
+        """
+        onvif = _FakeOnvif(["rtsp://cam/a", "rtsp://cam/b"])
+        resolver = VideoSourceResolver(self._config(), onvif_resolver=onvif)
+        self.assertEqual(resolver.resolve(), "rtsp://cam/a")
+        self.assertEqual(resolver.resolve(), "rtsp://cam/a")
+        self.assertEqual(onvif.calls, 1)
+        self.assertEqual(resolver.resolve(refresh=True), "rtsp://cam/b")
+        self.assertEqual(onvif.calls, 2)
+
+    def test_failed_refresh_keeps_cached_uri(self):
+        """
+        函数级注释：测试重新查询失败时保留缓存地址，首次查询失败时回退本地摄像头
+        """
+        onvif = _FakeOnvif([RuntimeError("timeout"), "rtsp://cam/a", RuntimeError("timeout")])
+        resolver = VideoSourceResolver(self._config(camera_index=2), onvif_resolver=onvif)
+        self.assertEqual(resolver.resolve(), 2)
+        self.assertEqual(resolver.resolve(refresh=True), "rtsp://cam/a")
+        self.assertEqual(resolver.resolve(refresh=True), "rtsp://cam/a")
+
+    def test_resolver_is_picklable(self):
+        """
+        函数级注释：测试解析器可传给 spawn 启动的工作进程
+        """
+        resolver = VideoSourceResolver(self._config(rtsp_url="rtsp://cam/1"))
+        resolver.resolve()
+        clone = pickle.loads(pickle.dumps(resolver))
+        self.assertEqual(clone.resolve(), "rtsp://cam/1")
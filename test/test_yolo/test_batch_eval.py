@@ -0,0 +1,71 @@
+"""
+类级注释：离线批量评估单元测试
+使用不产生检测结果的占位模型运行完整流水线，验证 JSONL 输出与汇总
+"""
+import os
+import json
+import shutil
+import tempfile
+from unittest import TestCase
+
+from core.yolo.batch_eval import discover_videos, evaluate_video, output_path_for
+from core.yolo.detector import Detector
+from helpers import FakeModel, write_test_video
+
+
+class TestBatchEval(TestCase):
+    """
+    类级注释：测试离线批量评估
+    """
+
+    def setUp(self):
+        """
+        函数级注释：测试前生成视频目录
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.video_dir = os.path.join(self.temp_dir, "videos")
+        os.makedirs(os.path.join(self.video_dir, "gate"))
+        self.video_path = os.path.join(self.video_dir, "gate", "cam1.avi")
+        write_test_video(self.video_path)
+        with open(os.path.join(self.video_dir, "notes.txt"), "w") as f:
+            f.write("not a video")
+
+    def test_discover_videos_recurses_and_filters(self):
+        """
+        函数级注释：测试递归查找视频并忽略非视频文件
+        """
+        self.assertEqual(discover_videos(self.video_dir), [self.video_path])
+        self.assertEqual(discover_videos(self.video_dir, recursive=False), [])
+
+    def test_evaluate_video_writes_per_frame_jsonl(self):
+        """
+        函数级注释：测试按 stride 逐帧写出检测结果与阶段耗时
+        """
+        output_dir = os.path.join(self.temp_dir, "out")
+        output_path = output_path_for(self.video_path, self.video_dir, output_dir)
+        self.assertEqual(output_path, os.path.join(output_dir, "gate", "cam1.jsonl"))
+
+        detector = Detector(weights_path="unused.pt", model=FakeModel())
+        summary = evaluate_video(detector, self.video_path, output_path, stride=3)
+
+        with open(output_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["frame"] for r in records], [0, 3, 6, 9])
+        self.assertEqual(records[1]["time_s"], 0.12)
+        self.assertEqual(records[0]["detections"], [])
+        self.assertEqual(records[0]["max_warning_level"], 0)
+        self.assertEqual(set(records[0]["timings_ms"]), {"preprocess_ms", "infer_ms", "postprocess_ms", "total_ms"})
+
+        self.assertEqual(summary["frames"], 10)
+        self.assertEqual(summary["analyzed"], 4)
+        self.assertIsNone(summary["first_l3_time_s"])
+
+    def test_evaluate_missing_video_reports_error(self):
+        """
+        函数级注释：测试无法打开的视频返回错误而不是抛出异常
+        """
+        detector = Detector(weights_path="unused.pt", model=FakeModel())
+        summary = evaluate_video(detector, os.path.join(self.temp_dir, "missing.avi"),
+                                 os.path.join(self.temp_dir, "missing.jsonl"))
+        self.assertIn("error", summary)
@@ -0,0 +1,118 @@
+"""
+类级注释：动态微批推理单元测试
+"""
+import time
+import threading
+from unittest import TestCase
+
+import numpy as np
+
+from core.yolo.batcher import Histogram, InferenceBatcher, _InferenceRequest
+from helpers import FakeBatchDetector
+
+
+class TestHistogram(TestCase):
+    """
+    类级注释：测试固定分桶直方图
+    """
+
+    def test_values_fall_into_upper_bound_buckets(self):
+        """
+        函数级注释：测试观测值计入第一个不小于它的桶，超出上界计入溢出桶
+        """
+        hist = Histogram([1, 5, 10])
+        for value in (0.5, 1, 3, 10, 50):
+            hist.observe(value)
+
+        self.assertEqual(hist.snapshot(), {"<=1": 2, "<=5": 1, "<=10": 1, ">10": 1})
+        self.assertAlmostEqual(hist.mean, 12.9)
+
+
+class TestInferenceBatcher(TestCase):
+    """
+    类级注释：测试跨视频流凑批与结果分发
+    """
+
+    def _submit_concurrently(self, batcher, count, imgsz=640):
+        """
+        函数级注释：模拟多路视频流线程同时提交推理请求
+        """
+        results = [None] * count
+
+        def worker(i):
+            results[i] = batcher.infer(np.full((8, 8, 3), i, dtype=np.uint8), imgsz)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5.0)
+        return results
+
+    def test_concurrent_requests_share_one_forward_pass(self):
+        """
+        函数级注释：测试同时到达的请求合并为一次批量推理，且结果回到各自的提交者
+        """
+        detector = FakeBatchDetector()
+        batcher = InferenceBatcher(detector, max_batch=4, max_wait_ms=500)
+        batcher.start()
+        try:
+            results = self._submit_concurrently(batcher, 4)
+        finally:
+            batcher.stop()
+
+        self.assertEqual(detector.calls, [(4, 640)])
+        self.assertEqual([r[0]['frame_id'] for r in results], [0, 1, 2, 3])
+        self.assertEqual(batcher.stats()["batch_size_hist"]["<=4"], 1)
+
+    def test_infer_many_submits_frames_into_one_batch(self):
+        """
+        函数级注释：测试一次提交的多帧（同一帧的多个切片）进入同一批，结果按提交顺序返回
+        """
+        detector = FakeBatchDetector()
+        batcher = InferenceBatcher(detector, max_batch=4, max_wait_ms=500)
+        batcher.start()
+        try:
+            start = time.time()
+            results = batcher.infer_many([np.full((8, 8, 3), i, dtype=np.uint8) for i in range(3)], 640)
+            elapsed = time.time() - start
+        finally:
+            batcher.stop()
+
+        self.assertEqual(detector.calls, [(3, 640)])
+        self.assertEqual([r[0]['frame_id'] for r in results], [0, 1, 2])
+        self.assertLess(elapsed, 1.0)
+
+    def test_partial_batch_flushes_after_max_wait(self):
+        """
+        函数级注释：测试凑不满一批时等待 max_wait_ms 后照常推理
+        """
+        detector = FakeBatchDetector()
+        batcher = InferenceBatcher(detector, max_batch=8, max_wait_ms=20)
+        batcher.start()
+        try:
+            start = time.time()
+            result = batcher.infer(np.full((8, 8, 3), 7, dtype=np.uint8), 640)
+            elapsed = time.time() - start
+        finally:
+            batcher.stop()
+
+        self.assertEqual(result, [{'frame_id': 7}])
+        self.assertEqual(detector.calls, [(1, 640)])
+        self.assertLess(elapsed, 1.0)
+        self.assertGreaterEqual(batcher.queue_wait_hist.mean, 10.0)
+
+    def test_requests_are_grouped_by_imgsz(self):
+        """
+        函数级注释：测试推理尺寸不同的请求分组执行
+        """
+        detector = FakeBatchDetector()
+        batcher = InferenceBatcher(detector, max_batch=4)
+        requests = [_InferenceRequest(np.full((8, 8, 3), i, dtype=np.uint8), imgsz)
+                    for i, imgsz in enumerate((640, 320, 640))]
+
+        batcher.run_batch(requests)
+
+        self.assertEqual(sorted(detector.calls), [(1, 320), (2, 640)])
+        self.assertTrue(all(request.done.is_set() for request in requests))
+        self.assertEqual(requests[2].result, [{'frame_id': 2}])
@@ -0,0 +1,114 @@
+"""
+类级注释：颜色类别查找表单元测试
+"""
+from types import SimpleNamespace
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from core.yolo import color_lut
+from core.yolo.detections import DetectionBatch
+from core.yolo.detector import Detector
+from core.yolo.roi_features import RoiFeatures
+
+FIRE_RANGES = color_lut.normalize_ranges((((0, 50, 50), (15, 255, 255)), ((165, 50, 50), (180, 255, 255)),
+                                          ((10, 50, 50), (40, 255, 255))))
+
+
+def _fire_scene(seed=0):
+    """
+    函数级注释：暗背景上带火舌的橙黄色火焰区域与一块肤色区域
+    """
+    rng = np.random.default_rng(seed)
+    frame = np.full((240, 320, 3), 30, dtype=np.uint8)
+    flame = np.zeros((240, 320), dtype=np.uint8)
+    cv2.ellipse(flame, (160, 150), (50, 50), 0, 0, 360, 255, -1)
+    for x in range(115, 210, 15):
+        tip = (x + int(rng.integers(-10, 10)), int(rng.integers(30, 90)))
+        cv2.fillPoly(flame, [np.array([(x - 8, 150), (x + 8, 150), tip])], 255)
+    colors = cv2.GaussianBlur(rng.integers(0, 256, (240, 320, 3), dtype=np.uint8), (0, 0), 4)
+    colors = cv2.normalize(colors, None, 0, 255, cv2.NORM_MINMAX)
+    colors[:, :, 0] //= 4
+    colors[:, :, 2] = np.maximum(colors[:, :, 2], 200)
+    frame[flame > 0] = colors[flame > 0]
+    frame[20:60, 20:60] = (120, 150, 200)
+    return frame
+
+
+class TestColorLut(TestCase):
+    """
+    类级注释：测试查找表与逐像素颜色转换的一致性
+    """
+
+    def test_lut_matches_in_range(self):
+        """
+        函数级注释：测试各颜色类别的查表掩码与按颜色空间转换 + inRange 计算的掩码完全一致
+        """
+        lut = color_lut.build_color_lut(FIRE_RANGES)
+        classes = color_lut.color_classes(FIRE_RANGES)
+        frame = np.random.default_rng(1).integers(0, 256, (200, 300, 3), dtype=np.uint8)
+        box = (13, 7, 251, 190)
+        with_lut = RoiFeatures(frame, frame, box, classes, lut)
+        without_lut = RoiFeatures(frame, frame, box, classes)
+
+        self.assertEqual(lut.shape, (1 << 24,))
+        for flag in classes:
+            expected = without_lut.color_mask(flag)
+            self.assertGreater(cv2.countNonZero(expected), 0, flag)
+            np.testing.assert_array_equal(with_lut.color_mask(flag), expected, err_msg=str(flag))
+            self.assertEqual(with_lut.color_ratio(flag), without_lut.color_ratio(flag))
+
+    def test_validation_unchanged_with_lut(self):
+        """
+        函数级注释：测试开启查找表后火焰多模态校验的结果与写回的指标不变
+        """
+        frame = _fire_scene()
+        enhanced = cv2.convertScaleAbs(frame, alpha=1.1, beta=5)
+        fg_mask = np.full(frame.shape[:2], 255, dtype=np.uint8)
+        # 依次为：直线过多被拒绝、肤色被拒绝、通过校验
+        boxes = [(100, 20, 220, 210), (15, 15, 65, 65), (100, 100, 300, 230)]
+        detector = Detector(weights_path="unused.pt", model=object())
+        detector.config_loader = None
+        outcomes = []
+        for enabled in (False, True):
+            detector.color_lut_enabled = enabled
+            detector._sync_color_classes()
+            batch = DetectionBatch.from_arrays(np.array(boxes, dtype=np.float32), np.full(len(boxes), 0.9),
+                                               np.zeros(len(boxes)), {0: "fire"})
+            results = [detector._validate_fire(frame, enhanced, fg_mask, batch[i]) for i in range(len(batch))]
+            outcomes.append((results, batch.to_dicts()))
+
+        self.assertIsNotNone(detector._color_lut)
+        self.assertEqual(outcomes[0][0], [False, False, True])
+        self.assertEqual(outcomes[0], outcomes[1])
+
+
+class TestDetectorColorLutConfig(TestCase):
+    """
+    类级注释：测试查找表按热配置开启并只在阈值变化时重建
+    """
+
+    def test_lut_shared_and_rebuilt_on_threshold_change(self):
+        """
+        函数级注释：测试派生检测器共享查找表，阈值变化后重建，关闭后释放引用
+        """
+        detector = Detector(weights_path="unused.pt", model=object())
+        config = {"color_lut_enabled": True}
+        detector.config_loader = SimpleNamespace(get_config=lambda key, default: config.get(key, default))
+        detector._refresh_runtime_config(force=True)
+        lut = detector._color_lut
+        child = detector.spawn()
+        child.config_loader = detector.config_loader
+        child._refresh_runtime_config(force=True)
+
+        self.assertIsNotNone(lut)
+        self.assertIs(child._color_lut, lut)
+
+        detector.fire_color_high3 = np.array([35, 255, 255])
+        detector._refresh_runtime_config(force=True)
+        self.assertIsNot(detector._color_lut, lut)
+
+        config["color_lut_enabled"] = False
+        detector._refresh_runtime_config()
+        self.assertIsNone(detector._color_lut)
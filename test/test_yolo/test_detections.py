@@ -0,0 +1,68 @@
+"""
+类级注释：检测结果批单元测试
+"""
+import pickle
+from unittest import TestCase
+
+import numpy as np
+
+from core.yolo.detections import DetectionBatch
+
+
+class TestDetectionBatch(TestCase):
+    """
+    类级注释：测试结构化数组检测批的构造、字段写回与对外字典格式
+    """
+
+    def setUp(self):
+        """
+        函数级注释：构造两个检测框（火焰与烟雾）
+        """
+        xyxy = np.array([[10.7, 20.2, 50.9, 60.5], [0.0, 0.0, 8.0, 8.0]], dtype=np.float32)
+        conf = np.array([0.9, 0.4], dtype=np.float32)
+        self.batch = DetectionBatch.from_arrays(xyxy, conf, np.array([0, 1]), {0: "fire", 1: "smoke"})
+
+    def test_to_dicts_matches_per_box_format(self):
+        """
+        函数级注释：测试坐标按 int() 截断、置信度与逐框 float() 转换一致，未设置的可选字段不输出
+        """
+        detections = self.batch.to_dicts()
+
+        self.assertEqual(detections[0], {
+            "xmin": 10, "ymin": 20, "xmax": 50, "ymax": 60,
+            "conf": float(np.float32(0.9)), "cls_id": 0, "cls_name": "fire",
+        })
+        self.assertEqual(detections[1]["cls_name"], "smoke")
+
+    def test_record_writes_flow_into_dicts(self):
+        """
+        函数级注释：测试整数下标得到的记录视图写回数组，追踪与校验字段出现在对外字典中
+        """
+        det = self.batch[0]
+        det["validated"] = True
+        det["box_area"] = 1600
+        det["suspected"] = True
+        det["low_jitter"] = True
+        det["warning_level"] = 2
+        det["track_frames"] = 5
+        det["track_jitter"] = 0.123456
+
+        result = self.batch.to_dicts()[0]
+
+        self.assertEqual(result["cls_name"], "suspected_fire")
+        self.assertEqual(result["_box_area"], 1600)
+        self.assertEqual(result["hold_reason"], "low_jitter")
+        self.assertEqual((result["warning_level"], result["track_frames"], result["track_jitter"]), (2, 5, 0.1235))
+
+    def test_mask_shift_concat_and_pickle(self):
+        """
+        函数级注释：测试布尔掩码筛选、原地平移、拼接以及经管道传输的序列化
+        """
+        fire = self.batch[self.batch.data["cls_id"] == 0].copy().shift(100, 50)
+        merged = DetectionBatch.concat([self.batch, fire])
+        restored = pickle.loads(pickle.dumps(merged))
+
+        self.assertEqual(self.batch.boxes[0].tolist(), [10, 20, 50, 60])
+        self.assertEqual(merged.boxes[2].tolist(), [110, 70, 150, 110])
+        self.assertEqual(restored.to_dicts(), merged.to_dicts())
+        self.assertEqual(len(DetectionBatch.concat([])), 0)
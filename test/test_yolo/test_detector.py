@@ -0,0 +1,258 @@
+"""
+类级注释：Detector 单元测试
+使用占位模型对象构造检测器，不依赖权重文件
+"""
+from types import SimpleNamespace
+from unittest import TestCase
+
+import numpy as np
+
+from core.yolo.detections import DetectionBatch
+from core.yolo.detector import Detector
+from helpers import FakeModel
+
+
+class TestDetectorSpawn(TestCase):
+    """
+    类级注释：测试多路视频流共享模型的检测器派生
+    """
+
+    def test_spawn_shares_model_but_not_stream_state(self):
+        """
+        函数级注释：测试派生检测器共享模型与推理锁，背景建模与追踪器状态独立
+        """
+        shared_model = object()
+        base = Detector(weights_path="unused.pt", conf=0.5, model=shared_model)
+        base.tracked_targets[0] = {'centroid': (0, 0)}
+        base.next_track_id = 1
+
+        child = base.spawn()
+
+        self.assertIs(child.model, shared_model)
+        self.assertIs(child._model_lock, base._model_lock)
+        self.assertIsNot(child.motion_estimator, base.motion_estimator)
+        self.assertEqual(child.tracked_targets, {})
+        self.assertEqual(child.next_track_id, 0)
+
+
+class TestMotionGate(TestCase):
+    """
+    类级注释：测试静止画面跳过推理的运动门控
+    """
+
+    def setUp(self):
+        """
+        函数级注释：构造开启运动门控的检测器
+        """
+        self.model = FakeModel()
+        self.detector = Detector(weights_path="unused.pt", model=self.model)
+        self.detector.config_loader = None
+        self.detector.motion_gate_enabled = True
+        self.detector.motion_gate_min_ratio = 0.01
+        self.detector.motion_gate_force_interval = 60.0
+        self.static = np.full((96, 128, 3), 100, dtype=np.uint8)
+
+    def test_static_scene_skips_inference(self):
+        """
+        函数级注释：测试静止画面只在首帧推理，之后跳过
+        """
+        for _ in range(5):
+            self.detector.detect_frame(self.static, draw=False)
+        self.assertEqual(len(self.model.calls), 1)
+        self.assertEqual(self.detector.inference_skipped, 4)
+        self.assertTrue(self.detector.last_gated)
+        self.assertEqual(self.detector.last_timings["infer_ms"], 0.0)
+
+    def test_motion_tracks_and_safety_net_force_inference(self):
+        """
+        函数级注释：测试画面变化、存在追踪目标或超过强制间隔时仍然推理
+        """
+        self.detector.detect_frame(self.static, draw=False)
+        self.detector.detect_frame(self.static, draw=False)
+        self.assertEqual(len(self.model.calls), 1)
+
+        moving = self.static.copy()
+        moving[20:70, 30:90] = 250
+        self.detector.detect_frame(moving, draw=False)
+        self.assertEqual(len(self.model.calls), 2)
+
+        self.detector.tracked_targets[0] = {'centroid': (0, 0), 'frames': 1, 'misses': 0}
+        self.detector.detect_frame(self.static, draw=False)
+        self.assertEqual(len(self.model.calls), 3)
+        self.detector.tracked_targets.clear()
+
+        self.detector._last_full_inference -= 61.0
+        self.detector.detect_frame(self.static, draw=False)
+        self.assertEqual(len(self.model.calls), 4)
+
+    def test_force_interval_follows_frame_time(self):
+        """
+        函数级注释：测试传入帧时间戳时，强制推理间隔按帧时间计算
+        """
+        for frame_time in (0.0, 30.0, 59.0, 61.0, 62.0):
+            self.detector.detect_frame(self.static, draw=False, frame_time=frame_time)
+        self.assertEqual(len(self.model.calls), 2)
+        self.assertEqual(self.detector._last_full_inference, 61.0)
+
+    def test_gate_disabled_by_default(self):
+        """
+        函数级注释：测试默认关闭运动门控时每帧都推理
+        """
+        detector = Detector(weights_path="unused.pt", model=self.model)
+        detector.config_loader = None
+        for _ in range(3):
+            detector.detect_frame(self.static, draw=False)
+        self.assertEqual(len(self.model.calls), 3)
+
+
+class TestWarmup(TestCase):
+    """
+    类级注释：测试启动时的模型预热
+    """
+
+    def test_warmup_runs_at_configured_imgsz(self):
+        """
+        函数级注释：测试按推理尺寸执行指定次数的空白帧推理，开启分辨率级联时同时预热空闲尺寸
+        """
+        model = FakeModel()
+        detector = Detector(weights_path="unused.pt", model=model, imgsz=640)
+        detector.config_loader = None
+        detector.cascade_enabled = True
+
+        detector.warmup(runs=2)
+
+        self.assertEqual(model.imgsz, [640, 640, 320, 320])
+        self.assertEqual(Detector(weights_path="unused.pt", load_model=False).warmup(runs=2), 0.0)
+
+
+class TestResolutionCascade(TestCase):
+    """
+    类级注释：测试空闲低分辨率、出现候选目标后升级的分辨率级联
+    """
+
+    def setUp(self):
+        """
+        函数级注释：构造开启分辨率级联的检测器
+        """
+        self.model = FakeModel()
+        self.detector = Detector(weights_path="unused.pt", model=self.model, imgsz=640)
+        self.detector.config_loader = None
+        self.detector.cascade_enabled = True
+        self.detector.cascade_idle_imgsz = 320
+        self.detector.cascade_hold_seconds = 5.0
+        self.frame = np.full((96, 128, 3), 100, dtype=np.uint8)
+
+    def test_candidate_escalates_until_quiet_period(self):
+        """
+        函数级注释：测试空闲时低分辨率推理，出现候选目标后升级，目标消失并安静超过保持时间后回落
+        """
+        self.detector.detect_frame(self.frame, draw=False)
+        self.detector._update_tracker(DetectionBatch.from_dicts([{'xmin': 10, 'ymin': 10, 'xmax': 50, 'ymax': 50}]))
+        self.detector.detect_frame(self.frame, draw=False)
+        self.assertEqual(self.model.imgsz, [320, 640])
+
+        self.detector.tracked_targets.clear()
+        self.detector.detect_frame(self.frame, draw=False)
+        self.detector._last_candidate_time -= 6.0
+        self.detector.detect_frame(self.frame, draw=False)
+
+        self.assertEqual(self.model.imgsz, [320, 640, 640, 320])
+        self.assertEqual(self.detector.cascade_escalations, 1)
+
+    def test_static_test_and_disabled_use_full_imgsz(self):
+        """
+        函数级注释：测试静态图片测试与关闭级联时始终使用完整推理尺寸
+        """
+        self.detector.detect_frame(self.frame, draw=False, is_static_test=True)
+        self.detector.cascade_enabled = False
+        self.detector.detect_frame(self.frame, draw=False)
+
+        self.assertEqual(self.model.imgsz, [640, 640])
+
+    def test_hold_period_follows_frame_time(self):
+        """
+        函数级注释：测试传入帧时间戳时，候选目标时间与保持时间按帧时间计算
+        """
+        batch = DetectionBatch.from_dicts([{'xmin': 10, 'ymin': 10, 'xmax': 50, 'ymax': 50}])
+        self.detector._update_tracker(batch, now=100.0)
+        self.detector.tracked_targets.clear()
+        self.assertEqual(self.detector._last_candidate_time, 100.0)
+
+        for frame_time in (104.0, 105.0):
+            self.detector.detect_frame(self.frame, draw=False, frame_time=frame_time)
+        self.assertEqual(self.model.imgsz, [640, 320])
+
+
+class TestFrameCache(TestCase):
+    """
+    类级注释：测试近重复帧复用上次推理结果
+    """
+
+    def setUp(self):
+        """
+        函数级注释：构造开启近重复帧缓存的检测器，多模态校验直接通过
+        """
+        self.model = FakeModel([[20, 20, 60, 60]])
+        self.detector = Detector(weights_path="unused.pt", model=self.model)
+        self.detector.config_loader = None
+        self.detector.frame_cache_enabled = True
+        self.detector.frame_cache_tolerance = 3.0
+        self.detector.frame_cache_max_age = 2.0
+        self.detector._validate_fire = lambda *args, **kwargs: True
+        self.frame = np.full((96, 128, 3), 100, dtype=np.uint8)
+
+    def test_near_duplicate_frames_reuse_result_and_advance_tracker(self):
+        """
+        函数级注释：测试近重复帧不再推理，但追踪器照常累计帧数
+        """
+        for _ in range(3):
+            _, detections = self.detector.detect_frame(self.frame, draw=False)
+
+        self.assertEqual(len(self.model.calls), 1)
+        self.assertTrue(self.detector.last_cache_hit)
+        self.assertEqual(detections[0]['track_frames'], 3)
+        self.assertEqual(detections[0]['cls_name'], 'suspected_fire')
+        self.assertEqual(self.detector.frame_cache_stats(), {"lookups": 3, "hits": 2, "hit_rate": 0.667})
+
+    def test_local_change_and_max_age_invalidate_cache(self):
+        """
+        函数级注释：测试局部画面变化或缓存超龄时重新推理
+        """
+        self.detector.detect_frame(self.frame, draw=False)
+        changed = self.frame.copy()
+        changed[40:50, 60:70] = 255
+        self.detector.detect_frame(changed, draw=False)
+        self.assertEqual(len(self.model.calls), 2)
+
+        self.detector._cache_time -= 3.0
+        self.detector.detect_frame(changed, draw=False)
+        self.assertEqual(len(self.model.calls), 3)
+        self.assertFalse(self.detector.last_cache_hit)
+
+    def test_max_age_follows_frame_time(self):
+        """
+        函数级注释：测试传入帧时间戳（离线评估的视频时间）时，缓存有效期按帧时间而不是墙钟时间计算
+        """
+        for frame_time in (100.0, 101.0, 102.0):
+            self.detector.detect_frame(self.frame, draw=False, frame_time=frame_time)
+        self.assertEqual(len(self.model.calls), 1)
+
+        self.detector.detect_frame(self.frame, draw=False, frame_time=102.5)
+        self.assertEqual(len(self.model.calls), 2)
+        self.assertFalse(self.detector.last_cache_hit)
+        self.assertEqual(self.detector._cache_time, 102.5)
+
+    def test_config_change_invalidates_cache(self):
+        """
+        函数级注释：测试热配置变化后丢弃缓存的校验结果，下一帧重新推理
+        """
+        config = {}
+        self.detector.config_loader = SimpleNamespace(get_config=lambda key, default: config.get(key, default))
+        self.detector.detect_frame(self.frame, draw=False)
+        self.detector.detect_frame(self.frame, draw=False)
+        self.assertEqual(len(self.model.calls), 1)
+
+        config["yolo_confidence"] = 0.6
+        self.detector.detect_frame(self.frame, draw=False)
+        self.assertEqual(len(self.model.calls), 2)
+        self.assertFalse(self.detector.last_cache_hit)
@@ -0,0 +1,93 @@
+"""
+类级注释：光照补偿单元测试
+"""
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from core.yolo.detector import Detector
+from core.yolo.enhance import ClaheEnhancer, LazyEnhancedFrame
+from helpers import FakeModel
+
+
+def _frame(height, width, seed=0):
+    """
+    函数级注释：带明暗变化的平滑随机画面
+    """
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (0, 0), 2)
+
+
+class TestRegionEnhancement(TestCase):
+    """
+    类级注释：测试区域补偿与整帧补偿后裁剪的一致性
+    """
+
+    def test_region_matches_full_frame(self):
+        """
+        函数级注释：测试画面内部、贴边与分块数不能整除的画面上，区域补偿与整帧补偿最多相差 1 个灰度级
+        """
+        enhancer = ClaheEnhancer()
+        for shape in ((240, 320), (250, 333)):
+            frame = _frame(*shape)
+            full = enhancer.enhance(frame)
+            h, w = shape
+            for box in ((40, 30, 120, 90), (0, 0, 50, 40), (w - 60, h - 45, w, h), (0, 0, w, h)):
+                xmin, ymin, xmax, ymax = box
+                region = enhancer.enhance_region(frame, box)
+                expected = full[ymin:ymax, xmin:xmax]
+                diff = np.abs(region.astype(np.int16) - expected.astype(np.int16))
+
+                self.assertEqual(region.shape, expected.shape, (shape, box))
+                self.assertLessEqual(int(diff.max()), 1, (shape, box))
+
+    def test_lazy_frame_slices_like_array(self):
+        """
+        函数级注释：测试惰性增强帧支持与 ndarray 相同的切片写法，越界切片被截断到画面内
+        """
+        frame = _frame(120, 160)
+        lazy = LazyEnhancedFrame(frame, ClaheEnhancer())
+        region = lazy[100:200, 150:170]
+
+        self.assertEqual(lazy.shape, frame.shape)
+        self.assertEqual(region.shape, (20, 10, 3))
+
+
+class TestInferenceSizeEnhancement(TestCase):
+    """
+    类级注释：测试按推理尺寸补偿与检测框换算
+    """
+
+    def test_resizes_long_side_to_imgsz(self):
+        """
+        函数级注释：测试长边缩小到推理尺寸并给出换算系数，小于推理尺寸的画面不缩放
+        """
+        enhancer = ClaheEnhancer()
+        small, scale = enhancer.enhance_for_inference(_frame(360, 640), 320)
+        same, unit = enhancer.enhance_for_inference(_frame(120, 160), 320)
+
+        self.assertEqual(small.shape, (180, 320, 3))
+        self.assertEqual(scale, (2.0, 2.0))
+        self.assertEqual(same.shape, (120, 160, 3))
+        self.assertEqual(unit, (1.0, 1.0))
+
+    def test_detector_scales_boxes_back(self):
+        """
+        函数级注释：测试开启后模型收到缩小的画面，检测框换算回原画面，多模态校验拿到按需补偿的增强帧
+        """
+        model = FakeModel([[20, 20, 60, 60]])
+        detector = Detector(weights_path="unused.pt", model=model)
+        detector.config_loader = None
+        detector.enhance_at_inference_size = True
+        detector.imgsz = 320
+        seen = []
+        detector._validate_fire = lambda frame, enhanced_frame, *args, **kwargs: seen.append(enhanced_frame) or True
+
+        _, detections = detector.detect_frame(_frame(360, 640), draw=False)
+
+        self.assertEqual(model.calls, [((180, 320, 3), 320)])
+        self.assertEqual((detections[0]['xmin'], detections[0]['ymin'],
+                          detections[0]['xmax'], detections[0]['ymax']), (40, 40, 120, 120))
+        self.assertIsInstance(seen[0], LazyEnhancedFrame)
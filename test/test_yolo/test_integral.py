@@ -0,0 +1,97 @@
+"""
+类级注释：积分图区域统计单元测试
+"""
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from core.yolo import color_lut
+from core.yolo.detections import DetectionBatch
+from core.yolo.detector import Detector
+from core.yolo.integral import IntegralStats
+from core.yolo.motion import foreground_ratio
+from .test_color_lut import _fire_scene
+
+
+class TestIntegralStats(TestCase):
+    """
+    类级注释：测试积分图计数与逐框统计一致
+    """
+
+    def test_counts_match_count_non_zero(self):
+        """
+        函数级注释：测试区域内任意检测框的计数与 countNonZero 一致，缩小的前景掩码与 foreground_ratio 一致
+        """
+        rng = np.random.default_rng(0)
+        mask = (rng.random((240, 320)) > 0.7).astype(np.uint8) * 255
+        fg_mask = cv2.resize(mask, (80, 60), interpolation=cv2.INTER_NEAREST)
+        region = (30, 20, 300, 230)
+        stats = IntegralStats(region)
+        stats.add("mask", mask[20:230, 30:300])
+        stats.set_foreground(fg_mask, mask.shape)
+
+        for box in ((30, 20, 300, 230), (45, 33, 46, 34), (100, 57, 211, 199), (31, 101, 299, 229)):
+            xmin, ymin, xmax, ymax = box
+            self.assertEqual(stats.count("mask", box), cv2.countNonZero(mask[ymin:ymax, xmin:xmax]), box)
+            self.assertAlmostEqual(stats.foreground_ratio(box), foreground_ratio(fg_mask, box, mask.shape), 12)
+        self.assertIn("mask", stats)
+        self.assertNotIn((color_lut.FIRE, True), stats)
+
+
+class TestDetectorIntegralStats(TestCase):
+    """
+    类级注释：测试重叠候选框使用积分图统计后校验结果不变
+    """
+
+    def setUp(self):
+        """
+        函数级注释：构造检测器与同一火焰上的多个重叠子框
+        """
+        self.detector = Detector(weights_path="unused.pt", model=object())
+        self.detector.config_loader = None
+        self.frame = _fire_scene()
+        self.enhanced = cv2.convertScaleAbs(self.frame, alpha=1.1, beta=5)
+        rng = np.random.default_rng(2)
+        self.fg_mask = (rng.random((60, 80)) > 0.3).astype(np.uint8) * 255
+        boxes = [(100, 100, 300, 230), (100, 20, 220, 210), (15, 15, 65, 65), (110, 90, 290, 235),
+                 (120, 60, 260, 220), (-10, 200, 400, 300)]
+        self.boxes = np.array(boxes, dtype=np.float32)
+
+    def _validate(self):
+        batch = DetectionBatch.from_arrays(self.boxes, np.full(len(self.boxes), 0.9), np.zeros(len(self.boxes)),
+                                           {0: "fire"})
+        _, detections = self.detector.postprocess(self.frame, self.enhanced, self.fg_mask, batch, draw=False,
+                                                  is_static_test=True)
+        return detections.to_dicts(), self.detector._last_validation[2].to_dicts()
+
+    def test_overlapping_boxes_use_integral_stats(self):
+        """
+        函数级注释：测试开启后生成覆盖所有候选框的积分图，通过与拒绝的候选框及写回的指标与逐框统计一致
+        """
+        baseline = self._validate()
+        self.detector.integral_stats_enabled = True
+        self.detector.integral_stats_min_overlap = 1.5
+        region = self.detector._build_region_features(
+            self.frame, self.enhanced, self.fg_mask,
+            DetectionBatch.from_arrays(self.boxes, np.ones(len(self.boxes)), np.zeros(len(self.boxes))))
+
+        self.assertEqual(region.box, (0, 15, 320, 240))
+        self.assertEqual(region.stats.region, region.box)
+        self.assertTrue(baseline[0])
+        self.assertEqual(self._validate(), baseline)
+
+        self.detector.color_lut_enabled = True
+        self.detector._sync_color_classes()
+        self.assertEqual(self._validate(), baseline)
+
+    def test_disjoint_boxes_skip_integral_stats(self):
+        """
+        函数级注释：测试候选框互不重叠或重叠度不足时不生成积分图
+        """
+        batch = DetectionBatch.from_arrays(np.array([[0, 0, 50, 50], [100, 100, 150, 150]], dtype=np.float32),
+                                           np.ones(2), np.zeros(2))
+
+        self.assertIsNone(self.detector._build_region_features(self.frame, self.enhanced, self.fg_mask, batch))
+        overlapping = DetectionBatch.from_arrays(self.boxes, np.ones(len(self.boxes)), np.zeros(len(self.boxes)))
+        self.assertIsNone(self.detector._build_region_features(self.frame, self.enhanced, self.fg_mask, overlapping))
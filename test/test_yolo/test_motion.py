@@ -0,0 +1,112 @@
+"""
+类级注释：运动估计单元测试
+"""
+from types import SimpleNamespace
+from unittest import TestCase
+
+import numpy as np
+
+from core.yolo.detector import Detector
+from core.yolo.motion import (FrameDiffMotionEstimator, Mog2MotionEstimator, create_motion_estimator,
+                              foreground_ratio, mask_region, sample_step)
+from core.yolo.tiling import select_motion_tiles, tile_grid
+
+
+def _frames(count=12, size=(240, 320)):
+    """
+    函数级注释：静止背景上从左向右移动的亮色方块
+    """
+    background = np.full(size + (3,), 60, dtype=np.uint8)
+    for i in range(count):
+        frame = background.copy()
+        x = 10 + i * 20
+        frame[100:140, x:x + 40] = (0, 120, 255)
+        yield frame
+
+
+class TestMotionEstimators(TestCase):
+    """
+    类级注释：测试各运动估计器的掩码分辨率与移动目标的检出
+    """
+
+    def test_estimators_mark_moving_block(self):
+        """
+        函数级注释：测试全分辨率 MOG2、缩小的 MOG2 与帧差都能在移动方块处给出前景，掩码尺寸按比例缩小
+        """
+        for estimator, shape in ((Mog2MotionEstimator(), (240, 320)),
+                                 (Mog2MotionEstimator(scale=0.5), (120, 160)),
+                                 (FrameDiffMotionEstimator(scale=0.25), (60, 80))):
+            for frame in _frames():
+                mask = estimator.apply(frame)
+            block = (230, 100, 270, 140)
+
+            self.assertEqual(mask.shape, shape, estimator.method)
+            self.assertGreater(foreground_ratio(mask, block, frame.shape), 0.2, estimator.method)
+            self.assertEqual(foreground_ratio(mask, (10, 10, 60, 60), frame.shape), 0.0, estimator.method)
+
+    def test_reset_forgets_previous_frame(self):
+        """
+        函数级注释：测试帧差估计器重置后的首帧没有前景，未知方法回退为 MOG2
+        """
+        estimator = create_motion_estimator("frame_diff", 0.5)
+        frames = list(_frames(2))
+        estimator.apply(frames[0])
+        estimator.reset()
+
+        self.assertEqual(int(estimator.apply(frames[1]).max()), 0)
+        self.assertEqual(create_motion_estimator("unknown").method, "mog2")
+
+
+class TestMaskMapping(TestCase):
+    """
+    类级注释：测试画面坐标到缩小掩码的映射
+    """
+
+    def test_region_maps_onto_reduced_mask(self):
+        """
+        函数级注释：测试同尺寸掩码直接切片，缩小的掩码按比例向外取整映射且至少保留一个像素
+        """
+        full = np.zeros((1080, 1920), dtype=np.uint8)
+        reduced = np.zeros((270, 480), dtype=np.uint8)
+
+        self.assertEqual(mask_region(full, (100, 50, 300, 150), full.shape).shape, (100, 200))
+        self.assertEqual(mask_region(reduced, (100, 50, 300, 150), full.shape).shape, (26, 50))
+        self.assertEqual(mask_region(reduced, (1918, 1078, 1920, 1080), full.shape).shape, (1, 1))
+        self.assertEqual(sample_step(full, full.shape), 4)
+        self.assertEqual(sample_step(reduced, full.shape), 1)
+
+    def test_motion_tiles_use_reduced_mask(self):
+        """
+        函数级注释：测试缩小的掩码与全分辨率掩码选出相同的运动切片
+        """
+        tiles = tile_grid(1920, 1080, tile_size=640, overlap=0.0)
+        full = np.zeros((1080, 1920), dtype=np.uint8)
+        full[700:900, 1400:1600] = 255
+        reduced = full[::4, ::4].copy()
+
+        self.assertEqual(select_motion_tiles(reduced, tiles, frame_shape=full.shape),
+                         select_motion_tiles(full, tiles))
+
+
+class TestDetectorMotionConfig(TestCase):
+    """
+    类级注释：测试检测器按热配置切换运动估计器
+    """
+
+    def test_config_change_rebuilds_estimator(self):
+        """
+        函数级注释：测试运动估计方法或掩码比例变化时重建估计器，未变化时保留已学习的背景
+        """
+        detector = Detector(weights_path="unused.pt", model=object())
+        config = {"motion_method": "frame_diff", "motion_mask_scale": 0.25}
+        detector.config_loader = SimpleNamespace(get_config=lambda key, default: config.get(key, default))
+        detector._refresh_runtime_config(force=True)
+        estimator = detector.motion_estimator
+
+        config["yolo_confidence"] = 0.5
+        detector._refresh_runtime_config()
+        mask = detector.update_foreground(np.zeros((240, 320, 3), dtype=np.uint8))
+
+        self.assertIsInstance(estimator, FrameDiffMotionEstimator)
+        self.assertIs(detector.motion_estimator, estimator)
+        self.assertEqual(mask.shape, (60, 80))
@@ -0,0 +1,129 @@
+"""
+类级注释：ONNX Runtime 推理后端单元测试
+前后处理算子与 ultralytics 的实现逐项对比；提供真实权重时（环境变量 YOLO_TEST_WEIGHTS，
+默认 core/yolo/weights/best.pt）在 test/yolo_test/test_imgs 上对比两种后端的检测结果
+"""
+import os
+import glob
+import shutil
+import tempfile
+from unittest import TestCase, skipUnless
+
+import cv2
+import numpy as np
+
+from core.yolo import yolo_ops
+
+TEST_WEIGHTS = os.environ.get("YOLO_TEST_WEIGHTS", "core/yolo/weights/best.pt")
+TEST_IMAGES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "yolo_test", "test_imgs", "*")))
+
+
+class TestYoloOps(TestCase):
+    """
+    类级注释：测试 letterbox、NMS 与坐标还原与 ultralytics 一致
+    """
+
+    def test_letterbox_matches_ultralytics(self):
+        """
+        函数级注释：测试不同长宽比与推理尺寸下的缩放填充结果逐像素一致
+        """
+        from ultralytics.data.augment import LetterBox
+
+        rng = np.random.default_rng(0)
+        for shape in ((531, 800), (1024, 1024), (240, 320), (720, 1280)):
+            image = rng.integers(0, 255, shape + (3,), dtype=np.uint8)
+            for imgsz in (640, 320):
+                expected = LetterBox(imgsz, auto=True, stride=32)(image=image)
+                padded, _, _ = yolo_ops.letterbox(image, imgsz)
+                np.testing.assert_array_equal(padded, expected)
+
+    def test_decode_matches_ultralytics_nms(self):
+        """
+        函数级注释：测试随机检测头输出经解码与按类别 NMS 后与 ultralytics 结果一致
+        """
+        import torch
+        from ultralytics.utils.nms import non_max_suppression
+
+        rng = np.random.default_rng(1)
+        count = 2000
+        xy = rng.uniform(0, 640, (2, count))
+        wh = rng.uniform(8, 160, (2, count))
+        scores = rng.uniform(0, 1, (2, count)) ** 3
+        output = np.concatenate([xy, wh, scores]).astype(np.float32)[None]
+
+        expected = non_max_suppression(torch.from_numpy(output), conf_thres=0.25, iou_thres=0.45)[0].numpy()
+        boxes, confs, cls_ids = yolo_ops.decode_predictions(output, conf=0.25, iou=0.45)
+
+        self.assertEqual(len(boxes), len(expected))
+        np.testing.assert_allclose(boxes, expected[:, :4], atol=1e-3)
+        np.testing.assert_allclose(confs, expected[:, 4], atol=1e-6)
+        np.testing.assert_array_equal(cls_ids, expected[:, 5].astype(int))
+
+    def test_scale_boxes_matches_ultralytics(self):
+        """
+        函数级注释：测试输入张量坐标还原到原图坐标
+        """
+        import torch
+        from ultralytics.utils.ops import scale_boxes
+
+        image = np.zeros((531, 800, 3), dtype=np.uint8)
+        padded, ratio, pad = yolo_ops.letterbox(image, 640)
+        boxes = np.array([[10, 20, 300, 200], [0, 0, 640, 448]], dtype=np.float32)
+
+        expected = scale_boxes(padded.shape[:2], torch.from_numpy(boxes.copy()), image.shape[:2]).numpy()
+        np.testing.assert_allclose(yolo_ops.scale_boxes(boxes, ratio, pad, image.shape), expected, atol=1e-3)
+
+    def test_class_filter(self):
+        """
+        函数级注释：测试 classes 参数只保留指定类别
+        """
+        # 两个不重叠的候选框：cx, cy, w, h, fire 分数, smoke 分数
+        output = np.array([[100, 100, 50, 50, 0.9, 0.1],
+                           [300, 300, 50, 50, 0.1, 0.8]], dtype=np.float32).T[None]
+
+        _, _, cls_ids = yolo_ops.decode_predictions(output, conf=0.25, iou=0.45, classes=[1])
+
+        self.assertEqual(cls_ids.tolist(), [1])
+
+
+@skipUnless(os.path.exists(TEST_WEIGHTS) and TEST_IMAGES, "未提供模型权重")
+class TestOnnxParity(TestCase):
+    """
+    类级注释：测试 ONNX 后端与 PyTorch 后端在测试图片上输出一致的检测字典
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        函数级注释：复制权重到临时目录后导出 ONNX，避免在仓库中留下导出文件
+        """
+        from core.yolo.detector import Detector
+
+        cls.tmpdir = tempfile.mkdtemp()
+        weights = os.path.join(cls.tmpdir, os.path.basename(TEST_WEIGHTS))
+        shutil.copy(TEST_WEIGHTS, weights)
+        cls.torch_detector = Detector(weights_path=weights, conf=0.25, device="cpu")
+        cls.onnx_detector = Detector(weights_path=weights, conf=0.25, device="cpu", backend="onnx")
+        for detector in (cls.torch_detector, cls.onnx_detector):
+            detector.config_loader = None
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
+    def test_detections_match_torch_backend(self):
+        """
+        函数级注释：测试两种后端的原始检测结果数量、类别一致，坐标与置信度误差在数值精度范围内
+        """
+        for path in TEST_IMAGES:
+            image = cv2.imread(path)
+            for imgsz in (640, 320):
+                expected = self.torch_detector.infer(image, imgsz=imgsz)[0].to_dicts()
+                actual = self.onnx_detector.infer(image, imgsz=imgsz)[0].to_dicts()
+
+                self.assertEqual(len(actual), len(expected), f"{path} imgsz={imgsz}")
+                for exp, act in zip(expected, actual):
+                    self.assertEqual(act["cls_name"], exp["cls_name"])
+                    self.assertAlmostEqual(act["conf"], exp["conf"], delta=1e-2)
+                    for key in ("xmin", "ymin", "xmax", "ymax"):
+                        self.assertLessEqual(abs(act[key] - exp[key]), 2)
@@ -0,0 +1,145 @@
+"""
+类级注释：INT8 量化工具单元测试
+"""
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+from core.yolo.detector import Detector
+from core.yolo.quantize import (DriftAccumulator, FrameCalibrationReader, average_precision, compare_models,
+                                head_nodes_to_exclude, match_detections)
+from helpers import FakeModel, write_test_video
+
+
+def _det(x: int, conf: float, cls_id: int = 0, size: int = 20):
+    """
+    函数级注释：构造检测字典
+    """
+    return {'xmin': x, 'ymin': 0, 'xmax': x + size, 'ymax': size, 'conf': conf, 'cls_id': cls_id}
+
+
+class TestDriftMetrics(TestCase):
+    """
+    类级注释：测试以 FP32 检测为参照的 AP、召回率与 L3 判定统计
+    """
+
+    def test_identical_detections_have_full_ap(self):
+        """
+        函数级注释：测试候选与参照完全一致时 AP 与召回率为 1
+        """
+        reference = [_det(0, 0.9), _det(100, 0.8)]
+        accumulator = DriftAccumulator()
+        accumulator.add_frame(reference, [dict(d) for d in reference], True, True)
+
+        summary = accumulator.summary({0: "fire"})
+
+        self.assertEqual(summary["map50"], 1.0)
+        self.assertEqual(summary["recall"], 1.0)
+        self.assertEqual(summary["per_class"]["fire"]["reference"], 2)
+
+    def test_missed_and_false_detections_lower_ap(self):
+        """
+        函数级注释：测试漏检降低召回率，高置信度误检降低 AP
+        """
+        matched = match_detections([_det(0, 0.9), _det(100, 0.8)], [_det(300, 0.95), _det(2, 0.7)])
+        records, count = matched[0]
+
+        self.assertEqual(count, 2)
+        self.assertEqual(sorted(records), [(0.7, True), (0.95, False)])
+        self.assertAlmostEqual(average_precision(records, count), 0.25)
+
+    def test_classes_are_matched_separately(self):
+        """
+        函数级注释：测试不同类别的框即使重叠也不互相匹配
+        """
+        matched = match_detections([_det(0, 0.9, cls_id=0)], [_det(0, 0.9, cls_id=1)])
+
+        self.assertEqual(matched[0], ([], 1))
+        self.assertEqual(matched[1], ([(0.9, False)], 0))
+
+    def test_l3_decision_changes_are_counted(self):
+        """
+        函数级注释：测试逐帧 L3 判定的漏报、多报与一致率
+        """
+        accumulator = DriftAccumulator()
+        for reference_l3, candidate_l3 in ((True, True), (True, False), (False, True), (False, False)):
+            accumulator.add_frame([], [], reference_l3, candidate_l3)
+
+        summary = accumulator.summary()
+
+        self.assertEqual(summary["l3_missed"], 1)
+        self.assertEqual(summary["l3_extra"], 1)
+        self.assertEqual(summary["l3_agreement"], 0.5)
+        self.assertIsNone(summary["map50"])
+
+
+class TestCompareModels(TestCase):
+    """
+    类级注释：测试录像上的 FP32 / INT8 对比
+    """
+
+    def test_every_frame_is_compared_with_skip_flags_enabled(self):
+        """
+        函数级注释：测试 system.json 开启近重复帧缓存与运动门控时，对比仍逐帧推理，每帧的原始检测结果都计入漂移统计
+        """
+        config = {"frame_cache_enabled": True, "motion_gate_enabled": True}
+        loader = SimpleNamespace(get_config=lambda key, default: config.get(key, default))
+        models = (FakeModel([[20, 20, 60, 60]]), FakeModel([[20, 20, 60, 60]]))
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                patch("core.communication.config_hot_loader.get_config_hot_loader", return_value=loader):
+            video_path = os.path.join(tmpdir, "static.avi")
+            write_test_video(video_path, frames=6, size=(128, 96), step=0)
+            reference, candidate = (Detector(weights_path="unused.pt", model=model) for model in models)
+            self.assertTrue(reference.frame_cache_enabled and reference.motion_gate_enabled)
+
+            report = compare_models(reference, candidate, [video_path])
+
+        self.assertEqual(report["frames"], 6)
+        self.assertEqual([len(model.calls) for model in models], [6, 6])
+        self.assertEqual(report["per_class"]["fire"]["reference"], 6)
+        self.assertEqual(report["recall"], 1.0)
+
+
+class TestCalibration(TestCase):
+    """
+    类级注释：测试校准数据读取与检测头节点排除
+    """
+
+    def test_reader_letterboxes_frames_to_square_input(self):
+        """
+        函数级注释：测试校准帧按推理尺寸填充为方形并按上限抽样
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for i in range(5):
+                cv2.imwrite(os.path.join(tmpdir, f"{i}.jpg"), np.full((90, 160, 3), i * 40, dtype=np.uint8))
+            reader = FrameCalibrationReader(tmpdir, "images", imgsz=64, max_images=3)
+
+            batches = []
+            while True:
+                item = reader.get_next()
+                if item is None:
+                    break
+                batches.append(item["images"])
+
+        self.assertEqual(len(batches), 3)
+        self.assertEqual(batches[0].shape, (1, 3, 64, 64))
+        self.assertEqual(batches[0].dtype, np.float32)
+
+    def test_only_head_decode_nodes_are_excluded(self):
+        """
+        函数级注释：测试只排除最后一个模块中 cv2/cv3 分支以外的节点
+        """
+        from onnx import helper
+
+        names = ["/model.0/conv/Conv", "/model.22/cv2.0/cv2.0.2/Conv", "/model.22/cv3.1/cv3.1.2/Conv",
+                 "/model.22/dfl/conv/Conv", "/model.22/Concat_3", "/model.22/Sigmoid", "/model.9/Concat"]
+        nodes = [helper.make_node("Identity", ["x"], ["y"], name=name) for name in names]
+        model = helper.make_model(helper.make_graph(nodes, "g", [], []))
+
+        self.assertEqual(head_nodes_to_exclude(model),
+                         ["/model.22/dfl/conv/Conv", "/model.22/Concat_3", "/model.22/Sigmoid"])
@@ -0,0 +1,73 @@
+"""
+类级注释：候选区域特征缓存单元测试
+"""
+from unittest import TestCase
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+from core.yolo import roi_features
+from core.yolo.roi_features import RoiFeatures
+
+
+class TestRoiFeatures(TestCase):
+    """
+    类级注释：测试区域特征按需计算、只计算一次且与直接计算一致
+    """
+
+    def setUp(self):
+        """
+        函数级注释：构造随机画面与增强画面
+        """
+        rng = np.random.default_rng(0)
+        self.raw = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+        self.enhanced = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+        self.box = (20, 10, 100, 70)
+
+    def test_each_conversion_computed_once(self):
+        """
+        函数级注释：测试同一颜色空间与掩码重复取用时只转换一次，原图与增强图分别缓存
+        """
+        features = RoiFeatures(self.raw, self.enhanced, self.box)
+        with patch.object(roi_features.cv2, "cvtColor", wraps=cv2.cvtColor) as cvt:
+            features.convert("hsv")
+            features.in_range("hsv", (15, 80, 80), (45, 255, 255))
+            features.in_range("hsv", (15, 80, 80), (45, 255, 255))
+            features.convert("hsv", enhanced=True)
+            features.convert("gray")
+            features.convert("gray")
+
+        self.assertEqual(cvt.call_count, 3)
+
+    def test_matches_direct_computation(self):
+        """
+        函数级注释：测试掩码并集与直接在裁剪区域上计算的结果一致
+        """
+        features = RoiFeatures(self.raw, self.enhanced, self.box)
+        xmin, ymin, xmax, ymax = self.box
+        hsv = cv2.cvtColor(self.enhanced[ymin:ymax, xmin:xmax], cv2.COLOR_BGR2HSV)
+        expected = cv2.bitwise_or(cv2.inRange(hsv, np.array([0, 50, 50]), np.array([35, 255, 255])),
+                                  cv2.inRange(hsv, np.array([0, 0, 220]), np.array([180, 60, 255])))
+        ranges = ((np.array([0, 50, 50]), np.array([35, 255, 255])), ((0, 0, 220), (180, 60, 255)))
+
+        np.testing.assert_array_equal(features.any_in_range("hsv", ranges, enhanced=True), expected)
+        self.assertEqual(features.total_pixels, 80 * 60)
+
+    def test_enhanced_region_is_lazy(self):
+        """
+        函数级注释：测试只用原图特征时不会裁剪增强画面，未提供增强画面时取用增强图报错
+        """
+        class _Frame:
+            sliced = 0
+
+            def __getitem__(self, key):
+                self.sliced += 1
+                raise AssertionError("不应裁剪增强画面")
+
+        frame = _Frame()
+        RoiFeatures(self.raw, frame, self.box).convert("ycrcb")
+
+        self.assertEqual(frame.sliced, 0)
+        with self.assertRaises(ValueError):
+            RoiFeatures(self.raw, None, self.box).convert("hsv", enhanced=True)
@@ -0,0 +1,108 @@
+"""
+类级注释：检测区域（ROI）单元测试
+"""
+from unittest import TestCase
+
+import numpy as np
+
+from core.yolo.detector import Detector
+from core.yolo.roi_mask import RoiMask, parse_polygons
+from helpers import FakeModel
+
+
+class TestRoiMask(TestCase):
+    """
+    类级注释：测试多边形解析与裁剪框计算
+    """
+
+    def test_parse_single_and_multiple_polygons(self):
+        """
+        函数级注释：测试单个多边形与多边形列表都能解析，点数不足的多边形被忽略
+        """
+        single = parse_polygons([[0, 0], [1, 0], [1, 1]])
+        multiple = parse_polygons([[[0, 0], [1, 0], [1, 1]], [[0, 0], [1, 1]]])
+
+        self.assertEqual(len(single), 1)
+        self.assertEqual(len(multiple), 1)
+        self.assertEqual(parse_polygons(None), [])
+
+    def test_include_polygon_defines_padded_box(self):
+        """
+        函数级注释：测试裁剪框为包含区域外接矩形加外扩像素
+        """
+        roi = RoiMask(include=[[0.5, 0.5], [1.0, 0.5], [1.0, 1.0], [0.5, 1.0]], pad=8)
+
+        box = roi.prepare((200, 400, 3))
+
+        self.assertEqual(box, (192, 92, 400, 200))
+        self.assertLess(roi.area_ratio, 0.3)
+        self.assertEqual(roi.crop(np.zeros((200, 400, 3), dtype=np.uint8)).shape, (108, 208, 3))
+
+    def test_exclude_region_rejects_centered_detection(self):
+        """
+        函数级注释：测试中心落在排除区域内的检测框被丢弃
+        """
+        roi = RoiMask(exclude=[[0.25, 0.0], [0.75, 0.0], [0.75, 1.0], [0.25, 1.0]], pad=0)
+        self.assertEqual(roi.prepare((100, 200, 3)), (0, 0, 200, 100))
+
+        self.assertFalse(roi.contains({'xmin': 90, 'ymin': 10, 'xmax': 110, 'ymax': 30}))
+        self.assertTrue(roi.contains({'xmin': 10, 'ymin': 10, 'xmax': 30, 'ymax': 30}))
+
+    def test_fully_excluded_returns_none(self):
+        """
+        函数级注释：测试整帧被排除时没有裁剪框
+        """
+        roi = RoiMask(exclude=[[0, 0], [1, 0], [1, 1], [0, 1]])
+
+        self.assertIsNone(roi.prepare((100, 200, 3)))
+
+
+class TestDetectorRoi(TestCase):
+    """
+    类级注释：测试检测器在检测区域内推理
+    """
+
+    def setUp(self):
+        """
+        函数级注释：构造右半幅为检测区域的检测器，校验阶段原样返回候选框
+        """
+        self.model = FakeModel([[10, 10, 30, 30]])
+        self.detector = Detector(weights_path="unused.pt", model=self.model, imgsz=640)
+        self.detector.config_loader = None
+        self.detector.postprocess = lambda frame, enhanced, fg, raw, **kwargs: (kwargs.get('canvas'), raw)
+        self.detector.set_roi(include=[[0.5, 0.0], [1.0, 0.0], [1.0, 1.0], [0.5, 1.0]])
+        self.detector.roi.pad = 0
+        self.frame = np.full((240, 640, 3), 100, dtype=np.uint8)
+
+    def test_inference_runs_on_crop_with_scaled_imgsz(self):
+        """
+        函数级注释：测试推理输入为裁剪区域，推理尺寸按长边比例缩小
+        """
+        self.detector.detect_frame(self.frame, draw=False)
+
+        shape, imgsz = self.model.calls[0]
+        self.assertEqual(shape, (240, 320, 3))
+        self.assertEqual(imgsz, 320)
+
+    def test_detections_are_mapped_back_to_frame_coordinates(self):
+        """
+        函数级注释：测试检测框坐标换算回整帧坐标系
+        """
+        _, detections = self.detector.detect_frame(self.frame, draw=False)
+
+        self.assertEqual(len(detections), 1)
+        self.assertEqual((detections[0]['xmin'], detections[0]['xmax']), (330, 350))
+        self.assertEqual((detections[0]['ymin'], detections[0]['ymax']), (10, 30))
+
+    def test_unchanged_roi_keeps_stream_state(self):
+        """
+        函数级注释：测试重复设置相同检测区域不会重置追踪器
+        """
+        self.detector.tracked_targets[0] = {'centroid': (0, 0)}
+        self.detector.set_roi(include=[[0.5, 0.0], [1.0, 0.0], [1.0, 1.0], [0.5, 1.0]])
+
+        self.assertIn(0, self.detector.tracked_targets)
+
+        self.detector.set_roi()
+        self.assertIsNone(self.detector.roi)
+        self.assertEqual(self.detector.tracked_targets, {})
@@ -0,0 +1,131 @@
+"""
+类级注释：切片推理单元测试
+"""
+from types import SimpleNamespace
+from unittest import TestCase
+
+import numpy as np
+
+from core.yolo.detections import DetectionBatch
+from core.yolo.detector import Detector
+from core.yolo.tiling import merge_detections, select_motion_tiles, shift_detections, tile_grid
+from helpers import FakeModel
+
+
+def _det(xmin, ymin, xmax, ymax, conf=0.9, cls_id=0):
+    return {'xmin': xmin, 'ymin': ymin, 'xmax': xmax, 'ymax': ymax, 'conf': conf, 'cls_id': cls_id}
+
+
+class TestTiling(TestCase):
+    """
+    类级注释：测试切片划分、运动切片选择与结果合并
+    """
+
+    def test_grid_covers_frame_with_overlap(self):
+        """
+        函数级注释：测试切片覆盖整帧、尺寸固定且最后一块与边缘对齐
+        """
+        tiles = tile_grid(1920, 1080, tile_size=640, overlap=0.2)
+
+        self.assertEqual(sorted({t[0] for t in tiles}), [0, 512, 1024, 1280])
+        self.assertEqual(sorted({t[1] for t in tiles}), [0, 440])
+        self.assertTrue(all(x1 - x0 == 640 and y1 - y0 == 640 for x0, y0, x1, y1 in tiles))
+        self.assertEqual(tile_grid(320, 240, tile_size=640), [(0, 0, 320, 240)])
+
+    def test_only_moving_tiles_are_selected(self):
+        """
+        函数级注释：测试只选出前景比例达到阈值的切片，且数量不超过上限
+        """
+        tiles = tile_grid(1920, 1080, tile_size=640, overlap=0.0)
+        fg_mask = np.zeros((1080, 1920), dtype=np.uint8)
+        fg_mask[700:900, 1400:1600] = 255
+
+        selected = select_motion_tiles(fg_mask, tiles, min_ratio=0.01, max_tiles=4)
+
+        self.assertEqual(selected, [(1280, 440, 1920, 1080)])
+        self.assertEqual(select_motion_tiles(fg_mask, tiles, max_tiles=0), [])
+
+    def test_overlapping_duplicates_are_merged_per_class(self):
+        """
+        函数级注释：测试同类重复框只保留置信度最高者，不同类别的重叠框互不抑制
+        """
+        detections = DetectionBatch.from_dicts(
+            [_det(0, 0, 10, 10, conf=0.5), _det(1, 1, 10, 10, conf=0.8), _det(0, 0, 10, 10, cls_id=1)]
+        )
+        shifted = shift_detections(DetectionBatch.from_dicts([_det(0, 0, 10, 10)]), (100, 50, 740, 690))
+
+        merged = merge_detections(detections, iou_threshold=0.45)
+
+        self.assertEqual([(round(d['conf'], 3), d['cls_id']) for d in merged.to_dicts()], [(0.9, 1), (0.8, 0)])
+        self.assertEqual((shifted[0]['xmin'], shifted[0]['ymin']), (100, 50))
+
+
+class TestDetectorTiling(TestCase):
+    """
+    类级注释：测试检测器在整帧推理之外对运动切片推理
+    """
+
+    def setUp(self):
+        """
+        函数级注释：构造开启切片推理的检测器，前景集中在右下角，校验阶段原样返回候选框
+        """
+        self.model = FakeModel([[100, 200, 110, 212]], input_shape=(640, 640))
+        self.detector = Detector(weights_path="unused.pt", model=self.model, imgsz=640)
+        self.detector.config_loader = None
+        self.detector.tiled_inference_enabled = True
+        self.detector.postprocess = lambda frame, enhanced, fg, raw, **kwargs: (frame, raw)
+        fg_mask = np.zeros((1080, 1920), dtype=np.uint8)
+        fg_mask[900:1000, 1700:1800] = 255
+        self.detector.update_foreground = lambda frame, is_static_test=False: fg_mask
+        self.frame = np.full((1080, 1920, 3), 100, dtype=np.uint8)
+
+    def test_tile_detection_is_mapped_to_frame_coordinates(self):
+        """
+        函数级注释：测试只有运动切片参与推理，切片检测框换算回整帧坐标
+        """
+        _, detections = self.detector.detect_frame(self.frame, draw=False)
+
+        self.assertEqual(self.detector.last_tiles, 1)
+        self.assertEqual(self.model.calls[1], ([(640, 640, 3)], 640))
+        self.assertEqual(len(detections), 1)
+        self.assertEqual((detections[0]['xmin'], detections[0]['ymin']), (1380, 640))
+
+    def test_remote_tiles_use_batch_client(self):
+        """
+        函数级注释：测试设置了远程推理时，同一帧的所有切片通过批量接口一次提交
+        """
+        submitted = []
+        self.detector.inference_client = lambda frame, imgsz: self.detector.infer_batch([frame], imgsz)[0]
+        self.detector.inference_batch_client = lambda frames, imgsz: (submitted.append(len(frames))
+                                                                      or self.detector.infer_batch(frames, imgsz))
+        self.detector.tiled_max_tiles = 3
+        fg_mask = np.full((1080, 1920), 255, dtype=np.uint8)
+        self.detector.update_foreground = lambda frame, is_static_test=False: fg_mask
+
+        self.detector.detect_frame(self.frame, draw=False)
+
+        self.assertEqual(submitted, [3])
+        self.assertEqual(self.model.calls[1], ([(640, 640, 3)] * 3, 640))
+
+    def test_disabled_runs_full_frame_only(self):
+        """
+        函数级注释：测试关闭切片推理时只做整帧推理
+        """
+        self.detector.tiled_inference_enabled = False
+
+        _, detections = self.detector.detect_frame(self.frame, draw=False)
+
+        self.assertEqual(len(self.model.calls), 1)
+        self.assertEqual(detections, [])
+
+    def test_unaligned_tile_size_is_rounded_to_stride(self):
+        """
+        函数级注释：测试配置的切片边长不是 32 的倍数时向下对齐，切片推理尺寸满足 YOLO 步长要求
+        """
+        config = {"tiled_inference_enabled": True, "tiled_tile_size": 500}
+        self.detector.config_loader = SimpleNamespace(get_config=lambda key, default: config.get(key, default))
+
+        self.detector.detect_frame(self.frame, draw=False)
+
+        self.assertEqual(self.detector.tiled_tile_size, 480)
+        self.assertEqual(self.model.calls[1][1], 480)
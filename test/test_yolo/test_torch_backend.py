@@ -0,0 +1,76 @@
+"""
+类级注释：精简 PyTorch 推理后端单元测试
+使用随机初始化的 yolov8n 检测网络，不依赖权重文件
+"""
+from unittest import TestCase
+
+import numpy as np
+import torch
+
+from core.yolo import yolo_ops
+from core.yolo.torch_backend import TorchYoloModel
+
+
+class TestTorchYoloModel(TestCase):
+    """
+    类级注释：测试直接调用检测网络的推理结果与 ultralytics 前后处理一致
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        函数级注释：构造随机初始化、已融合的双类别检测网络
+        """
+        from ultralytics.nn.tasks import DetectionModel
+
+        torch.manual_seed(0)
+        module = DetectionModel("yolov8n.yaml", nc=2, verbose=False).fuse(verbose=False).eval()
+        cls.model = TorchYoloModel(module, {0: "fire", 1: "smoke"}, stride=int(module.stride.max()))
+        cls.image = np.random.default_rng(0).integers(0, 255, (240, 427, 3), dtype=np.uint8)
+
+    def test_predict_matches_ultralytics_pipeline(self):
+        """
+        函数级注释：测试预处理与坐标还原与 ultralytics LetterBox + scale_boxes 一致
+        随机网络的置信度很低且几乎相同，NMS 的取舍没有意义，因此两侧使用同一解码函数，只比较输入张量与坐标换算
+        """
+        from ultralytics.data.augment import LetterBox
+        from ultralytics.utils.ops import scale_boxes
+
+        padded = LetterBox(320, auto=True, stride=32)(image=self.image)
+        tensor = torch.from_numpy(padded[..., ::-1].transpose(2, 0, 1).copy())[None].float() / 255.0
+        with torch.inference_mode():
+            output = self.model.module(tensor)[0][0].numpy()
+        boxes, scores, cls_ids = yolo_ops.decode_predictions(output, 1e-4, 0.45)
+        expected = scale_boxes(padded.shape[:2], torch.from_numpy(boxes.copy()), self.image.shape[:2]).numpy()
+
+        result = self.model.predict(self.image, conf=1e-4, iou=0.45, imgsz=320)[0]
+
+        self.assertGreater(len(expected), 0)
+        self.assertTrue(torch.equal(self.model._input, tensor))
+        np.testing.assert_allclose(result.boxes.xyxy, expected, atol=1e-3)
+        np.testing.assert_allclose(result.boxes.conf, scores, atol=1e-6)
+        np.testing.assert_array_equal(result.boxes.cls, cls_ids)
+
+    def test_buffers_are_reused_across_calls(self):
+        """
+        函数级注释：测试相同输入尺寸的连续调用复用预分配缓冲区，批量推理按帧返回结果
+        """
+        self.model.predict(self.image, conf=0.5, imgsz=320)
+        frames, tensor = self.model._frames, self.model._input
+        self.model.predict(self.image, conf=0.5, imgsz=320)
+        self.assertIs(self.model._frames, frames)
+        self.assertIs(self.model._input, tensor)
+
+        results = self.model.predict([self.image, self.image[::2, ::2]], conf=0.01, imgsz=320)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(self.model._frames.shape, (2, 320, 320, 3))
+
+    def test_letterbox_into_reused_buffer_matches_letterbox(self):
+        """
+        函数级注释：测试写入已有内容的缓冲区时填充区域被完整覆盖
+        """
+        expected, ratio, pad = yolo_ops.letterbox(self.image, 320)
+        out = np.full(expected.shape, 7, dtype=np.uint8)
+
+        self.assertEqual(yolo_ops.letterbox_into(self.image, out, 320), (ratio, pad))
+        np.testing.assert_array_equal(out, expected)